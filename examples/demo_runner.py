@@ -95,11 +95,14 @@ class DemoRunner:
         agent = self._sim.initialize_agent(agent_id)
         start_state = agent.get_state()
 
-        # force starting position on first floor (try 100 samples)
-        num_start_tries = 0
-        while start_state.position[1] > 0.5 and num_start_tries < 100:
-            start_state.position = self._sim.pathfinder.get_random_navigable_point()
-            num_start_tries += 1
+        # force starting position on first floor
+        if start_state.position[1] > 0.5:
+            try:
+                start_state.position = self._sim.pathfinder.sample_navigable_points(
+                    1, y_range=(-np.inf, 0.5)
+                )[0]
+            except ValueError:
+                pass
         agent.set_state(start_state)
 
         if not self._sim_settings["silent"]:
@@ -211,11 +214,19 @@ class DemoRunner:
             self.init_physics_test_scene(num_objects=10)
             print("active object ids: " + str(self._sim.get_existing_object_ids()))
 
+        async_readback = self._sim_settings.get("async_readback", False)
         time_per_step = []
         action = random.choice(action_names)
-        observations = self._sim.step(action)
+        if async_readback:
+            # Keep one frame in flight so that rendering the next frame
+            # overlaps with reading back the previous one
+            self._sim.step_async(action)
+            observations = None
+        else:
+            observations = self._sim.step(action)
 
-        print(observations)
+        if not self._sim_settings["silent"]:
+            print(observations)
 
         while total_frames < self._sim_settings["max_frames"]:
             if total_frames == 1:
@@ -232,7 +243,7 @@ class DemoRunner:
             #        cur_pos = self._sim.get_translation(obj_id)
             #        self._sim.set_translation(cur_pos + rand_nudge, obj_id)
             time_per_step.append(time.time() - start_step_time)
-            if self._sim_settings['display_frame']:
+            if self._sim_settings.get("display_frame", False):
                 import cv2
                 cv2.imshow("Frame", observations["color_sensor"])
                 key = cv2.waitKey(0)
@@ -244,7 +255,11 @@ class DemoRunner:
                 elif key == 83:
                     action = 'turn_right'
                 print(action_names)
-            observations = self._sim.step(action)
+            if async_readback:
+                self._sim.step_async(action)
+                observations = self._sim.wait()
+            else:
+                observations = self._sim.step(action)
 
             if self._sim_settings["save_png"]:
                 if self._sim_settings["color_sensor"]:
@@ -258,13 +273,12 @@ class DemoRunner:
 
             if not self._sim_settings["silent"]:
                 print("position\t", state.position, "\t", "rotation\t", state.rotation)
-
-            replica_pos, replica_rot = self.convert_habitat_to_replica(state.position, state.rotation)
-            print("Replica Pos:" + str(replica_pos) + " " + " Replica Rot:" + str(replica_rot))
+                replica_pos, replica_rot = self.convert_habitat_to_replica(
+                    state.position, state.rotation
+                )
+                print(f"Replica Pos: {replica_pos}  Replica Rot: {replica_rot}")
 
             if self._sim_settings["compute_shortest_path"]:
-                print("Goal: " + str(self._sim_settings['goal_position']))
-
                 self.compute_shortest_path(
                     state.position, self._sim_settings["goal_position"]
                 )
@@ -286,12 +300,19 @@ class DemoRunner:
 
             total_frames += 1
 
+        if async_readback:
+            self._sim.wait()
+
         end_time = time.time()
         perf = {}
         perf["total_time"] = end_time - start_time
         perf["frame_time"] = perf["total_time"] / total_frames
         perf["fps"] = 1.0 / perf["frame_time"]
         perf["time_per_step"] = time_per_step
+        if async_readback:
+            stats = self._sim.async_readback_stats
+            perf["readback_latency"] = stats.mean_latency
+            perf["readback_wait"] = stats.mean_wait
 
         return perf
 
@@ -388,11 +409,16 @@ class DemoRunner:
             for k, v in p.items():
                 res[k] += [v]
 
-        return dict(
+        summary = dict(
             frame_time=sum(res["frame_time"]),
             fps=sum(res["fps"]),
             total_time=sum(res["total_time"]) / nprocs,
         )
+        if "readback_latency" in res:
+            summary["readback_latency"] = sum(res["readback_latency"]) / nprocs
+            summary["readback_wait"] = sum(res["readback_wait"]) / nprocs
+
+        return summary
 
     def convert_habitat_to_replica(self, pos, rot):
         import quaternion
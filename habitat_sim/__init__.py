@@ -14,6 +14,7 @@ if not getattr(builtins, "__HSIM_SETUP__", False):
     from habitat_sim.nav import *
     from habitat_sim.agent import *
     from habitat_sim.simulator import *
+    from habitat_sim.vector_simulator import *
     from habitat_sim.bindings import *
 
     from habitat_sim import (
@@ -22,10 +23,12 @@ if not getattr(builtins, "__HSIM_SETUP__", False):
         gfx,
         logging,
         nav,
+        profiling,
         scene,
         sensor,
         simulator,
         utils,
+        vector_simulator,
     )
     from habitat_sim._ext.habitat_sim_bindings import MapStringString
     from habitat_sim.registry import registry
@@ -39,10 +42,12 @@ if not getattr(builtins, "__HSIM_SETUP__", False):
         "gfx",
         "logging",
         "nav",
+        "profiling",
         "scene",
         "sensor",
         "simulator",
         "utils",
+        "vector_simulator",
         "MapStringString",
         "registry",
     ]
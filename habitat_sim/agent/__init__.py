@@ -6,5 +6,6 @@
 
 from .agent import *
 from .controls import *
+from .kinematics import *
 
-__all__ = agent.__all__ + controls.__all__
+__all__ = agent.__all__ + controls.__all__ + kinematics.__all__
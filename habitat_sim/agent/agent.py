@@ -4,7 +4,7 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, Iterable, List, Optional, Union
 
 import attr
 import magnum as mn
@@ -12,16 +12,19 @@ import numpy as np
 
 import habitat_sim.bindings as hsim
 import habitat_sim.errors
+from habitat_sim.agent.controls import ActuationSpec, ObjectControls, SceneNodeControl
+from habitat_sim.agent.controls.default_controls import native_move_fns
+from habitat_sim.agent.controls.object_controls import _noop_filter
+from habitat_sim.registry import registry
 from habitat_sim.sensors import SensorSuite
 from habitat_sim.utils.common import (
     quat_from_coeffs,
     quat_from_magnum,
     quat_rotate_vector,
     quat_to_magnum,
+    quats_from_coeffs,
 )
 
-from .controls import ActuationSpec, ObjectControls
-
 __all__ = ["ActionSpec", "SixDOFPose", "AgentState", "AgentConfiguration", "Agent"]
 
 
@@ -68,6 +71,22 @@ class AgentState(object):
     sensor_states: Dict[str, SixDOFPose] = attr.Factory(dict)
 
 
+def _copy_state(state: AgentState) -> AgentState:
+    # Quaternions are immutable, only the arrays need copying
+    return AgentState(
+        position=state.position.copy(),
+        rotation=state.rotation,
+        velocity=state.velocity.copy(),
+        angular_velocity=state.angular_velocity.copy(),
+        force=state.force.copy(),
+        torque=state.torque.copy(),
+        sensor_states={
+            k: SixDOFPose(v.position.copy(), v.rotation)
+            for k, v in state.sensor_states.items()
+        },
+    )
+
+
 @attr.s(auto_attribs=True, slots=True)
 class AgentConfiguration(object):
     height: float = 1.5
@@ -85,6 +104,14 @@ class AgentConfiguration(object):
     body_type: str = "cylinder"
 
 
+@attr.s(auto_attribs=True, slots=True)
+class _ActionDispatch(object):
+    spec: ActionSpec
+    move_fn: Optional[SceneNodeControl]
+    body_action: bool
+    native_move_fn: Optional[str]
+
+
 @attr.s(init=False, auto_attribs=True)
 class Agent(object):
     r"""Implements an agent with multiple sensors
@@ -103,12 +130,27 @@ class Agent(object):
         recommend letting the simulator create the agent and own the scene
         graph in almost all cases. Using the scene graph in python is dangerous
         due to differences in c++ and python memory management.
+
+    `get_state` caches the state it computes until the agent's node or one of
+    its sensors' nodes is transformed, whether by `act`, `set_state` or any
+    other change to the scene graph. `state_cache_info` reports the hit rate.
+
+    The controls implementing each action are looked up in the `registry`
+    once, when the agent is configured, and again only if the registry or the
+    action space changes.
     """
 
     agent_config: AgentConfiguration
     sensors: SensorSuite
     controls: ObjectControls
     body: mn.scenegraph.AbstractFeature3D
+    _observers: List[hsim.TransformationObserver]
+    _cached_state: Optional[AgentState]
+    _state_cache_hits: int
+    _state_cache_misses: int
+    _dispatch: Dict[Any, _ActionDispatch]
+    _dispatch_version: int
+    _native_controls: Optional[hsim.ObjectControls]
 
     def __init__(
         self, scene_node: hsim.SceneNode, agent_config=None, sensors=None, controls=None
@@ -118,6 +160,13 @@ class Agent(object):
         self.controls = controls if controls else ObjectControls()
         self.body = mn.scenegraph.AbstractFeature3D(scene_node)
         scene_node.type = hsim.SceneNodeType.AGENT
+        self._observers = []
+        self._cached_state = None
+        self._state_cache_hits = 0
+        self._state_cache_misses = 0
+        self._dispatch = {}
+        self._dispatch_version = -1
+        self._native_controls = None
         self.reconfigure(self.agent_config)
 
     def reconfigure(
@@ -140,6 +189,42 @@ class Agent(object):
                     hsim.PinholeCamera(self.scene_node.create_child(), spec)
                 )
 
+        self._observe_nodes()
+        self._build_dispatch()
+
+    def _build_dispatch(self):
+        self._dispatch = {}
+        for action_id, spec in self.agent_config.action_space.items():
+            move_fn = registry.get_move_fn(spec.name)
+            self._dispatch[action_id] = _ActionDispatch(
+                spec,
+                move_fn,
+                move_fn is not None and move_fn.body_action,
+                native_move_fns.get(type(move_fn)),
+            )
+        self._dispatch_version = registry.version
+
+    def _observe_nodes(self):
+        self._observers = [hsim.TransformationObserver(self.scene_node)] + [
+            hsim.TransformationObserver(v.node) for _, v in self.sensors.items()
+        ]
+        self._cached_state = None
+
+    def _state_changed(self) -> bool:
+        if self._cached_state is None:
+            return True
+
+        if len(self._observers) != len(self.sensors) + 1:
+            # Sensors were added to or removed from the suite directly
+            self._observe_nodes()
+            return True
+
+        for observer in self._observers:
+            if observer.changed:
+                return True
+
+        return False
+
     def act(self, action_id: Any) -> bool:
         r"""Take the action specified by action_id
 
@@ -149,27 +234,107 @@ class Agent(object):
         """
 
         habitat_sim.errors.assert_obj_valid(self.body)
-        assert (
-            action_id in self.agent_config.action_space
-        ), f"No action {action_id} in action space"
-        action = self.agent_config.action_space[action_id]
+        dispatch = self._get_dispatch(action_id)
+        action = dispatch.spec
 
         did_collide = False
-        if self.controls.is_body_action(action.name):
-            did_collide = self.controls.action(
-                self.scene_node, action.name, action.actuation, apply_filter=True
+        if dispatch.body_action:
+            did_collide = self.controls.apply_move_fn(
+                self.body.object, dispatch.move_fn, action.actuation, apply_filter=True
             )
         else:
             for _, v in self.sensors.items():
-                habitat_sim.errors.assert_obj_valid(v)
-                self.controls.action(
-                    v.object, action.name, action.actuation, apply_filter=False
+                self.controls.apply_move_fn(
+                    v.object, dispatch.move_fn, action.actuation, apply_filter=False
                 )
 
+        self._cached_state = None
         return did_collide
 
+    def act_sequence(
+        self, actions: Iterable[Any], pathfinder: Optional[hsim.PathFinder] = None
+    ) -> Dict[str, np.ndarray]:
+        r"""Takes a sequence of actions
+
+        :param actions: IDs of the actions, in order
+        :param pathfinder: Filters the body moves with its
+            :py:`try_step`, if its navmesh is loaded, in place of the
+            `ObjectControls.move_filter_fn` of `controls`
+        :return: One entry per action for :py:`"collided"` (bool array),
+            :py:`"position"` (:py:`(N, 3)` array) and :py:`"rotation"` (array
+            of quaternions), the pose of the agent after each action
+
+        If all actions are implemented by the default controls and either a
+        ``pathfinder`` is given or `controls` has no move filter, the whole
+        sequence is applied in one native call. Otherwise, this is the same as
+        calling `act` for each action.
+        """
+        habitat_sim.errors.assert_obj_valid(self.body)
+        actions = list(actions)
+        dispatches = [self._get_dispatch(action_id) for action_id in actions]
+        num_steps = len(dispatches)
+
+        native = (
+            pathfinder is not None or self.controls.move_filter_fn is _noop_filter
+        ) and all(dispatch.native_move_fn is not None for dispatch in dispatches)
+        if native:
+            if self._native_controls is None:
+                self._native_controls = hsim.ObjectControls()
+            self._native_controls.set_pathfinder_filter(pathfinder)
+            collided, position, coeffs = self._native_controls.action_sequence(
+                self.body.object,
+                [v.object for _, v in self.sensors.items()],
+                [dispatch.native_move_fn for dispatch in dispatches],
+                [dispatch.spec.actuation.amount for dispatch in dispatches],
+                [dispatch.body_action for dispatch in dispatches],
+            )
+            self._cached_state = None
+            return dict(
+                collided=np.array(collided, dtype=bool),
+                position=position,
+                rotation=quats_from_coeffs(coeffs),
+            )
+
+        collided = np.zeros(num_steps, dtype=bool)
+        position = np.empty((num_steps, 3), dtype=np.float32)
+        rotation = np.empty(num_steps, dtype=np.quaternion)
+        scene_node = self.body.object
+        for i, action_id in enumerate(actions):
+            collided[i] = self.act(action_id)
+            position[i] = scene_node.absolute_translation
+            rotation[i] = quat_from_magnum(scene_node.rotation)
+
+        return dict(collided=collided, position=position, rotation=rotation)
+
+    def _get_dispatch(self, action_id: Any) -> _ActionDispatch:
+        action = self.agent_config.action_space.get(action_id)
+        assert action is not None, f"No action {action_id} in action space"
+
+        dispatch = self._dispatch.get(action_id)
+        if (
+            dispatch is None
+            or dispatch.spec is not action
+            or self._dispatch_version != registry.version
+        ):
+            # The action space was edited in place or a control was registered
+            self._build_dispatch()
+            dispatch = self._dispatch[action_id]
+
+        assert dispatch.move_fn is not None, f"No move_fn for action '{action.name}'"
+        return dispatch
+
     def get_state(self) -> AgentState:
+        r"""Gets the agents state
+
+        The state is cached until the agent moves. Each call returns a copy of
+        the cached state, which the caller is free to modify.
+        """
         habitat_sim.errors.assert_obj_valid(self.body)
+        if not self._state_changed():
+            self._state_cache_hits += 1
+            return _copy_state(self._cached_state)
+
+        self._state_cache_misses += 1
         state = AgentState(
             np.array(self.body.object.absolute_translation), self.body.object.rotation
         )
@@ -183,7 +348,17 @@ class Agent(object):
 
         state.rotation = quat_from_magnum(state.rotation)
 
-        return state
+        for observer in self._observers:
+            observer.reset()
+        self._cached_state = state
+
+        return _copy_state(state)
+
+    def state_cache_info(self) -> Dict[str, int]:
+        r"""Number of `get_state` calls answered from the cache (``hits``) and
+        recomputed (``misses``)
+        """
+        return dict(hits=self._state_cache_hits, misses=self._state_cache_misses)
 
     def set_state(self, state: AgentState, reset_sensors: bool = True):
         r"""Sets the agents state
@@ -194,6 +369,7 @@ class Agent(object):
             extrinsic state
         """
         habitat_sim.errors.assert_obj_valid(self.body)
+        self._cached_state = None
 
         if isinstance(state.rotation, list):
             state.rotation = quat_from_coeffs(state.rotation)
@@ -4,6 +4,8 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
+from typing import Dict, Type
+
 import magnum as mn
 
 import habitat_sim.bindings as hsim
@@ -96,3 +98,19 @@ class LookUp(SceneNodeControl):
 class LookDown(SceneNodeControl):
     def __call__(self, scene_node: hsim.SceneNode, actuation_spec: ActuationSpec):
         _rotate_local(scene_node, -actuation_spec.amount, _X_AXIS)
+
+
+# Controls with a native counterpart in esp::scene::ObjectControls, used by
+# Agent.act_sequence. Keyed by exact type, a subclass may behave differently.
+native_move_fns: Dict[Type[SceneNodeControl], str] = {
+    MoveBackward: "moveBackward",
+    MoveForward: "moveForward",
+    MoveRight: "moveRight",
+    MoveLeft: "moveLeft",
+    MoveUp: "moveUp",
+    MoveDown: "moveDown",
+    LookLeft: "lookLeft",
+    LookRight: "lookRight",
+    LookUp: "lookUp",
+    LookDown: "lookDown",
+}
@@ -9,7 +9,7 @@ import numpy as np
 import quaternion
 
 import habitat_sim.bindings as hsim
-from habitat_sim.agent.controls.controls import ActuationSpec
+from habitat_sim.agent.controls.controls import ActuationSpec, SceneNodeControl
 from habitat_sim.registry import registry
 
 # epislon used to deal with machine precision
@@ -59,9 +59,28 @@ class ObjectControls(object):
             after the action
         :return: Whether or not the action taken resulted in a collision
         """
-        start_pos = obj.absolute_translation
         move_fn = registry.get_move_fn(action_name)
         assert move_fn is not None, f"No move_fn for action '{action_name}'"
+        return self.apply_move_fn(obj, move_fn, actuation_spec, apply_filter)
+
+    def apply_move_fn(
+        self,
+        obj: hsim.SceneNode,
+        move_fn: SceneNodeControl,
+        actuation_spec: ActuationSpec,
+        apply_filter: bool = True,
+    ) -> bool:
+        r"""Like `action`, but with the control already looked up in the
+        `registry`
+
+        :param obj: `scene.SceneNode` to perform the action on
+        :param move_fn: The control implementing the action
+        :param actuation_spec: Specifies the parameters needed by the function
+        :param apply_filter: Whether or not to apply the `move_filter_fn`
+            after the action
+        :return: Whether or not the action taken resulted in a collision
+        """
+        start_pos = obj.absolute_translation
         move_fn(obj, actuation_spec)
         end_pos = obj.absolute_translation
 
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Facebook, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import attr
+import numpy as np
+
+import habitat_sim.bindings as hsim
+from habitat_sim.agent.agent import ActionSpec, AgentState, _default_action_space
+from habitat_sim.agent.controls import default_controls
+from habitat_sim.agent.controls.object_controls import EPS
+from habitat_sim.registry import registry
+from habitat_sim.utils.common import (
+    quat_from_coeffs,
+    quats_from_angle_axis,
+    quats_from_coeffs,
+    quats_multiply,
+    quats_rotate_vectors,
+)
+
+__all__ = ["BatchedKinematicAgents"]
+
+
+_X_AXIS = np.array([1.0, 0.0, 0.0])
+_Y_AXIS = np.array([0.0, 1.0, 0.0])
+_Z_AXIS = np.array([0.0, 0.0, 1.0])
+
+# Vectorized counterparts of the default controls, as the local axis they move
+# along (in meters) or rotate about (in degrees), times the sign of the motion.
+# Keyed by exact type, a subclass may behave differently.
+_translations = {
+    default_controls.MoveBackward: _Z_AXIS,
+    default_controls.MoveForward: -_Z_AXIS,
+    default_controls.MoveRight: _X_AXIS,
+    default_controls.MoveLeft: -_X_AXIS,
+    default_controls.MoveUp: _Y_AXIS,
+    default_controls.MoveDown: -_Y_AXIS,
+}
+_rotations = {
+    default_controls.LookLeft: _Y_AXIS,
+    default_controls.LookRight: -_Y_AXIS,
+    default_controls.LookUp: _X_AXIS,
+    default_controls.LookDown: -_X_AXIS,
+}
+
+
+@attr.s(auto_attribs=True, slots=True)
+class _KinematicAction(object):
+    translation: Optional[np.ndarray] = None
+    rotation: Optional[np.ndarray] = None
+
+
+def _compile_action(spec: ActionSpec) -> _KinematicAction:
+    move_fn = registry.get_move_fn(spec.name)
+    assert move_fn is not None, f"No move_fn for action '{spec.name}'"
+    assert move_fn.body_action, f"'{spec.name}' is not a body action"
+
+    amount = spec.actuation.amount
+    if type(move_fn) in _translations:
+        return _KinematicAction(translation=_translations[type(move_fn)] * amount)
+
+    assert (
+        type(move_fn) in _rotations
+    ), f"'{spec.name}' has no kinematic counterpart, only the default controls do"
+    return _KinematicAction(
+        rotation=quats_from_angle_axis(np.deg2rad(amount), _rotations[type(move_fn)])
+    )
+
+
+class BatchedKinematicAgents(object):
+    r"""Discrete kinematics of a population of agents, without scene nodes
+
+    The agent poses are kept in arrays and each `step` applies the actions of
+    all agents at once, with the semantics of the default controls of
+    `Agent.act`. Useful to simulate thousands of agents that do not render, or
+    as a reference for the scene graph path.
+
+    :param num_agents: Number of agents
+    :param action_space: Actions of the agents, as in
+        `AgentConfiguration.action_space`, the default action space if
+        :py:`None`. Only body actions implemented by the default controls are
+        supported.
+    :param pathfinder: Handles collisions with its :py:`try_step_batch`, if
+        its navmesh is loaded, like the move filter of a `Simulator`
+
+    :property positions: :py:`(N, 3)` positions, one row per agent
+    :property rotations: :py:`(N, 4)` quaternion coefficients in the
+        :py:`[b, c, d, a]` order of `quat_to_coeffs`, one row per agent
+    """
+
+    def __init__(
+        self,
+        num_agents: int,
+        action_space: Optional[Dict[Any, ActionSpec]] = None,
+        pathfinder: Optional[hsim.PathFinder] = None,
+    ):
+        if action_space is None:
+            action_space = _default_action_space()
+
+        self.pathfinder = pathfinder
+        self.positions = np.zeros((num_agents, 3))
+        self.rotations = np.tile([0.0, 0.0, 0.0, 1.0], (num_agents, 1))
+
+        self._action_ids = list(action_space.keys())
+        self._action_index = {
+            action_id: i for i, action_id in enumerate(self._action_ids)
+        }
+        self._actions = [_compile_action(action_space[a]) for a in self._action_ids]
+
+    @property
+    def num_agents(self) -> int:
+        return len(self.positions)
+
+    def step(self, actions: Sequence[Any]) -> np.ndarray:
+        r"""Takes one action per agent
+
+        :param actions: ID of the action of each agent, in order
+        :return: :py:`(N,)` bool array, whether the action of each agent
+            resulted in a collision
+        """
+        assert (
+            len(actions) == self.num_agents
+        ), f"Expected {self.num_agents} actions, got {len(actions)}"
+        indices = np.fromiter(
+            (self._action_index[a] for a in actions), dtype=np.int64, count=len(actions)
+        )
+
+        starts = self.positions
+        ends = starts.copy()
+        for i, action in enumerate(self._actions):
+            mask = indices == i
+            if not np.any(mask):
+                continue
+
+            if action.translation is not None:
+                ends[mask] += quats_rotate_vectors(
+                    self.rotations[mask], action.translation
+                )
+            if action.rotation is not None:
+                rotations = quats_multiply(self.rotations[mask], action.rotation)
+                self.rotations[mask] = rotations / np.linalg.norm(
+                    rotations, axis=-1, keepdims=True
+                )
+
+        if self.pathfinder is None or not self.pathfinder.is_loaded:
+            self.positions = ends
+            return np.zeros(self.num_agents, dtype=bool)
+
+        filtered_ends = self.pathfinder.try_step_batch(starts, ends).astype(np.float64)
+        self.positions = filtered_ends
+
+        # Same check as ObjectControls, the agent collided if it moved less than
+        # intended
+        dist_moved_before_filter = np.sum((ends - starts) ** 2, axis=-1)
+        dist_moved_after_filter = np.sum((filtered_ends - starts) ** 2, axis=-1)
+        return (dist_moved_after_filter + EPS) < dist_moved_before_filter
+
+    def get_states(self) -> Tuple[np.ndarray, np.ndarray]:
+        r"""Positions and rotations of all agents
+
+        :return: :py:`(positions, rotations)`, laid out as in
+            `Simulator.get_agent_states`
+        """
+        return self.positions.copy(), self.rotations.copy()
+
+    def set_states(self, positions: np.ndarray, rotations: np.ndarray):
+        r"""Moves all agents
+
+        :param positions: :py:`(N, 3)` positions, one row per agent
+        :param rotations: :py:`(N, 4)` quaternion coefficients, laid out as
+            returned by `get_states`
+        """
+        positions = np.array(positions, dtype=np.float64)
+        rotations = np.array(rotations, dtype=np.float64)
+        assert positions.shape == (
+            self.num_agents,
+            3,
+        ), f"Expected positions of shape ({self.num_agents}, 3)"
+        assert rotations.shape == (
+            self.num_agents,
+            4,
+        ), f"Expected rotations of shape ({self.num_agents}, 4)"
+
+        self.positions = positions
+        self.rotations = rotations
+
+    def get_agent_state(self, agent_id: int) -> AgentState:
+        r"""The state of one agent, without sensor states"""
+        return AgentState(
+            position=self.positions[agent_id].copy(),
+            rotation=quat_from_coeffs(self.rotations[agent_id]),
+        )
+
+    def get_agent_states(self) -> List[AgentState]:
+        r"""The states of all agents, without sensor states"""
+        rotations = quats_from_coeffs(self.rotations)
+        return [
+            AgentState(position=position.copy(), rotation=rotation)
+            for position, rotation in zip(self.positions, rotations)
+        ]
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Facebook, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+r"""Stage-resolved benchmarks
+
+Run with :sh:`python -m habitat_sim.benchmark run --output results.json` and
+check for regressions with
+:sh:`python -m habitat_sim.benchmark compare baseline.json results.json`.
+"""
+
+from .report import Regression, compare, run_benchmarks, summarize
+from .scenarios import (
+    BenchmarkSettings,
+    Scenario,
+    SkipScenario,
+    gl_available,
+    scenarios,
+)
+
+__all__ = [
+    "BenchmarkSettings",
+    "Scenario",
+    "SkipScenario",
+    "gl_available",
+    "scenarios",
+    "Regression",
+    "compare",
+    "run_benchmarks",
+    "summarize",
+]
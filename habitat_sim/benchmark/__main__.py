@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Facebook, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import argparse
+import json
+import sys
+
+from habitat_sim.benchmark import (
+    BenchmarkSettings,
+    compare,
+    run_benchmarks,
+    scenarios,
+)
+
+
+def _run(args):
+    settings = BenchmarkSettings(
+        scenes=args.scenes,
+        width=args.resolution[-1],
+        height=args.resolution[0],
+        iterations=args.iterations,
+        warmup=args.warmup,
+        seed=args.seed,
+    )
+    results = run_benchmarks(settings, args.scenarios)
+
+    for name, result in results["scenarios"].items():
+        if result["status"] != "ok":
+            print(f"{name:<16} skipped: {result['reason']}", file=sys.stderr)
+            continue
+        for metric, stats in result["metrics"].items():
+            print(
+                f"{metric:<28} p50 {stats['p50']:9.3f} ms"
+                f"  p90 {stats['p90']:9.3f} ms  p99 {stats['p99']:9.3f} ms",
+                file=sys.stderr,
+            )
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    return 0
+
+
+def _compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    regressions = compare(baseline, current, args.threshold, args.statistic)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+
+    if len(regressions) == 0:
+        print("No regressions")
+        return 0
+
+    return 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        "python -m habitat_sim.benchmark", description="habitat-sim benchmarks"
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.required = True
+
+    run_parser = subparsers.add_parser("run", help="Run benchmark scenarios")
+    run_parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        choices=list(scenarios.keys()),
+        default=None,
+        help="Scenarios to run (default: all)",
+    )
+    run_parser.add_argument(
+        "--scenes",
+        nargs="+",
+        default=BenchmarkSettings().scenes,
+        help="Scenes to use, reconfigure cycles through all of them",
+    )
+    run_parser.add_argument(
+        "--resolution",
+        type=int,
+        nargs="+",
+        default=[256],
+        help="Sensor resolution, either r for r x r or h w",
+    )
+    run_parser.add_argument("--iterations", type=int, default=200)
+    run_parser.add_argument("--warmup", type=int, default=10)
+    run_parser.add_argument("--seed", type=int, default=1)
+    run_parser.add_argument(
+        "--output", type=str, default=None, help="JSON file to write (default: stdout)"
+    )
+    run_parser.set_defaults(fn=_run)
+
+    compare_parser = subparsers.add_parser(
+        "compare", help="Flag regressions against a baseline, exits with 1 if any"
+    )
+    compare_parser.add_argument("baseline", type=str)
+    compare_parser.add_argument("current", type=str)
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Allowed relative slowdown (default: 0.1, i.e. 10%%)",
+    )
+    compare_parser.add_argument(
+        "--statistic",
+        type=str,
+        default="p50",
+        choices=["mean", "min", "p50", "p90", "p95", "p99"],
+    )
+    compare_parser.set_defaults(fn=_compare)
+
+    args = parser.parse_args(argv)
+    return args.fn(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Facebook, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import datetime
+import platform
+import sys
+from typing import Any, Dict, Iterable, List, Optional
+
+import attr
+import numpy as np
+
+import habitat_sim
+from habitat_sim.benchmark.scenarios import (
+    BenchmarkSettings,
+    SkipScenario,
+    gl_available,
+    scenarios,
+)
+from habitat_sim.logging import logger
+
+__all__ = ["summarize", "run_benchmarks", "Regression", "compare"]
+
+_PERCENTILES = (50, 90, 95, 99)
+
+
+def summarize(samples: Iterable[float]) -> Dict[str, float]:
+    r"""Statistics of timing samples given in seconds
+
+    :return: ``count`` and the ``mean``, ``std``, ``min``, ``max`` and
+        ``p50``/``p90``/``p95``/``p99`` in milliseconds
+    """
+    ms = np.asarray(list(samples), dtype=np.float64) * 1e3
+    assert len(ms) > 0, "Cannot summarize an empty list of samples"
+
+    summary = dict(
+        count=int(len(ms)),
+        mean=float(ms.mean()),
+        std=float(ms.std()),
+        min=float(ms.min()),
+        max=float(ms.max()),
+    )
+    for q, value in zip(_PERCENTILES, np.percentile(ms, _PERCENTILES)):
+        summary[f"p{q}"] = float(value)
+
+    return summary
+
+
+def run_benchmarks(
+    settings: BenchmarkSettings, names: Optional[Iterable[str]] = None
+) -> Dict[str, Any]:
+    r"""Runs the selected scenarios
+
+    :param settings: Settings for all scenarios
+    :param names: Scenarios to run, all of them if :py:`None`
+    :return: JSON serializable results, :py:`{"metadata": {...},
+        "scenarios": {name: {"status": ..., "metrics": {...}}}}`. The status
+        is :py:`"ok"` or :py:`"skipped"`, in which case a ``reason`` is given.
+        Each metric is summarized with `summarize`.
+    """
+    names = list(scenarios.keys()) if names is None else list(names)
+    for name in names:
+        assert name in scenarios, f"No scenario {name}"
+
+    results = {}
+    for name in names:
+        scenario = scenarios[name]
+        if scenario.needs_gl and not gl_available():
+            results[name] = dict(status="skipped", reason="No GL context available")
+            continue
+
+        logger.info(f"Running benchmark scenario {name}")
+        try:
+            timings = scenario.fn(settings)
+        except SkipScenario as e:
+            results[name] = dict(status="skipped", reason=str(e))
+            continue
+
+        results[name] = dict(
+            status="ok",
+            metrics={metric: summarize(t) for metric, t in timings.items()},
+        )
+
+    metadata = dict(
+        habitat_sim_version=habitat_sim.__version__,
+        timestamp=datetime.datetime.now().isoformat(),
+        platform=platform.platform(),
+        python=sys.version.split()[0],
+        settings=attr.asdict(settings),
+    )
+    return dict(metadata=metadata, scenarios=results)
+
+
+@attr.s(auto_attribs=True)
+class Regression(object):
+    r"""A metric that got slower than allowed
+
+    :property scenario: Name of the scenario
+    :property metric: Name of the metric
+    :property baseline: Baseline value in milliseconds
+    :property current: Current value in milliseconds
+    """
+    scenario: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline
+
+    def __str__(self):
+        return (
+            f"{self.scenario}/{self.metric}: {self.baseline:.3f} ms -> "
+            f"{self.current:.3f} ms ({100 * (self.ratio - 1):+.1f}%)"
+        )
+
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float = 0.1,
+    statistic: str = "p50",
+) -> List[Regression]:
+    r"""Finds the metrics of ``current`` that regressed against ``baseline``
+
+    :param baseline: Results of `run_benchmarks`
+    :param current: Results of `run_benchmarks`
+    :param threshold: Allowed relative slowdown, :py:`0.1` flags metrics
+        that are more than 10% slower
+    :param statistic: Statistic of the metrics to compare
+    :return: The regressions. Metrics missing from either side or skipped
+        in either run are ignored.
+    """
+    regressions = []
+    for name, result in current["scenarios"].items():
+        base_result = baseline["scenarios"].get(name)
+        if (
+            base_result is None
+            or base_result["status"] != "ok"
+            or result["status"] != "ok"
+        ):
+            continue
+
+        for metric, stats in result["metrics"].items():
+            base_stats = base_result["metrics"].get(metric)
+            if base_stats is None:
+                continue
+
+            if stats[statistic] > base_stats[statistic] * (1.0 + threshold):
+                regressions.append(
+                    Regression(name, metric, base_stats[statistic], stats[statistic])
+                )
+
+    return regressions
@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Facebook, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import itertools
+import os.path as osp
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+import attr
+import numpy as np
+
+import habitat_sim
+import habitat_sim.bindings as hsim
+from habitat_sim.logging import logger
+from habitat_sim.simulator import _navmesh_cache, _navmesh_filename
+
+__all__ = [
+    "BenchmarkSettings",
+    "Scenario",
+    "SkipScenario",
+    "scenarios",
+    "gl_available",
+]
+
+# Timings of one scenario, in seconds per sample, keyed by metric name
+Timings = Dict[str, List[float]]
+
+
+class SkipScenario(Exception):
+    r"""Raised by a scenario that cannot run with the given settings"""
+
+
+@attr.s(auto_attribs=True)
+class BenchmarkSettings(object):
+    r"""Settings shared by all scenarios
+
+    :property scenes: Scenes to benchmark with. The first one is used by every
+        scenario; `reconfigure` cycles through all of them.
+    :property width: Sensor width in pixels
+    :property height: Sensor height in pixels
+    :property iterations: Number of timed samples per metric
+    :property warmup: Number of untimed iterations run first
+    :property frames_per_sample: Frames drawn per `render_only` sample. The
+        draws are only synchronized by one readback at the end of each
+        sample, which this amortizes.
+    :property num_objects: Number of objects dropped for `physics_step`
+    :property physics_config_file: Physics configuration for `physics_step`
+    :property seed: Seed for the simulator and the sampled navmesh points
+    """
+    scenes: List[str] = attr.Factory(
+        lambda: ["data/scene_datasets/habitat-test-scenes/skokloster-castle.glb"]
+    )
+    width: int = 256
+    height: int = 256
+    iterations: int = 200
+    warmup: int = 10
+    frames_per_sample: int = 8
+    num_objects: int = 10
+    physics_config_file: str = "./data/default.phys_scene_config.json"
+    seed: int = 1
+
+    @property
+    def scene(self) -> str:
+        return self.scenes[0]
+
+
+@attr.s(auto_attribs=True)
+class Scenario(object):
+    r"""A named benchmark
+
+    :property name: Name of the scenario
+    :property fn: Runs the scenario and returns its `Timings`
+    :property needs_gl: Whether the scenario needs a GL context. Such
+        scenarios are skipped when `gl_available` is :py:`False`.
+    :property description: One line summary of what is timed
+    """
+    name: str
+    fn: Callable[[BenchmarkSettings], Timings]
+    needs_gl: bool = True
+    description: str = ""
+
+
+scenarios: Dict[str, Scenario] = {}
+
+
+def _register(name: str, needs_gl: bool = True):
+    def _wrapper(fn):
+        scenarios[name] = Scenario(
+            name, fn, needs_gl, fn.__doc__.strip().split("\n")[0]
+        )
+        return fn
+
+    return _wrapper
+
+
+_gl_available: Optional[bool] = None
+
+_GL_PROBE = """
+import habitat_sim
+sim_cfg = habitat_sim.SimulatorConfiguration()
+sim_cfg.scene.id = "NONE"
+agent_cfg = habitat_sim.AgentConfiguration()
+agent_cfg.sensor_specifications[0].resolution = [8, 8]
+sim = habitat_sim.Simulator(habitat_sim.Configuration(sim_cfg, [agent_cfg]))
+sim.get_sensor_observations()
+sim.close()
+"""
+
+
+def gl_available() -> bool:
+    r"""Whether a GL context can be created in this environment
+
+    Probed once in a subprocess, as a failing context creation aborts the
+    process rather than raising.
+    """
+    global _gl_available
+    if _gl_available is None:
+        result = subprocess.run(
+            [sys.executable, "-c", _GL_PROBE],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        _gl_available = result.returncode == 0
+
+    return _gl_available
+
+
+def _require_scene(scene: str):
+    if not osp.exists(scene):
+        raise SkipScenario(f"Scene {scene} not found")
+
+
+def _make_config(
+    settings: BenchmarkSettings,
+    scene: Optional[str] = None,
+    sensor_types=(hsim.SensorType.COLOR,),
+    enable_physics: bool = False,
+) -> habitat_sim.Configuration:
+    sim_cfg = habitat_sim.SimulatorConfiguration()
+    sim_cfg.scene.id = scene if scene is not None else settings.scene
+    sim_cfg.enable_physics = enable_physics
+    sim_cfg.physics_config_file = settings.physics_config_file
+
+    agent_cfg = habitat_sim.AgentConfiguration()
+    agent_cfg.sensor_specifications = []
+    for sensor_type in sensor_types:
+        spec = hsim.SensorSpec()
+        spec.uuid = str(sensor_type).split(".")[-1].lower()
+        spec.sensor_type = sensor_type
+        spec.resolution = [settings.height, settings.width]
+        spec.position = [0.0, 1.5, 0.0]
+        agent_cfg.sensor_specifications.append(spec)
+
+    return habitat_sim.Configuration(sim_cfg, [agent_cfg])
+
+
+def _make_sim(settings: BenchmarkSettings, **kwargs) -> habitat_sim.Simulator:
+    _require_scene(settings.scene)
+    sim = habitat_sim.Simulator(_make_config(settings, **kwargs))
+    sim.seed(settings.seed)
+    return sim
+
+
+def _time(fn: Callable[[], None], settings: BenchmarkSettings) -> List[float]:
+    for _ in range(settings.warmup):
+        fn()
+
+    samples = []
+    for _ in range(settings.iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+
+    return samples
+
+
+@_register("render_only")
+def _render_only(settings: BenchmarkSettings) -> Timings:
+    r"""Time to draw one color frame, without reading it back
+
+    Each sample draws `frames_per_sample` frames and reads back only the last
+    one, so the GPU is synchronized once per sample.
+    """
+    sim = _make_sim(settings)
+    try:
+        sensor = sim._sensors["color"]
+        out = sensor.get_observation()
+        n = settings.frames_per_sample
+
+        def _draw():
+            for _ in range(n):
+                sensor.draw_observation()
+            sensor.get_observation(out=out)
+
+        return {"render_only": [t / n for t in _time(_draw, settings)]}
+    finally:
+        sim.close()
+
+
+@_register("readback_only")
+def _readback_only(settings: BenchmarkSettings) -> Timings:
+    r"""Time to read back an already drawn frame, per sensor type"""
+    sim = _make_sim(
+        settings,
+        sensor_types=(
+            hsim.SensorType.COLOR,
+            hsim.SensorType.DEPTH,
+            hsim.SensorType.SEMANTIC,
+        ),
+    )
+    try:
+        timings = {}
+        for uuid, sensor in sim._sensors.items():
+            try:
+                sensor.draw_observation()
+            except RuntimeError as e:
+                # e.g. a semantic sensor on a scene without semantics
+                logger.warning(f"Skipping readback of {uuid}: {e}")
+                continue
+            out = sensor.get_observation()
+            timings[f"readback_{uuid}"] = _time(
+                lambda: sensor.get_observation(out=out), settings
+            )
+
+        return timings
+    finally:
+        sim.close()
+
+
+@_register("step")
+def _step(settings: BenchmarkSettings) -> Timings:
+    r"""End-to-end `Simulator.step` with a color sensor"""
+    sim = _make_sim(settings)
+    try:
+        actions = list(sim.config.agents[0].action_space.keys())
+        rng = np.random.RandomState(settings.seed)
+
+        def _step_once():
+            sim.step(actions[rng.randint(len(actions))])
+
+        return {"step": _time(_step_once, settings)}
+    finally:
+        sim.close()
+
+
+@_register("async_step")
+def _async_step(settings: BenchmarkSettings) -> Timings:
+    r"""Pipelined `Simulator.step_async` and `Simulator.wait` with a color sensor
+
+    Each sample queues one step and waits for the previous one, so a frame is
+    read back while the next one renders. Next to the time of a sample, it
+    reports the latency from `step_async` to the end of the matching `wait`,
+    the time blocked in `wait` and the interval between retrieved frames, i.e.
+    the inverse of the throughput, as counted by `async_readback_stats`.
+    """
+    sim = _make_sim(settings)
+    try:
+        actions = list(sim.config.agents[0].action_space.keys())
+        rng = np.random.RandomState(settings.seed)
+        stats = sim.async_readback_stats
+
+        def _step_async():
+            sim.step_async(actions[rng.randint(len(actions))])
+
+        # Fill the pipeline, so that every sample has a previous frame
+        _step_async()
+        _step_async()
+        sim.wait()
+
+        timings = {
+            "async_step": [],
+            "async_step_latency": [],
+            "async_step_wait": [],
+            "async_step_frame_interval": [],
+        }
+        for i in range(settings.warmup + settings.iterations):
+            total_latency, total_wait, last_end = (
+                stats.total_latency,
+                stats.total_wait,
+                stats.last_end,
+            )
+            start = time.perf_counter()
+            _step_async()
+            sim.wait()
+            end = time.perf_counter()
+            if i < settings.warmup:
+                continue
+
+            timings["async_step"].append(end - start)
+            timings["async_step_latency"].append(stats.total_latency - total_latency)
+            timings["async_step_wait"].append(stats.total_wait - total_wait)
+            timings["async_step_frame_interval"].append(stats.last_end - last_end)
+
+        sim.wait()
+        return timings
+    finally:
+        sim.close()
+
+
+@_register("navmesh", needs_gl=False)
+def _navmesh(settings: BenchmarkSettings) -> Timings:
+    r"""Navmesh queries: try_step, find_path and obstacle distance"""
+    scene_cfg = hsim.SceneConfiguration()
+    scene_cfg.id = settings.scene
+    filename = _navmesh_filename(scene_cfg)
+    if not osp.exists(filename):
+        raise SkipScenario(f"Navmesh {filename} not found")
+
+    pathfinder = hsim.PathFinder()
+    pathfinder.load_nav_mesh(filename)
+    pathfinder.seed(settings.seed)
+
+    num_points = settings.warmup + settings.iterations
+    starts = [pathfinder.get_random_navigable_point() for _ in range(num_points)]
+    ends = [pathfinder.get_random_navigable_point() for _ in range(num_points)]
+
+    def _queries(query):
+        it = iter(zip(starts, ends))
+        return _time(lambda: query(*next(it)), settings)
+
+    def _find_path(start, end):
+        path = hsim.ShortestPath()
+        path.requested_start = start
+        path.requested_end = end
+        pathfinder.find_path(path)
+
+    step = np.array([0.25, 0.0, 0.0], dtype=np.float32)
+    return {
+        "navmesh_try_step": _queries(
+            lambda start, _: pathfinder.try_step(start, start + step)
+        ),
+        "navmesh_find_path": _queries(_find_path),
+        "navmesh_obstacle_distance": _queries(
+            lambda start, _: pathfinder.distance_to_closest_obstacle(start)
+        ),
+    }
+
+
+@_register("physics_step")
+def _physics_step(settings: BenchmarkSettings) -> Timings:
+    r"""One 1/60s `step_world` with `num_objects` dynamic objects"""
+    if not osp.exists(settings.physics_config_file):
+        raise SkipScenario(f"{settings.physics_config_file} not found")
+
+    # The scene is only loaded when there is a renderer, so keep one sensor
+    sim = _make_sim(settings, enable_physics=True)
+    try:
+        library_size = sim.get_physics_object_library_size()
+        if library_size == 0:
+            raise SkipScenario("No objects in the physics object library")
+
+        for i in range(settings.num_objects):
+            object_id = sim.add_object(i % library_size)
+            position = sim.pathfinder.get_random_navigable_point()
+            sim.set_translation(np.array(position) + [0.0, 1.5, 0.0], object_id)
+
+        backend = sim._sim
+        return {"physics_step": _time(lambda: backend.step_world(1.0 / 60.0), settings)}
+    finally:
+        sim.close()
+
+
+@_register("scene_load")
+def _scene_load(settings: BenchmarkSettings) -> Timings:
+    r"""Creating a :ref:`Simulator` for the scene, i.e. a cold scene load"""
+    _require_scene(settings.scene)
+    config = _make_config(settings)
+
+    def _load():
+        _navmesh_cache.clear()
+        habitat_sim.Simulator(config).close()
+
+    # Scene loads are slow, a handful of samples is plenty
+    settings = attr.evolve(
+        settings, warmup=1, iterations=max(1, min(settings.iterations, 10))
+    )
+    return {"scene_load": _time(_load, settings)}
+
+
+@_register("reconfigure")
+def _reconfigure(settings: BenchmarkSettings) -> Timings:
+    r"""`Simulator.reconfigure` cycling through `scenes`
+
+    With a single scene the sensor resolution alternates instead, which
+    rebuilds the sensors but keeps the scene.
+    """
+    for scene in settings.scenes:
+        _require_scene(scene)
+
+    if len(settings.scenes) > 1:
+        configs = [_make_config(settings, scene=scene) for scene in settings.scenes]
+    else:
+        configs = [
+            _make_config(settings),
+            _make_config(attr.evolve(settings, width=settings.width // 2)),
+        ]
+
+    sim = habitat_sim.Simulator(configs[0])
+    try:
+        next_configs = itertools.cycle(configs[1:] + configs[:1])
+        settings = attr.evolve(
+            settings,
+            warmup=len(configs),
+            iterations=max(1, min(settings.iterations, 20)),
+        )
+        return {
+            "reconfigure": _time(
+                lambda: sim.reconfigure(next(next_configs)), settings
+            )
+        }
+    finally:
+        sim.close()
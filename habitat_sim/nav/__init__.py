@@ -8,9 +8,12 @@ from habitat_sim._ext.habitat_sim_bindings import (
     VectorGreedyCodes,
 )
 
+from .distance_matrix import geodesic_distance_matrix
+from .geodesic_distance_field import GeodesicDistanceField
 from .greedy_geodesic_follower import GreedyGeodesicFollower
 
 __all__ = [
+    "GeodesicDistanceField",
     "GreedyGeodesicFollower",
     "GreedyGeodesicFollowerImpl",
     "GreedyFollowerCodes",
@@ -19,4 +22,5 @@ __all__ = [
     "ShortestPath",
     "HitRecord",
     "VectorGreedyCodes",
+    "geodesic_distance_matrix",
 ]
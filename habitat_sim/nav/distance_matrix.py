@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Facebook, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import hashlib
+import os
+import os.path as osp
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+import habitat_sim.bindings as hsim
+from habitat_sim.logging import logger
+from habitat_sim.profiling import profiler
+
+__all__ = ["geodesic_distance_matrix"]
+
+# Part of the cache keys, bumped whenever the sampling of the points or the
+# computation of the distances changes so that stale matrices are not served
+_CACHE_VERSION = 2
+
+
+def _file_hash(path: str) -> str:
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _compute_matrix(
+    pathfinder: hsim.PathFinder, points: np.ndarray, num_threads: int
+) -> np.ndarray:
+    distances = pathfinder.geodesic_distance_matrix(
+        points, points, num_threads=num_threads
+    )
+    # Geodesic distances are symmetric, but the straightened paths of the two
+    # directions may differ by rounding, so the upper triangle is mirrored
+    matrix = np.triu(distances, k=1)
+    return (matrix + matrix.T).astype(np.float32)
+
+
+def geodesic_distance_matrix(
+    pathfinder: hsim.PathFinder,
+    points: Union[int, np.ndarray],
+    navmesh_path: Optional[str] = None,
+    cache_dir: Optional[str] = None,
+    seed: int = 0,
+    num_threads: int = 0,
+) -> Tuple[np.ndarray, np.ndarray]:
+    r"""Geodesic distances between all pairs of a set of points
+
+    :param pathfinder: Pathfinder with the navmesh of the scene loaded
+    :param points: :py:`(M, 3)` points, or the number of navigable points to
+        sample
+    :param navmesh_path: File the navmesh of ``pathfinder`` was loaded from,
+        needed to cache the matrix
+    :param cache_dir: Directory to cache matrices in, keyed by the hash of the
+        navmesh file and the points. No caching if :py:`None`.
+    :param seed: Seed of the sampling of the points
+    :param num_threads: Passed to :py:`pathfinder.geodesic_distance_matrix`
+    :return: :py:`(points, matrix)`, the :py:`(M, 3)` points and the
+        :py:`(M, M)` matrix of their geodesic distances, :py:`inf` between
+        points that are not connected
+
+    Runs a single Dijkstra search per point rather than one search per pair,
+    all in parallel, in a single :py:`pathfinder.geodesic_distance_matrix`
+    call. Sampled points are checked against those of a cached matrix, which
+    is recomputed if they differ.
+    """
+    assert pathfinder.is_loaded, "The pathfinder has no navmesh loaded"
+    assert (
+        cache_dir is None or navmesh_path is not None
+    ), "The navmesh_path is needed to cache the matrix"
+
+    if isinstance(points, (int, np.integer)):
+        key = f"sampled-{points}-{seed}"
+        points = pathfinder.sample_navigable_points(points, seed=seed)
+    else:
+        points = np.asarray(points, dtype=np.float32)
+        assert points.ndim == 2 and points.shape[1] == 3, "Expected (M, 3) points"
+        key = hashlib.sha256(points.tobytes()).hexdigest()
+
+    cache_file = None
+    if cache_dir is not None:
+        cache_file = osp.join(
+            cache_dir, _file_hash(navmesh_path), f"v{_CACHE_VERSION}-{key}.npz"
+        )
+        if osp.exists(cache_file):
+            with np.load(cache_file) as data:
+                if np.array_equal(data["points"], points):
+                    return data["points"], data["matrix"]
+            logger.warning(
+                f"Points of {cache_file} differ from the requested ones,"
+                " recomputing it"
+            )
+
+    with profiler.scope("nav.geodesic_distance_matrix"):
+        matrix = _compute_matrix(pathfinder, points, num_threads)
+
+    if cache_file is not None:
+        os.makedirs(osp.dirname(cache_file), exist_ok=True)
+        # Written next to the cache file and moved in place, so that concurrent
+        # readers never see a partial file
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp.npz"
+        np.savez_compressed(tmp_file, points=points, matrix=matrix)
+        os.replace(tmp_file, cache_file)
+        logger.info(f"Cached geodesic distance matrix in {cache_file}")
+
+    return points, matrix
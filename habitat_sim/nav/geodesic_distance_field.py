@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Facebook, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from typing import Optional, Sequence, Tuple
+
+import attr
+import numpy as np
+
+import habitat_sim.bindings as hsim
+from habitat_sim.profiling import profiler
+
+__all__ = ["GeodesicDistanceField"]
+
+
+def _mutually_reachable(
+    pathfinder: hsim.PathFinder,
+    a: np.ndarray,
+    b: np.ndarray,
+    distances_a: np.ndarray,
+    distances_b: np.ndarray,
+    cell_size: float,
+) -> np.ndarray:
+    # Whether each pair of neighboring cells can be walked between in a
+    # straight line, both ways
+    shape = distances_a.shape
+    a = a.reshape(-1, 3)
+    b = b.reshape(-1, 3)
+    distances_a = distances_a.ravel()
+    distances_b = distances_b.ravel()
+
+    # The distances of cells a step apart differ by at most the step, give or
+    # take the approximations of the search. Cells on both sides of a wall
+    # usually differ by more, which saves stepping between them.
+    candidates = (
+        np.isfinite(distances_a)
+        & np.isfinite(distances_b)
+        & (np.abs(distances_a - distances_b) <= 2 * cell_size)
+    )
+    reachable = np.zeros(len(a), dtype=bool)
+    if np.any(candidates):
+        a = a[candidates]
+        b = b[candidates]
+        forward = pathfinder.try_step_batch(a, b)
+        backward = pathfinder.try_step_batch(b, a)
+        # Steps are snapped to the navmesh, only x and z must match
+        reachable[candidates] = (
+            np.linalg.norm((forward - b)[:, [0, 2]], axis=-1) < 1e-3
+        ) & (np.linalg.norm((backward - a)[:, [0, 2]], axis=-1) < 1e-3)
+
+    return reachable.reshape(shape)
+
+
+@attr.s(auto_attribs=True)
+class GeodesicDistanceField(object):
+    r"""Geodesic distances to a fixed goal, rasterized on a grid
+
+    Built once per goal with `build`, after which `distance` looks up the
+    geodesic distance of any number of points by bilinear interpolation
+    instead of searching a path for each of them. The grid has one slice in
+    the :math:`xz` plane per height, e.g. one per floor of the scene.
+
+    :property goal: Position of the goal
+    :property origin: :math:`x` and :math:`z` of the center of cell
+        :py:`[0, 0]` of every slice
+    :property cell_size: Size of a cell in meters
+    :property heights: :py:`(F,)` :math:`y` of the slices
+    :property max_y_delta: Points further than this from all the slices are
+        off the field
+    :property distances: :py:`(F, H, W)` geodesic distances of the cell
+        centers, indexed by slice, :math:`z` then :math:`x`, :py:`inf` where
+        the cell is not navigable or the goal can not be reached from it
+    :property connected_x: :py:`(F, H, W - 1)` whether each cell and its
+        neighbor along :math:`x` can be walked between in a straight line
+    :property connected_z: :py:`(F, H - 1, W)` the same for the neighbor
+        along :math:`z`
+    """
+    goal: np.ndarray
+    origin: np.ndarray
+    cell_size: float
+    heights: np.ndarray
+    max_y_delta: float
+    distances: np.ndarray
+    connected_x: np.ndarray
+    connected_z: np.ndarray
+
+    @classmethod
+    def build(
+        cls,
+        pathfinder: hsim.PathFinder,
+        goal: np.ndarray,
+        cell_size: float = 0.1,
+        max_y_delta: float = 0.5,
+        bounds: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+        heights: Optional[Sequence[float]] = None,
+        num_threads: int = 0,
+    ) -> "GeodesicDistanceField":
+        r"""Computes the field of a goal
+
+        :param pathfinder: Pathfinder with the navmesh of the scene loaded
+        :param goal: Position of the goal
+        :param cell_size: Size of a cell in meters, smaller cells are more
+            accurate but take longer to build
+        :param max_y_delta: Cells are navigable if the navmesh is within this
+            height of their slice
+        :param bounds: :py:`(lower, upper)` corners of the region to cover,
+            the bounds of the navmesh if :py:`None`
+        :param heights: Heights of the slices, a single slice at the height of
+            the goal if :py:`None`
+        :param num_threads: Passed to
+            :py:`pathfinder.geodesic_distance_matrix`
+
+        The distances of all cells come from a single Dijkstra search from the
+        goal, with :py:`pathfinder.geodesic_distance_matrix`.
+        """
+        assert pathfinder.is_loaded, "The pathfinder has no navmesh loaded"
+        goal = np.asarray(goal, dtype=np.float64)
+        lower, upper = pathfinder.get_bounds() if bounds is None else bounds
+        lower = np.asarray(lower, dtype=np.float64)
+        upper = np.asarray(upper, dtype=np.float64)
+        heights = np.asarray(
+            [goal[1]] if heights is None else heights, dtype=np.float64
+        ).reshape(-1)
+
+        xs = np.arange(lower[0], upper[0] + cell_size, cell_size)
+        zs = np.arange(lower[2], upper[2] + cell_size, cell_size)
+        grid_x, grid_z = np.meshgrid(xs, zs)
+        h, w = grid_x.shape
+
+        distances = np.full((len(heights), h, w), np.inf, dtype=np.float32)
+        connected_x = np.zeros((len(heights), h, w - 1), dtype=bool)
+        connected_z = np.zeros((len(heights), h - 1, w), dtype=bool)
+        with profiler.scope("GeodesicDistanceField.build"):
+            for i, height in enumerate(heights):
+                points = np.stack(
+                    [grid_x, np.full(grid_x.shape, height), grid_z], axis=-1
+                )
+                flat_points = points.reshape(-1, 3)
+                navigable = pathfinder.is_navigable_batch(flat_points, max_y_delta)
+
+                slice_distances = np.full(len(flat_points), np.inf, dtype=np.float32)
+                slice_distances[navigable] = pathfinder.geodesic_distance_matrix(
+                    goal[np.newaxis], flat_points[navigable], num_threads=num_threads
+                )[0]
+                distances[i] = slice_distances.reshape(h, w)
+
+                connected_x[i] = _mutually_reachable(
+                    pathfinder,
+                    points[:, :-1],
+                    points[:, 1:],
+                    distances[i, :, :-1],
+                    distances[i, :, 1:],
+                    cell_size,
+                )
+                connected_z[i] = _mutually_reachable(
+                    pathfinder,
+                    points[:-1],
+                    points[1:],
+                    distances[i, :-1],
+                    distances[i, 1:],
+                    cell_size,
+                )
+
+        return cls(
+            goal=goal,
+            origin=np.array([xs[0], zs[0]]),
+            cell_size=float(cell_size),
+            heights=heights,
+            max_y_delta=float(max_y_delta),
+            distances=distances,
+            connected_x=connected_x,
+            connected_z=connected_z,
+        )
+
+    def distance(self, points: np.ndarray) -> np.ndarray:
+        r"""Geodesic distances of points to the goal
+
+        :param points: :py:`(N, 3)` points, or a single point
+        :return: :py:`(N,)` distances, or a single distance. :py:`inf` for
+            points outside of the grid or with no navigable cell around them.
+
+        Each point is looked up in the slice closest to it. Distances are
+        interpolated bilinearly from the surrounding cells, starting from the
+        nearest navigable one and leaving out those that can not be reached
+        from it in a straight line, e.g. behind a wall.
+
+        Raises a :py:`ValueError` if a point is further than
+        :py:`max_y_delta` from all the slices.
+        """
+        points = np.asarray(points, dtype=np.float64)
+        single = points.ndim == 1
+        points = points.reshape(-1, 3)
+        num_points = len(points)
+
+        y_deltas = np.abs(points[:, 1, np.newaxis] - self.heights[np.newaxis])
+        slices = np.argmin(y_deltas, axis=-1)
+        off_field = y_deltas[np.arange(num_points), slices] > self.max_y_delta
+        if np.any(off_field):
+            raise ValueError(
+                f"{np.count_nonzero(off_field)} points are further than"
+                f" {self.max_y_delta} from every slice of the field"
+            )
+
+        _, h, w = self.distances.shape
+        u = (points[:, 0] - self.origin[0]) / self.cell_size
+        v = (points[:, 2] - self.origin[1]) / self.cell_size
+        u0 = np.floor(u).astype(np.int64)
+        v0 = np.floor(v).astype(np.int64)
+        fu = u - u0
+        fv = v - v0
+        outside = (u0 < -1) | (u0 >= w) | (v0 < -1) | (v0 >= h)
+
+        # Padded by a row and column of unreachable cells on every side, so
+        # that the cells around points on the border of the grid exist
+        distances = np.pad(
+            self.distances, ((0, 0), (1, 1), (1, 1)), constant_values=np.inf
+        )
+        connected_x = np.pad(self.connected_x, ((0, 0), (1, 1), (1, 1)))
+        connected_z = np.pad(self.connected_z, ((0, 0), (1, 1), (1, 1)))
+        s = slices
+        cu = np.clip(u0, -1, w - 1) + 1
+        cv = np.clip(v0, -1, h - 1) + 1
+
+        # Corners 0 to 3 of the cell are at (u0, v0), (u0 + 1, v0),
+        # (u0, v0 + 1) and (u0 + 1, v0 + 1)
+        corners = np.stack(
+            [
+                distances[s, cv, cu],
+                distances[s, cv, cu + 1],
+                distances[s, cv + 1, cu],
+                distances[s, cv + 1, cu + 1],
+            ],
+            axis=-1,
+        )
+        weights = np.stack(
+            [(1 - fu) * (1 - fv), fu * (1 - fv), (1 - fu) * fv, fu * fv], axis=-1
+        )
+        edges = [
+            (0, 1, connected_x[s, cv, cu]),
+            (2, 3, connected_x[s, cv + 1, cu]),
+            (0, 2, connected_z[s, cv, cu]),
+            (1, 3, connected_z[s, cv, cu + 1]),
+        ]
+
+        finite = np.isfinite(corners)
+        anchor = np.argmax(np.where(finite, weights, -1.0), axis=-1)
+        reached = np.zeros((num_points, 4), dtype=bool)
+        reached[np.arange(num_points), anchor] = finite[np.arange(num_points), anchor]
+        # The opposite corner is two edges away
+        for _ in range(2):
+            for a, b, connected in edges:
+                reached[:, b] |= reached[:, a] & connected
+                reached[:, a] |= reached[:, b] & connected
+
+        weights = np.where(reached, weights, 0.0)
+        total_weight = weights.sum(axis=-1)
+        weighted_sum = (weights * np.where(reached, corners, 0.0)).sum(axis=-1)
+
+        distances = np.full(num_points, np.inf)
+        on_field = (total_weight > 0) & ~outside
+        distances[on_field] = weighted_sum[on_field] / total_weight[on_field]
+
+        return distances[0] if single else distances
+
+    def save(self, path: str):
+        r"""Saves the field to a :py:`.npz` file, to be read with `load`"""
+        np.savez_compressed(path, **attr.asdict(self))
+
+    @classmethod
+    def load(cls, path: str) -> "GeodesicDistanceField":
+        r"""Loads a field saved with `save`"""
+        with np.load(path) as data:
+            return cls(
+                goal=data["goal"],
+                origin=data["origin"],
+                cell_size=float(data["cell_size"]),
+                heights=data["heights"],
+                max_y_delta=float(data["max_y_delta"]),
+                distances=data["distances"],
+                connected_x=data["connected_x"],
+                connected_z=data["connected_z"],
+            )
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Facebook, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+import habitat_sim.bindings as hsim
+
+__all__ = ["Profiler", "profiler"]
+
+# (name, start_ns, duration_ns, thread_id)
+_Event = Tuple[str, int, int, int]
+
+# Same cap as esp::core::Profiler::MaxEvents
+_MAX_EVENTS = 1 << 20
+
+
+class _NullScope(object):
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_NULL_SCOPE = _NullScope()
+
+
+class _Scope(object):
+    __slots__ = ("_profiler", "_name", "_start")
+
+    def __init__(self, profiler: "Profiler", name: str):
+        self._profiler = profiler
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.monotonic_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._profiler.record(
+            self._name, self._start, time.monotonic_ns() - self._start
+        )
+        return False
+
+
+def _histogram(durations_us: np.ndarray) -> List[List[float]]:
+    # Power of two buckets in microseconds, [0, 2), [2, 4), [4, 8), ...
+    buckets = np.floor(np.log2(np.maximum(durations_us, 1.0))).astype(np.int64)
+    buckets = np.maximum(buckets, 1)
+    counts = np.bincount(buckets)
+    return [
+        [0.0 if i == 1 else float(2 ** i), float(2 ** (i + 1)), int(counts[i])]
+        for i in range(1, len(counts))
+        if counts[i] > 0
+    ]
+
+
+class Profiler(object):
+    r"""Opt-in recorder of per-stage wall times
+
+    Stages are timed with :py:`with profiler.scope("agent.act"): ...`. While
+    profiling is disabled `scope` returns a shared no-op context manager, so
+    an instrumented stage costs one attribute lookup and a method call.
+
+    Enabling the profiler also enables the native ``esp::core::Profiler``,
+    which times the C++ stages (``gfx.draw``, ``gfx.readback``,
+    ``physics.step_world``, ``nav.try_step`` and ``assets.load_scene``). Both
+    sides use the monotonic clock, so their events share one timeline.
+
+    Like its native counterpart, the profiler is process-wide: there is one
+    instance, `profiler`, shared by all simulators.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._events: List[_Event] = []
+        self._dropped = 0
+        self._counters: Counter = Counter()
+
+    def enable(self):
+        self.enabled = True
+        hsim.Profiler.set_enabled(True)
+
+    def disable(self):
+        self.enabled = False
+        hsim.Profiler.set_enabled(False)
+
+    def reset(self):
+        r"""Discards all recorded events and counters, on both sides"""
+        with self._lock:
+            self._events = []
+            self._dropped = 0
+            self._counters = Counter()
+        hsim.Profiler.clear()
+
+    def scope(self, name: str):
+        r"""Context manager timing the enclosed block as stage ``name``"""
+        if not self.enabled:
+            return _NULL_SCOPE
+        return _Scope(self, name)
+
+    def record(self, name: str, start_ns: int, duration_ns: int):
+        with self._lock:
+            if len(self._events) >= _MAX_EVENTS:
+                self._dropped += 1
+                return
+            self._events.append((name, start_ns, duration_ns, threading.get_ident()))
+
+    def count(self, name: str, value: int = 1):
+        r"""Adds ``value`` to the counter ``name`` if profiling is enabled"""
+        if self.enabled:
+            with self._lock:
+                self._counters[name] += value
+
+    def events(self) -> List[Tuple[str, str, int, int, int]]:
+        r"""All recorded events as :py:`(category, name, start_ns, duration_ns,
+        thread_id)` tuples sorted by start time. The category is
+        :py:`"python"` or :py:`"native"`.
+        """
+        with self._lock:
+            events = [("python",) + event for event in self._events]
+        events.extend(("native",) + tuple(e) for e in hsim.Profiler.events())
+        events.sort(key=lambda e: e[2])
+        return events
+
+    def summary(self) -> Dict[str, Any]:
+        r"""Per-stage statistics
+
+        :return: :py:`{"stages": {name: stats}, "counters": {...},
+            "dropped_events": n}` where the stats of each stage hold the
+            ``count``, the ``total``, ``mean``, ``min``, ``max``, ``p50``,
+            ``p90`` and ``p99`` wall time in milliseconds, and a ``histogram``
+            of :py:`[low_us, high_us, count]` power-of-two buckets.
+        """
+        durations: Dict[str, List[int]] = defaultdict(list)
+        for _, name, _, duration_ns, _ in self.events():
+            durations[name].append(duration_ns)
+
+        stages = {}
+        for name, values in sorted(durations.items()):
+            ms = np.array(values, dtype=np.float64) / 1e6
+            p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+            stages[name] = dict(
+                count=len(ms),
+                total=float(ms.sum()),
+                mean=float(ms.mean()),
+                min=float(ms.min()),
+                max=float(ms.max()),
+                p50=float(p50),
+                p90=float(p90),
+                p99=float(p99),
+                histogram=_histogram(ms * 1e3),
+            )
+
+        with self._lock:
+            counters = dict(self._counters)
+            dropped = self._dropped
+        dropped += hsim.Profiler.dropped_events()
+
+        return dict(stages=stages, counters=counters, dropped_events=dropped)
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        r"""The events in Chrome's trace event format
+
+        Dump the result with :py:`json.dump` and open it in
+        ``chrome://tracing`` or Perfetto.
+        """
+        events = self.events()
+        origin = events[0][2] if len(events) > 0 else 0
+        pid = os.getpid()
+        trace_events = [
+            dict(
+                name=name,
+                cat=category,
+                ph="X",
+                ts=(start_ns - origin) / 1e3,
+                dur=duration_ns / 1e3,
+                pid=pid,
+                tid=thread_id,
+            )
+            for category, name, start_ns, duration_ns, thread_id in events
+        ]
+
+        with self._lock:
+            counters = dict(self._counters)
+        if len(counters) > 0 and len(events) > 0:
+            last = max((e[2] + e[3] - origin) / 1e3 for e in events)
+            trace_events.append(
+                dict(name="counters", ph="C", ts=last, pid=pid, args=counters)
+            )
+
+        return dict(traceEvents=trace_events, displayTimeUnit="ms")
+
+
+profiler = Profiler()
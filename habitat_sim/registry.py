@@ -33,6 +33,7 @@ class _Registry:
     - Register a movement function : ``@registry.register_move_fn``
     """
     _mapping = collections.defaultdict(dict)
+    _version = 0
 
     @classmethod
     def register_move_fn(
@@ -71,6 +72,7 @@ class _Registry:
             cls._mapping["move_fn"][
                 _camel_to_snake(controller.__name__) if name is None else name
             ] = controller(body_action)
+            cls._version += 1
 
             return controller
 
@@ -91,5 +93,14 @@ class _Registry:
         """
         return cls._get_impl("move_fn", name)
 
+    @property
+    def version(self) -> int:
+        r"""Counter incremented whenever a control is registered
+
+        Lets caches of registry lookups, such as the action dispatch table of
+        `agent.Agent`, detect that they are out of date.
+        """
+        return self._version
+
 
 registry = _Registry()
@@ -5,7 +5,13 @@
 # LICENSE file in the root directory of this source tree.
 
 import os.path as osp
-from typing import Dict, List, Optional
+import threading
+import time
+from collections import OrderedDict, deque
+from collections.abc import MutableMapping
+from concurrent.futures import Future, ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Dict, Iterable, List, Optional, Union
 
 import attr
 import magnum as mn
@@ -14,12 +20,150 @@ import numpy as np
 import habitat_sim.bindings as hsim
 import habitat_sim.errors
 from habitat_sim.agent import Agent, AgentConfiguration, AgentState
+from habitat_sim.agent.controls.pyrobot_noisy_controls import (
+    get_noise_random_state,
+    seed_noise,
+    set_noise_random_state,
+)
 from habitat_sim.logging import logger
 from habitat_sim.nav import GreedyGeodesicFollower
-from habitat_sim.utils.common import quat_from_angle_axis
+from habitat_sim.profiling import profiler
+from habitat_sim.utils.common import quat_from_angle_axis, quat_from_magnum
 
 torch = None
 
+# Number of frames whose readback can be in flight at once, matches
+# esp::gfx::RenderTarget::AsyncReadSlots
+_ASYNC_READBACK_DEPTH = 2
+
+
+class _NavMeshCache(object):
+    r"""Process-wide LRU cache of loaded navmeshes
+
+    :param budget: Budget in bytes for the summed file sizes of the cached
+        navmeshes, :py:`0` for no limit
+
+    The loaded navmesh is only ever read from, so it is shared by every
+    simulator that uses it. Each of them gets its own `hsim.PathFinder` from
+    :py:`PathFinder.clone`, with its own queries, filter and seed. Entries are
+    keyed by the path and the modification time of the file.
+    """
+
+    def __init__(self, budget: int = 512 * 2 ** 20):
+        self.budget = budget
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.prefetch_hits = 0
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._pending: Dict[tuple, Future] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _key(self, filename: str):
+        return (osp.realpath(filename), osp.getmtime(filename))
+
+    @staticmethod
+    def _load(filename: str) -> hsim.PathFinder:
+        pathfinder = hsim.PathFinder()
+        pathfinder.load_nav_mesh(filename)
+        return pathfinder
+
+    def prefetch(self, filename: str):
+        r"""Starts loading a navmesh on a background thread
+
+        `hsim.PathFinder.load_nav_mesh` releases the GIL, so this overlaps with
+        whatever the main thread is doing.
+        """
+        key = self._key(filename)
+        with self._lock:
+            if key in self._entries or key in self._pending:
+                return
+
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="navmesh-prefetch"
+                )
+            self._pending[key] = self._executor.submit(self._load, filename)
+
+    def get(self, filename: str) -> hsim.PathFinder:
+        key = self._key(filename)
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key][0].clone()
+
+            pending = self._pending.pop(key, None)
+
+        if pending is not None:
+            pathfinder = pending.result()
+        else:
+            pathfinder = self._load(filename)
+
+        with self._lock:
+            if pending is not None:
+                self.prefetch_hits += 1
+            else:
+                self.misses += 1
+            if not pathfinder.is_loaded:
+                return pathfinder
+
+            size = osp.getsize(filename)
+            self._entries[key] = (pathfinder, size)
+            self.bytes += size
+            self._trim()
+
+        return pathfinder.clone()
+
+    def set_budget(self, budget: int):
+        with self._lock:
+            self.budget = budget
+            self._trim()
+
+    def _trim(self):
+        # The most recently used navmesh is kept even if it alone exceeds the
+        # budget
+        while self.budget > 0 and self.bytes > self.budget and len(self._entries) > 1:
+            _, (_, size) = self._entries.popitem(last=False)
+            self.bytes -= size
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        return dict(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            prefetch_hits=self.prefetch_hits,
+            bytes=self.bytes,
+            budget=self.budget,
+            entries=len(self._entries),
+        )
+
+
+_navmesh_cache = _NavMeshCache()
+
+
+def _navmesh_filename(scene_cfg: hsim.SceneConfiguration) -> str:
+    if "navmesh" in scene_cfg.filepaths:
+        return scene_cfg.filepaths["navmesh"]
+
+    scene_basename = osp.basename(scene_cfg.id)
+    # "mesh.ply" is identified as a replica model, whose navmesh
+    # is named as "mesh_semantic.navmesh" and is placed in the
+    # subfolder called "habitat" (a level deeper than the "mesh.ply")
+    if scene_basename == "mesh.ply":
+        scene_dir = osp.dirname(scene_cfg.id)
+        return osp.join(scene_dir, "habitat", "mesh_semantic.navmesh")
+    else:
+        return osp.splitext(scene_cfg.id)[0] + ".navmesh"
+
 
 @attr.s(auto_attribs=True, slots=True)
 class Configuration(object):
@@ -27,6 +171,12 @@ class Configuration(object):
 
     :property sim_cfg: The configuration of the backend of the simulator
     :property agents: A list of agent configurations
+    :property navigation_only: Only load the scene's navmesh. No GL context is
+        created and neither the scene mesh nor physics are loaded, so sensors
+        are ignored and nothing can be rendered. Agents can still act and
+        collide with the navmesh.
+    :property load_semantic_scene: Whether a `navigation_only` simulator loads
+        the semantic annotations of the scene. A full simulator always does.
 
     Ties together a backend config, `sim_cfg` and a list of agent
     configurations `agents`.
@@ -34,6 +184,128 @@ class Configuration(object):
 
     sim_cfg: Optional[hsim.SimulatorConfiguration] = None
     agents: Optional[List[AgentConfiguration]] = None
+    navigation_only: bool = False
+    load_semantic_scene: bool = False
+
+
+class _NavigationBackend(object):
+    r"""Lightweight stand-in for :ref:`SimulatorBackend` used by
+    `Configuration.navigation_only` simulators
+
+    Owns the scene graph the agents live in and, if requested, the semantic
+    scene. World time advances with `step_world`. Anything that needs the
+    scene mesh, a renderer or physics raises.
+    """
+
+    renderer = None
+
+    def __init__(self, config: Configuration):
+        self._scene_graph = hsim.SceneGraph()
+        self._world_time = 0.0
+        self.semantic_scene = None
+        self.reconfigure(config)
+
+    def reconfigure(self, config: Configuration):
+        self.semantic_scene = None
+        if config.load_semantic_scene:
+            self.semantic_scene = hsim.SemanticScene()
+            hsim.SimulatorBackend.load_semantic_scene(
+                config.sim_cfg.scene, self.semantic_scene
+            )
+
+    def get_active_scene_graph(self):
+        return self._scene_graph
+
+    def seed(self, new_seed):
+        pass
+
+    def reset(self):
+        pass
+
+    def step_world(self, dt=1.0 / 60.0):
+        self._world_time += dt
+        return self._world_time
+
+    def get_world_time(self):
+        return self._world_time
+
+    def set_world_time(self, world_time):
+        self._world_time = world_time
+
+    def get_random_state(self):
+        return b""
+
+    def set_random_state(self, state):
+        pass
+
+    def get_existing_object_ids(self, scene_id=0):
+        return []
+
+    def prefetch_scene(self, scene):
+        # Only the navmesh is ever loaded, which the caller prefetches
+        pass
+
+    def set_scene_cache_budget(self, bytes):
+        pass
+
+    def get_scene_cache_stats(self):
+        return SimpleNamespace(
+            hits=0, misses=0, evictions=0, bytes=0, budget=0, entries=0
+        )
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        raise RuntimeError(f"{name} is not available in navigation_only mode")
+
+
+@attr.s(auto_attribs=True)
+class AsyncReadbackStats(object):
+    r"""Latency and throughput counters of `Simulator.step_async` /
+    `Simulator.wait`
+
+    :property frames: Number of frames retrieved with `Simulator.wait`
+    :property total_latency: Summed time in seconds from the start of each
+        `Simulator.step_async` call to the end of the matching `Simulator.wait`
+    :property total_wait: Summed time in seconds spent blocked in
+        `Simulator.wait`
+    """
+
+    frames: int = 0
+    total_latency: float = 0.0
+    total_wait: float = 0.0
+    first_start: Optional[float] = None
+    last_end: Optional[float] = None
+
+    def record(self, start: float, wait_start: float, end: float):
+        if self.first_start is None:
+            self.first_start = start
+        self.last_end = end
+        self.frames += 1
+        self.total_latency += end - start
+        self.total_wait += end - wait_start
+
+    @property
+    def mean_latency(self) -> float:
+        return self.total_latency / max(self.frames, 1)
+
+    @property
+    def mean_wait(self) -> float:
+        return self.total_wait / max(self.frames, 1)
+
+    @property
+    def fps(self) -> float:
+        if self.frames == 0 or self.last_end == self.first_start:
+            return 0.0
+        return self.frames / (self.last_end - self.first_start)
+
+    def as_dict(self) -> Dict[str, float]:
+        return dict(
+            frames=self.frames,
+            mean_latency=self.mean_latency,
+            mean_wait=self.mean_wait,
+            fps=self.fps,
+        )
 
 
 @attr.s(auto_attribs=True)
@@ -53,6 +325,12 @@ class Simulator:
     _num_total_frames: int = attr.ib(default=0, init=False)
     _default_agent: Agent = attr.ib(init=False, default=None)
     _sensors: Dict = attr.ib(factory=dict, init=False)
+    _observation_generation: int = attr.ib(default=0, init=False)
+    _observers: List[hsim.TransformationObserver] = attr.ib(factory=list, init=False)
+    _pending_steps: deque = attr.ib(factory=deque, init=False)
+    async_readback_stats: AsyncReadbackStats = attr.ib(
+        factory=AsyncReadbackStats, init=False
+    )
 
     def __attrs_post_init__(self):
         config = self.config
@@ -60,6 +338,7 @@ class Simulator:
         self.reconfigure(config)
 
     def close(self):
+        self._drain_pending_steps()
         for sensor in self._sensors.values():
             del sensor
 
@@ -78,19 +357,41 @@ class Simulator:
 
     def seed(self, new_seed):
         self._sim.seed(new_seed)
+        seed_noise(new_seed)
 
-    def reset(self):
+    def reset(
+        self, out: Optional[Dict[str, np.ndarray]] = None, copy: bool = True
+    ):
+        self._drain_pending_steps()
         self._sim.reset()
-        return self.get_sensor_observations()
+        return self.get_sensor_observations(out=out, copy=copy)
 
     def _config_backend(self, config: Configuration):
+        if self.config is not None and (
+            self.config.navigation_only != config.navigation_only
+        ):
+            # The agents and sensors live in the old backend's scene graph
+            self._sensors = {}
+            self._default_agent = None
+            self.agents = []
+            self._sim = None
+
         if self._sim is None:
-            self._sim = hsim.SimulatorBackend(config.sim_cfg)
+            if config.navigation_only:
+                self._sim = _NavigationBackend(config)
+            else:
+                self._sim = hsim.SimulatorBackend(config.sim_cfg)
+        elif config.navigation_only:
+            self._sim.reconfigure(config)
         else:
             self._sim.reconfigure(config.sim_cfg)
 
     def _config_agents(self, config: Configuration):
-        if self.config is not None and self.config.agents == config.agents:
+        if (
+            self.config is not None
+            and self.config.agents == config.agents
+            and len(self.agents) > 0
+        ):
             return
 
         self.agents = [
@@ -101,28 +402,12 @@ class Simulator:
         ]
 
     def _config_pathfinder(self, config: Configuration):
-        if "navmesh" in config.sim_cfg.scene.filepaths:
-            navmesh_filenname = config.sim_cfg.scene.filepaths["navmesh"]
-        else:
-            scene_basename = osp.basename(config.sim_cfg.scene.id)
-            # "mesh.ply" is identified as a replica model, whose navmesh
-            # is named as "mesh_semantic.navmesh" and is placed in the
-            # subfolder called "habitat" (a level deeper than the "mesh.ply")
-            if scene_basename == "mesh.ply":
-                scene_dir = osp.dirname(config.sim_cfg.scene.id)
-                navmesh_filenname = osp.join(
-                    scene_dir, "habitat", "mesh_semantic.navmesh"
-                )
-            else:
-                navmesh_filenname = (
-                    osp.splitext(config.sim_cfg.scene.id)[0] + ".navmesh"
-                )
-
-        self.pathfinder = hsim.PathFinder()
+        navmesh_filenname = _navmesh_filename(config.sim_cfg.scene)
         if osp.exists(navmesh_filenname):
-            self.pathfinder.load_nav_mesh(navmesh_filenname)
+            self.pathfinder = _navmesh_cache.get(navmesh_filenname)
             logger.info(f"Loaded navmesh {navmesh_filenname}")
         else:
+            self.pathfinder = hsim.PathFinder()
             logger.warning(
                 f"Could not find navmesh {navmesh_filenname}, no collision checking will be done"
             )
@@ -130,13 +415,14 @@ class Simulator:
     def reconfigure(self, config: Configuration):
         assert len(config.agents) > 0
 
-        config.sim_cfg.create_renderer = any(
+        config.sim_cfg.create_renderer = not config.navigation_only and any(
             map(lambda cfg: len(cfg.sensor_specifications) > 0, config.agents)
         )
 
         if self.config == config:
             return
 
+        self._drain_pending_steps()
         # NB: Configure backend last as this gives more time for python's GC
         # to delete any previous instances of the simulator
         # TODO: can't do the above, sorry -- the Agent constructor needs access
@@ -152,16 +438,84 @@ class Simulator:
 
         agent_cfg = config.agents[config.sim_cfg.default_agent_id]
         self._sensors = {}
-        for spec in agent_cfg.sensor_specifications:
+        # Nothing can be rendered without a renderer
+        specs = [] if config.navigation_only else agent_cfg.sensor_specifications
+        for spec in specs:
             self._sensors[spec.uuid] = Sensor(
                 sim=self._sim, agent=self._default_agent, sensor_id=spec.uuid
             )
+        # Flag moves of the default agent made behind the simulator's back, e.g.
+        # with Agent.set_state, to lazy observations
+        self._observers = [
+            hsim.TransformationObserver(self._default_agent.scene_node)
+        ] + [
+            hsim.TransformationObserver(v.node)
+            for _, v in self._default_agent.sensors.items()
+        ]
 
         for i in range(len(self.agents)):
             self.initialize_agent(i)
 
         self.config = config
 
+    def prefetch_scene(self, scene: Union[str, hsim.SceneConfiguration]):
+        r"""Starts loading a scene that will be used by a later `reconfigure`
+
+        Disk I/O and parsing of the scene files and loading of the navmesh run
+        on background threads while this simulator keeps stepping. The next
+        `reconfigure` to that scene then only instantiates it and uploads it to
+        the GPU. Results are kept in the caches configured with
+        `set_cache_budget`.
+
+        :param scene: The scene id or the full scene configuration, i.e.
+            :py:`config.sim_cfg.scene` of the next configuration
+        """
+        if isinstance(scene, str):
+            scene_id = scene
+            scene = hsim.SceneConfiguration()
+            scene.id = scene_id
+
+        navmesh_filename = _navmesh_filename(scene)
+        if osp.exists(navmesh_filename):
+            _navmesh_cache.prefetch(navmesh_filename)
+
+        self._sim.prefetch_scene(scene)
+
+    def set_cache_budget(
+        self, scene_bytes: Optional[int] = None, navmesh_bytes: Optional[int] = None
+    ):
+        r"""Sets the memory budgets of the scene and navmesh caches
+
+        Scenes and navmeshes of previous `reconfigure` calls are kept in memory
+        so that switching back to them is cheap. Once a cache exceeds its
+        budget the least recently used entries that are not in use are
+        evicted. Sizes are approximated by file sizes.
+
+        :param scene_bytes: Budget of the scene cache shared by all simulators
+            in the process, 2 GiB by default and :py:`0` for no limit. Each
+            simulator only evicts the scenes it loaded itself, as their GPU
+            assets belong to its context. Unchanged if :py:`None`.
+        :param navmesh_bytes: Budget of the navmesh cache shared by all
+            simulators in the process. Unchanged if :py:`None`.
+        """
+        if scene_bytes is not None:
+            self._sim.set_scene_cache_budget(scene_bytes)
+        if navmesh_bytes is not None:
+            _navmesh_cache.set_budget(navmesh_bytes)
+
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        r"""Hit, miss and eviction counts as well as the current size and
+        budget of the scene and navmesh caches
+        """
+        scene_stats = self._sim.get_scene_cache_stats()
+        return dict(
+            scene={
+                k: getattr(scene_stats, k)
+                for k in ("hits", "misses", "evictions", "bytes", "budget", "entries")
+            },
+            navmesh=_navmesh_cache.stats(),
+        )
+
     def get_agent(self, agent_id):
         return self.agents[agent_id]
 
@@ -177,11 +531,52 @@ class Simulator:
 
         agent.set_state(initial_state)
         self._last_state = agent.state
+        self._observation_generation += 1
         return agent
 
     def sample_random_agent_state(self, state_to_return):
         return self._sim.sample_random_agent_state(state_to_return)
 
+    def get_agent_states(self):
+        r"""Positions and rotations of all agents, read in one backend call
+
+        :return: :py:`(positions, rotations)`, an :py:`(N, 3)` array and an
+            :py:`(N, 4)` array of quaternion coefficients in the
+            :py:`[b, c, d, a]` order of `quat_to_coeffs`, one row per agent
+
+        Unlike `Agent.get_state`, this does not allocate an `AgentState` per
+        agent and leaves out the sensor states.
+        """
+        return hsim.get_node_poses([agent.scene_node for agent in self.agents])
+
+    def set_agent_states(self, positions: np.ndarray, rotations: np.ndarray):
+        r"""Moves all agents in one backend call
+
+        :param positions: :py:`(N, 3)` positions, one row per agent
+        :param rotations: :py:`(N, 4)` quaternion coefficients, laid out as
+            returned by `get_agent_states`
+
+        The sensors keep their pose relative to their agent, as with
+        :py:`Agent.set_state(state, reset_sensors=False)`.
+        """
+        positions = np.asarray(positions, dtype=np.float32)
+        rotations = np.asarray(rotations, dtype=np.float32)
+        assert positions.shape == (
+            len(self.agents),
+            3,
+        ), f"Expected positions of shape ({len(self.agents)}, 3)"
+        assert rotations.shape == (
+            len(self.agents),
+            4,
+        ), f"Expected rotations of shape ({len(self.agents)}, 4)"
+
+        hsim.set_node_poses(
+            [agent.scene_node for agent in self.agents], positions, rotations
+        )
+        self._last_state = self._default_agent.get_state()
+        # Lazy observations taken before the move must not render the new poses
+        self._observation_generation += 1
+
     @property
     def semantic_scene(self):
         r"""The semantic scene graph
@@ -193,34 +588,319 @@ class Simulator:
 
         return self._sim.semantic_scene
 
-    def get_sensor_observations(self):
-        for _, sensor in self._sensors.items():
+    def get_sensor_observations(
+        self,
+        out: Optional[Dict[str, np.ndarray]] = None,
+        copy: bool = True,
+        sensors: Optional[Iterable[str]] = None,
+        lazy: bool = False,
+    ):
+        r"""Draws and reads back the sensors of the default agent
+
+        :param out: Optional preallocated output array per sensor uuid. See
+            :ref:`Sensor.get_observation`.
+        :param copy: Whether sensors without an ``out`` array return new
+            arrays (default) or read-only views into double-buffered storage
+        :param sensors: uuids of the sensors to render, all of them if
+            :py:`None`
+        :param lazy: Return a :ref:`LazyObservations` mapping that draws and
+            reads back each sensor only when its key is first accessed
+        """
+        self._observation_generation += 1
+
+        if sensors is None:
+            selected = self._sensors
+        else:
+            selected = {}
+            for sensor_uuid in sensors:
+                assert sensor_uuid in self._sensors, f"No sensor {sensor_uuid}"
+                selected[sensor_uuid] = self._sensors[sensor_uuid]
+
+        out = out if out is not None else {}
+        if lazy:
+            for observer in self._observers:
+                observer.reset()
+            return LazyObservations(self, selected, out=out, copy=copy)
+
+        for _, sensor in selected.items():
             sensor.draw_observation()
 
         observations = {}
-        for sensor_uuid, sensor in self._sensors.items():
-            observations[sensor_uuid] = sensor.get_observation()
+        for sensor_uuid, sensor in selected.items():
+            observations[sensor_uuid] = sensor.get_observation(
+                out=out.get(sensor_uuid), copy=copy
+            )
 
         return observations
 
     def last_state(self):
         return self._last_state
 
-    def step(self, action, dt=1.0 / 60.0):
-        self._num_total_frames += 1
-        collided = self._default_agent.act(action)
+    def step(
+        self,
+        action,
+        dt=1.0 / 60.0,
+        out: Optional[Dict[str, np.ndarray]] = None,
+        copy: bool = True,
+        sensors: Optional[Iterable[str]] = None,
+        lazy: bool = False,
+        render: bool = True,
+    ):
+        r"""Takes an action with the default agent, steps physics by ``dt``
+        and returns the observations
+
+        :param render: If :py:`False`, nothing is drawn and only the
+            :py:`"collided"`, :py:`"position"`, :py:`"rotation"` and
+            :py:`"world_time"` of the step are returned, as in one step of
+            `step_many`
+
+        See `get_sensor_observations` for ``out``, ``copy``, ``sensors`` and
+        ``lazy``.
+        """
+        collided = self._act_and_step_world(action, dt)
+        self._last_state = self._default_agent.get_state()
+
+        if render:
+            observations = self.get_sensor_observations(
+                out=out, copy=copy, sensors=sensors, lazy=lazy
+            )
+        else:
+            self._observation_generation += 1
+            agent_node = self._default_agent.scene_node
+            observations = dict(
+                position=np.array(agent_node.absolute_translation, dtype=np.float32),
+                rotation=quat_from_magnum(agent_node.rotation),
+                world_time=self._sim.get_world_time(),
+            )
+        # Whether or not the action taken resulted in a collision
+        observations["collided"] = collided
+
+        return observations
+
+    def step_many(
+        self,
+        actions: Iterable,
+        dt=1.0 / 60.0,
+        render_last_only: bool = True,
+        out: Optional[Dict[str, np.ndarray]] = None,
+        copy: bool = True,
+        sensors: Optional[Iterable[str]] = None,
+    ) -> Dict:
+        r"""Takes a sequence of actions with the default agent, stepping
+        physics by ``dt`` after each of them
+
+        :param actions: The actions, in order
+        :param render_last_only: Draw only once, after the last action. If
+            :py:`False`, every step is drawn.
+        :return: A dict with one entry per step for :py:`"collided"` (bool
+            array), :py:`"position"` (:py:`(N, 3)` array), :py:`"rotation"`
+            (array of quaternions) and :py:`"world_time"`, and the
+            :py:`"observations"` of the last step, or a list of the
+            observations of every step if ``render_last_only`` is
+            :py:`False`.
+
+        See `get_sensor_observations` for ``out``, ``copy`` and ``sensors``.
+        When every step is drawn, ``out`` is overwritten by each of them.
+        """
+        actions = list(actions)
+        assert len(actions) > 0, "step_many needs at least one action"
+
+        num_steps = len(actions)
+        collided = np.zeros(num_steps, dtype=bool)
+        position = np.empty((num_steps, 3), dtype=np.float32)
+        rotation = np.empty(num_steps, dtype=np.quaternion)
+        world_time = np.empty(num_steps, dtype=np.float64)
+        observations = []
+
+        agent_node = self._default_agent.scene_node
+        for i, action in enumerate(actions):
+            collided[i] = self._act_and_step_world(action, dt)
+            position[i] = agent_node.absolute_translation
+            rotation[i] = quat_from_magnum(agent_node.rotation)
+            world_time[i] = self._sim.get_world_time()
+            if not render_last_only:
+                observations.append(
+                    self.get_sensor_observations(out=out, copy=copy, sensors=sensors)
+                )
+
         self._last_state = self._default_agent.get_state()
 
+        if render_last_only:
+            observations = self.get_sensor_observations(
+                out=out, copy=copy, sensors=sensors
+            )
+
+        return dict(
+            collided=collided,
+            position=position,
+            rotation=rotation,
+            world_time=world_time,
+            observations=observations,
+        )
+
+    def step_sequence(
+        self,
+        actions: Iterable,
+        dt=1.0 / 60.0,
+        render: bool = True,
+        out: Optional[Dict[str, np.ndarray]] = None,
+        copy: bool = True,
+        sensors: Optional[Iterable[str]] = None,
+    ) -> Dict:
+        r"""Like `step_many`, but the moves of the default agent are applied
+        in one native call with `Agent.act_sequence`, filtered by the navmesh
+
+        :param render: Whether to draw once, after the last action. If
+            :py:`False`, there is no :py:`"observations"` entry.
+        :return: The same as `step_many` with ``render_last_only``
+
+        All moves are applied before physics is stepped ``len(actions)``
+        times, which only differs from `step_many` if something reads the
+        world in between. Moves implemented by a control without a native
+        counterpart are applied one by one, as by `Agent.act`.
+        """
+        actions = list(actions)
+        assert len(actions) > 0, "step_sequence needs at least one action"
+
+        num_steps = len(actions)
+        self._num_total_frames += num_steps
+        profiler.count("sim.steps", num_steps)
+        with profiler.scope("agent.act"):
+            result = self._default_agent.act_sequence(
+                actions, pathfinder=self.pathfinder
+            )
+
+        world_time = np.empty(num_steps, dtype=np.float64)
+        with profiler.scope("sim.step_world"):
+            for i in range(num_steps):
+                self._sim.step_world(dt)
+                world_time[i] = self._sim.get_world_time()
+        result["world_time"] = world_time
+
+        self._last_state = self._default_agent.get_state()
+
+        if render:
+            result["observations"] = self.get_sensor_observations(
+                out=out, copy=copy, sensors=sensors
+            )
+
+        return result
+
+    def _act_and_step_world(self, action, dt) -> bool:
+        self._num_total_frames += 1
+        profiler.count("sim.steps")
+        with profiler.scope("agent.act"):
+            collided = self._default_agent.act(action)
+
         # step physics by dt
-        self._sim.step_world(dt)
-        # print("World time is now: " + str(self._sim.get_world_time()))
+        with profiler.scope("sim.step_world"):
+            self._sim.step_world(dt)
 
-        observations = self.get_sensor_observations()
-        # Whether or not the action taken resulted in a collision
+        return collided
+
+    def step_async(self, action, dt=1.0 / 60.0):
+        r"""Like `step`, but only queues the readback of the observations
+
+        The frame is drawn and its transfer into pixel buffers is started,
+        then control returns without waiting for the GPU. Call `wait` to get
+        the observations. Up to two steps may be in flight, so one frame can
+        be rendered while the previous one is still being read back:
+
+        .. code:: py
+
+            sim.step_async(actions[0])
+            for action in actions[1:]:
+                sim.step_async(action)
+                observations = sim.wait()
+            observations = sim.wait()
+
+        Timings are accumulated in `async_readback_stats`.
+
+        Every `step_async` must be matched by a `wait`. `reset`,
+        `reconfigure`, `restore_state` and `close` finish the readbacks still
+        pending and discard their observations with a warning.
+        """
+        assert (
+            len(self._pending_steps) < _ASYNC_READBACK_DEPTH
+        ), f"At most {_ASYNC_READBACK_DEPTH} steps can be pending, call wait() first"
+
+        start = time.perf_counter()
+        collided = self._act_and_step_world(action, dt)
+        self._last_state = self._default_agent.get_state()
+
+        self._observation_generation += 1
+        for _, sensor in self._sensors.items():
+            sensor.draw_observation()
+            sensor.start_async_observation()
+
+        self._pending_steps.append((start, collided))
+
+    def wait(self, out: Optional[Dict[str, np.ndarray]] = None, copy: bool = True):
+        r"""Retrieves the observations of the oldest pending `step_async`
+
+        See `get_sensor_observations` for ``out`` and ``copy``.
+        """
+        assert len(self._pending_steps) > 0, "No step_async() pending"
+        start, collided = self._pending_steps.popleft()
+
+        wait_start = time.perf_counter()
+        out = out if out is not None else {}
+        observations = {}
+        for sensor_uuid, sensor in self._sensors.items():
+            observations[sensor_uuid] = sensor.finish_async_observation(
+                out=out.get(sensor_uuid), copy=copy
+            )
         observations["collided"] = collided
 
+        self.async_readback_stats.record(start, wait_start, time.perf_counter())
         return observations
 
+    def _drain_pending_steps(self):
+        # Pending reads refer to the current render targets, finish them
+        # before those go away
+        if len(self._pending_steps) > 0:
+            logger.warning(
+                f"Discarding the observations of {len(self._pending_steps)} "
+                "step_async() calls that were never waited for"
+            )
+        while len(self._pending_steps) > 0:
+            self.wait()
+
+    def enable_profiling(self, reset: bool = True):
+        r"""Starts recording per-stage wall times
+
+        :param reset: Discard the events recorded so far
+
+        The profiler is process-wide (see :ref:`habitat_sim.profiling.Profiler`),
+        so this also times the stages of any other simulator in the process.
+        """
+        if reset:
+            profiler.reset()
+        profiler.enable()
+
+    def disable_profiling(self):
+        r"""Stops recording, the events recorded so far are kept"""
+        profiler.disable()
+
+    def reset_profile(self):
+        r"""Discards the recorded events and counters"""
+        profiler.reset()
+
+    def get_profile(self, format: str = "dict") -> Dict:
+        r"""Returns the stage timings recorded since `enable_profiling`
+
+        :param format: :py:`"dict"` for per-stage counts, percentiles and
+            histograms (see :ref:`habitat_sim.profiling.Profiler.summary`) or
+            :py:`"chrome_trace"` for a trace that can be written with
+            :py:`json.dump` and loaded in ``chrome://tracing``
+        """
+        if format == "dict":
+            return profiler.summary()
+        elif format == "chrome_trace":
+            return profiler.chrome_trace()
+        else:
+            raise ValueError(f"Unknown profile format {format}")
+
     def make_greedy_follower(self, agent_id: int = 0, goal_radius: float = None):
         return GreedyGeodesicFollower(
             self.pathfinder, self.get_agent(agent_id), goal_radius
@@ -228,7 +908,8 @@ class Simulator:
 
     def _step_filter(self, start_pos, end_pos):
         if self.pathfinder.is_loaded:
-            end_pos = self.pathfinder.try_step(start_pos, end_pos)
+            with profiler.scope("nav.step_filter"):
+                end_pos = self.pathfinder.try_step(start_pos, end_pos)
 
         return end_pos
 
@@ -236,31 +917,38 @@ class Simulator:
         self.close()
 
     # --- physics functions ---
+    # Lazy observations taken before objects are added, removed or moved must
+    # not render the change
     def add_object(self, object_lib_index):
+        self._observation_generation += 1
         return self._sim.add_object(object_lib_index)
 
     def get_physics_object_library_size(self):
         return self._sim.get_physics_object_library_size()
 
     def remove_object(self, object_id):
+        self._observation_generation += 1
         return self._sim.remove_object(object_id)
 
     def get_existing_object_ids(self, scene_id=0):
         return self._sim.get_existing_object_ids(scene_id)
 
     def set_transformation(self, transform, object_id, scene_id=0):
+        self._observation_generation += 1
         self._sim.set_transformation(transform, object_id, scene_id)
 
     def get_transformation(self, object_id, scene_id=0):
         return self._sim.get_transformation(object_id, scene_id)
 
     def set_translation(self, translation, object_id, scene_id=0):
+        self._observation_generation += 1
         self._sim.set_translation(translation, object_id, scene_id)
 
     def get_translation(self, object_id, scene_id=0):
         return self._sim.get_translation(object_id, scene_id)
 
     def set_rotation(self, rotation, object_id, scene_id=0):
+        self._observation_generation += 1
         self._sim.set_rotation(rotation, object_id, scene_id)
 
     def get_rotation(self, object_id, scene_id=0):
@@ -272,9 +960,248 @@ class Simulator:
     def apply_torque(self, torque, object_id, scene_id=0):
         self._sim.apply_torque(torque, object_id, scene_id)
 
+    def set_linear_velocity(self, lin_vel, object_id, scene_id=0):
+        self._sim.set_linear_velocity(lin_vel, object_id, scene_id)
+
+    def get_linear_velocity(self, object_id, scene_id=0):
+        return self._sim.get_linear_velocity(object_id, scene_id)
+
+    def set_angular_velocity(self, ang_vel, object_id, scene_id=0):
+        self._sim.set_angular_velocity(ang_vel, object_id, scene_id)
+
+    def get_angular_velocity(self, object_id, scene_id=0):
+        return self._sim.get_angular_velocity(object_id, scene_id)
+
     def get_world_time(self, scene_id=0):
         return self._sim.get_world_time()
 
+    # --- snapshots ---
+    def _agent_nodes(self):
+        for agent in self.agents:
+            yield agent.scene_node
+            for _, sensor in agent.sensors.items():
+                yield sensor.node
+
+    def save_state(self, include_numpy_rng: bool = False) -> "SimulatorState":
+        r"""Captures everything needed to rewind the simulator to this point
+        with `restore_state`
+
+        :param include_numpy_rng: Also capture the state of numpy's global
+            random number generator, which `initialize_agent` draws from.
+            Restoring it rewinds that generator for all code in the process.
+
+        The poses of all agents and their sensors, the transformations and
+        velocities of all physics objects, the world time and the state of the
+        random number generators of the backend and of the PyRobot actuation
+        noise are copied into a `SimulatorState`. Nothing is rendered or read
+        from disk.
+        """
+        object_ids = np.array(self._sim.get_existing_object_ids(), dtype=np.int64)
+        num_objects = len(object_ids)
+        object_poses = np.empty((num_objects, 7), dtype=np.float32)
+        object_velocities = np.empty((num_objects, 6), dtype=np.float32)
+        for i, object_id in enumerate(object_ids.tolist()):
+            rotation = self._sim.get_rotation(object_id)
+            object_poses[i, :3] = list(self._sim.get_translation(object_id))
+            object_poses[i, 3:6] = list(rotation.vector)
+            object_poses[i, 6] = rotation.scalar
+            object_velocities[i, :3] = list(self._sim.get_linear_velocity(object_id))
+            object_velocities[i, 3:] = list(self._sim.get_angular_velocity(object_id))
+
+        return SimulatorState(
+            node_poses=np.array(
+                [_node_pose(node) for node in self._agent_nodes()], dtype=np.float32
+            ),
+            object_ids=object_ids,
+            object_poses=object_poses,
+            object_velocities=object_velocities,
+            world_time=self._sim.get_world_time(),
+            backend_random_state=self._sim.get_random_state(),
+            noise_random_state=get_noise_random_state(),
+            numpy_random_state=np.random.get_state() if include_numpy_rng else None,
+            num_total_frames=self._num_total_frames,
+        )
+
+    def restore_state(self, state: "SimulatorState"):
+        r"""Rewinds the simulator to a state returned by `save_state`
+
+        The simulator must not have been reconfigured in between. Objects
+        added since the snapshot are removed; restoring a snapshot that
+        contains objects which were removed since raises a
+        :py:`RuntimeError`, as they cannot be re-created with the same ids.
+        """
+        self._drain_pending_steps()
+
+        nodes = list(self._agent_nodes())
+        assert len(nodes) == len(
+            state.node_poses
+        ), "The agents were reconfigured since the state was saved"
+        for node, pose in zip(nodes, state.node_poses):
+            _set_node_pose(node, pose)
+
+        existing_ids = set(self._sim.get_existing_object_ids())
+        missing_ids = set(state.object_ids.tolist()) - existing_ids
+        if len(missing_ids) > 0:
+            raise RuntimeError(
+                f"Objects {sorted(missing_ids)} were removed since the state was"
+                " saved and cannot be restored"
+            )
+        for object_id in existing_ids - set(state.object_ids.tolist()):
+            self._sim.remove_object(object_id)
+
+        for i, object_id in enumerate(state.object_ids.tolist()):
+            pose = state.object_poses[i]
+            self._sim.set_translation(mn.Vector3(pose[:3]), object_id)
+            self._sim.set_rotation(
+                mn.Quaternion(mn.Vector3(pose[3:6]), pose[6]), object_id
+            )
+            self._sim.set_linear_velocity(
+                mn.Vector3(state.object_velocities[i, :3]), object_id
+            )
+            self._sim.set_angular_velocity(
+                mn.Vector3(state.object_velocities[i, 3:]), object_id
+            )
+
+        self._sim.set_world_time(state.world_time)
+        self._sim.set_random_state(state.backend_random_state)
+        set_noise_random_state(state.noise_random_state)
+        if state.numpy_random_state is not None:
+            np.random.set_state(state.numpy_random_state)
+        self._num_total_frames = state.num_total_frames
+
+        self._observation_generation += 1
+        self._last_state = self._default_agent.get_state()
+
+
+def _node_pose(node) -> List[float]:
+    translation = node.translation
+    rotation = node.rotation
+    return [*translation, *rotation.vector, rotation.scalar]
+
+
+def _set_node_pose(node, pose: np.ndarray):
+    node.translation = mn.Vector3(pose[:3])
+    node.rotation = mn.Quaternion(mn.Vector3(pose[3:6]), pose[6])
+
+
+@attr.s(auto_attribs=True, slots=True)
+class SimulatorState(object):
+    r"""Snapshot of a :ref:`Simulator`, see `Simulator.save_state`
+
+    :property node_poses: :py:`(K, 7)` local translation and rotation
+        (:py:`x, y, z` of the vector part, then the scalar) of the scene node
+        of every agent, each followed by the nodes of its sensors
+    :property object_ids: :py:`(M,)` ids of the physics objects
+    :property object_poses: :py:`(M, 7)` translation and rotation of the
+        physics objects, laid out like ``node_poses``
+    :property object_velocities: :py:`(M, 6)` linear, then angular velocity
+        of the physics objects
+    :property world_time: Time of the simulated world
+    :property backend_random_state: State of the backend's random number
+        generator
+    :property noise_random_state: State of the generator of the PyRobot
+        actuation noise
+    :property numpy_random_state: State of numpy's global random number
+        generator, :py:`None` unless saved with ``include_numpy_rng``
+    :property num_total_frames: Number of steps taken
+
+    All members are plain arrays or values, so snapshots are cheap to keep
+    around in large numbers and can be pickled.
+    """
+    node_poses: np.ndarray
+    object_ids: np.ndarray
+    object_poses: np.ndarray
+    object_velocities: np.ndarray
+    world_time: float
+    backend_random_state: bytes
+    noise_random_state: bytes
+    numpy_random_state: Optional[tuple]
+    num_total_frames: int
+
+
+class LazyObservations(MutableMapping):
+    r"""Observations that are only rendered when they are accessed
+
+    Each sensor is drawn and read back the first time its uuid is looked up
+    and the result is cached. Other entries, such as :py:`"collided"`, are
+    stored as in a normal dict. Because the frame is drawn at access time,
+    sensor entries must be read before the simulator is stepped or reset
+    again, the default agent is moved, or physics objects are added, removed
+    or moved; later accesses raise a :ref:`RuntimeError`.
+    """
+
+    def __init__(self, sim: "Simulator", sensors: Dict, out: Dict, copy: bool):
+        self._sim = sim
+        self._sensors = sensors
+        self._out = out
+        self._copy = copy
+        self._generation = sim._observation_generation
+        self._values: Dict = {}
+
+    def __getitem__(self, key):
+        if key in self._values:
+            return self._values[key]
+        if key not in self._sensors:
+            raise KeyError(key)
+
+        if self._sim._observation_generation != self._generation or any(
+            observer.changed for observer in self._sim._observers
+        ):
+            raise RuntimeError(
+                f"Observation {key} requested after the simulator was stepped"
+                " or the scene changed"
+            )
+
+        sensor = self._sensors[key]
+        sensor.draw_observation()
+        obs = sensor.get_observation(out=self._out.get(key), copy=self._copy)
+        self._values[key] = obs
+        return obs
+
+    def __setitem__(self, key, value):
+        self._values[key] = value
+
+    def __delitem__(self, key):
+        if key in self._sensors:
+            self._sensors = {k: v for k, v in self._sensors.items() if k != key}
+            self._values.pop(key, None)
+        else:
+            del self._values[key]
+
+    def __iter__(self):
+        yield from self._sensors
+        for key in self._values:
+            if key not in self._sensors:
+                yield key
+
+    def __len__(self):
+        return len(self._sensors) + sum(
+            1 for key in self._values if key not in self._sensors
+        )
+
+    def __contains__(self, key):
+        return key in self._sensors or key in self._values
+
+    @property
+    def rendered(self) -> List[str]:
+        r"""uuids of the sensors that have been rendered so far"""
+        return [key for key in self._sensors if key in self._values]
+
+
+def _observation_shape_and_dtype(spec: hsim.SensorSpec):
+    r"""Shape and dtype of the numpy observation produced by a sensor
+
+    :param spec: Specification of the sensor
+    :return: :py:`(shape, dtype)` tuple
+    """
+    resolution = (spec.resolution[0], spec.resolution[1])
+    if spec.sensor_type == hsim.SensorType.SEMANTIC:
+        return resolution, np.uint32
+    elif spec.sensor_type == hsim.SensorType.DEPTH:
+        return resolution, np.float32
+    else:
+        return resolution + (spec.channels,), np.uint8
+
 
 class Sensor:
     r"""Wrapper around habitat_sim.Sensor
@@ -318,26 +1245,12 @@ class Sensor:
                 self._buffer = torch.empty(
                     resolution[0], resolution[1], 4, dtype=torch.uint8, device=device
                 )
+            self._pending_gpu_observations = []
         else:
-            if self._spec.sensor_type == hsim.SensorType.SEMANTIC:
-                self._buffer = np.empty(
-                    (self._spec.resolution[0], self._spec.resolution[1]),
-                    dtype=np.uint32,
-                )
-            elif self._spec.sensor_type == hsim.SensorType.DEPTH:
-                self._buffer = np.empty(
-                    (self._spec.resolution[0], self._spec.resolution[1]),
-                    dtype=np.float32,
-                )
-            else:
-                self._buffer = np.empty(
-                    (
-                        self._spec.resolution[0],
-                        self._spec.resolution[1],
-                        self._spec.channels,
-                    ),
-                    dtype=np.uint8,
-                )
+            self._buffer = np.empty(*_observation_shape_and_dtype(self._spec))
+            # Double buffering for observations returned without a copy
+            self._buffers = [self._buffer, np.empty_like(self._buffer)]
+            self._front_buffer = 0
 
     def draw_observation(self):
         # draw the scene with the visual sensor:
@@ -375,15 +1288,96 @@ class Sensor:
         agent_node = self._agent.scene_node
         agent_node.parent = scene.get_root_node()
 
-        with self._sensor_object.render_target as tgt:
-            self._sim.renderer.draw(self._sensor_object, scene)
+        with profiler.scope("sensor.draw"):
+            with self._sensor_object.render_target as tgt:
+                self._sim.renderer.draw(self._sensor_object, scene)
+
+    def _image_view(self, buffer: np.ndarray):
+        size = self._sensor_object.framebuffer_size
+        if self._spec.sensor_type == hsim.SensorType.SEMANTIC:
+            return mn.MutableImageView2D(mn.PixelFormat.R32UI, size, buffer)
+        elif self._spec.sensor_type == hsim.SensorType.DEPTH:
+            return mn.MutableImageView2D(mn.PixelFormat.R32F, size, buffer)
+        else:
+            return mn.MutableImageView2D(
+                mn.PixelFormat.RGBA8_UNORM,
+                size,
+                buffer.reshape(self._spec.resolution[0], -1),
+            )
+
+    def _output_buffer(self, out, copy: bool) -> np.ndarray:
+        if out is not None:
+            assert (
+                out.shape == self._buffer.shape and out.dtype == self._buffer.dtype
+            ), "out does not match the observation's shape or dtype"
+            assert out.flags.c_contiguous, "out must be C-contiguous"
+            return out
+
+        if not copy:
+            self._front_buffer = 1 - self._front_buffer
+            return self._buffers[self._front_buffer]
+
+        return np.empty_like(self._buffer)
+
+    def start_async_observation(self):
+        r"""Starts reading back the last frame drawn by `draw_observation`
+        without waiting for the GPU. Retrieve the result with
+        `finish_async_observation`.
+
+        At most two reads may be pending per sensor. gpu2gpu sensors are read
+        back synchronously.
+        """
+        if self._spec.gpu2gpu_transfer:
+            self._pending_gpu_observations.append(self.get_observation())
+            return
+
+        tgt = self._sensor_object.render_target
+        with profiler.scope("sensor.start_readback"):
+            if self._spec.sensor_type == hsim.SensorType.SEMANTIC:
+                tgt.start_read_frame_object_id()
+            elif self._spec.sensor_type == hsim.SensorType.DEPTH:
+                tgt.start_read_frame_depth()
+            else:
+                tgt.start_read_frame_rgba()
+
+    def finish_async_observation(self, out=None, copy: bool = True):
+        r"""Waits for the oldest read started with `start_async_observation`
 
-    def get_observation(self):
+        See `get_observation` for ``out`` and ``copy``.
+        """
+        if self._spec.gpu2gpu_transfer:
+            obs = self._pending_gpu_observations.pop(0)
+            return obs if out is None else out.copy_(obs)
+
+        buffer = self._output_buffer(out, copy)
+        with profiler.scope("sensor.readback"):
+            self._sensor_object.render_target.finish_read_frame(
+                self._image_view(buffer), flip_vertically=True
+            )
+        if out is None and not copy:
+            buffer = buffer.view()
+            buffer.flags.writeable = False
+
+        return buffer
+
+    def get_observation(self, out=None, copy: bool = True):
+        r"""Reads back the last frame drawn by `draw_observation`
+
+        :param out: Preallocated, C-contiguous array to read the observation
+            into. Must have the shape and dtype of the observation (or be a
+            tensor on the sensor's device for gpu2gpu sensors). Returned as is.
+        :param copy: If :py:`False` and no ``out`` is given, return a read-only
+            view into one of two internal buffers instead of a new array. The
+            view stays valid until the next-but-one call to this function.
+        :return: The observation
+        """
 
         tgt = self._sensor_object.render_target
 
         if self._spec.gpu2gpu_transfer:
-            with torch.cuda.device(self._buffer.device):
+            with torch.cuda.device(self._buffer.device), profiler.scope(
+                "sensor.readback"
+            ):
                 if self._spec.sensor_type == hsim.SensorType.SEMANTIC:
                     tgt.read_frame_object_id_gpu(self._buffer.data_ptr())
                 elif self._spec.sensor_type == hsim.SensorType.DEPTH:
@@ -391,25 +1385,25 @@ class Sensor:
                 else:
                     tgt.read_frame_rgba_gpu(self._buffer.data_ptr())
 
+                if out is not None:
+                    return out.copy_(self._buffer.flip(0))
+
                 return self._buffer.flip(0).clone()
         else:
-            size = self._sensor_object.framebuffer_size
+            buffer = self._output_buffer(out, copy)
+            # The render target flips the rows in place so that the result is
+            # already top-to-bottom and no extra copy is needed
+            view = self._image_view(buffer)
+            with profiler.scope("sensor.readback"):
+                if self._spec.sensor_type == hsim.SensorType.SEMANTIC:
+                    tgt.read_frame_object_id(view, flip_vertically=True)
+                elif self._spec.sensor_type == hsim.SensorType.DEPTH:
+                    tgt.read_frame_depth(view, flip_vertically=True)
+                else:
+                    tgt.read_frame_rgba(view, flip_vertically=True)
 
-            if self._spec.sensor_type == hsim.SensorType.SEMANTIC:
-                tgt.read_frame_object_id(
-                    mn.MutableImageView2D(mn.PixelFormat.R32UI, size, self._buffer)
-                )
-            elif self._spec.sensor_type == hsim.SensorType.DEPTH:
-                tgt.read_frame_depth(
-                    mn.MutableImageView2D(mn.PixelFormat.R32F, size, self._buffer)
-                )
-            else:
-                tgt.read_frame_rgba(
-                    mn.MutableImageView2D(
-                        mn.PixelFormat.RGBA8_UNORM,
-                        size,
-                        self._buffer.reshape(self._spec.resolution[0], -1),
-                    )
-                )
+            if out is None and not copy:
+                buffer = buffer.view()
+                buffer.flags.writeable = False
 
-            return np.flip(self._buffer, axis=0).copy()
+            return buffer
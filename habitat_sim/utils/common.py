@@ -5,7 +5,7 @@
 # LICENSE file in the root directory of this source tree.
 
 from io import BytesIO
-from typing import List, Tuple
+from typing import List, Sequence, Tuple
 from urllib.request import urlopen
 from zipfile import ZipFile
 
@@ -148,6 +148,124 @@ def quat_rotate_vector(q: np.quaternion, v: np.ndarray) -> np.ndarray:
     return (q * vq * q.inverse()).imag
 
 
+# Batched counterparts of the functions above. Quaternions are given as
+# (..., 4) float arrays of coefficients in the [b, c, d, a] format of
+# quat_to_coeffs and vectors as (..., 3) arrays, all leading dimensions
+# broadcast.
+
+
+def quats_to_coeffs(quats: np.ndarray) -> np.ndarray:
+    r"""Batched `quat_to_coeffs`
+
+    :param quats: Array of quaternions
+    :return: :py:`(..., 4)` coefficients
+    """
+    return quaternion.as_float_array(quats)[..., [1, 2, 3, 0]]
+
+
+def quats_from_coeffs(coeffs: np.ndarray) -> np.ndarray:
+    r"""Batched `quat_from_coeffs`
+
+    :param coeffs: :py:`(..., 4)` coefficients
+    :return: Array of quaternions
+    """
+    coeffs = np.asarray(coeffs, dtype=np.float64)
+    return quaternion.as_quat_array(coeffs[..., [3, 0, 1, 2]])
+
+
+def quats_to_magnum(coeffs: np.ndarray) -> List[mn.Quaternion]:
+    r"""Batched `quat_to_magnum`
+
+    :param coeffs: :py:`(N, 4)` coefficients
+    """
+    return [mn.Quaternion(mn.Vector3(c[:3]), c[3]) for c in np.asarray(coeffs)]
+
+
+def quats_from_magnum(quats: Sequence[mn.Quaternion]) -> np.ndarray:
+    r"""Batched `quat_from_magnum`
+
+    :return: :py:`(N, 4)` coefficients
+    """
+    coeffs = [[*q.vector, q.scalar] for q in quats]
+    return np.array(coeffs, dtype=np.float64).reshape(-1, 4)
+
+
+def vectors_to_magnum(vectors: np.ndarray) -> List[mn.Vector3]:
+    r""":py:`(N, 3)` array to a list of :ref:`mn.Vector3`"""
+    return [mn.Vector3(v) for v in np.asarray(vectors, dtype=np.float32)]
+
+
+def vectors_from_magnum(vectors: Sequence[mn.Vector3]) -> np.ndarray:
+    r"""List of :ref:`mn.Vector3` to an :py:`(N, 3)` array"""
+    return np.array([list(v) for v in vectors], dtype=np.float64).reshape(-1, 3)
+
+
+def quats_conjugate(coeffs: np.ndarray) -> np.ndarray:
+    r"""Conjugates of the quaternions, their inverses if they are unit"""
+    coeffs = np.asarray(coeffs, dtype=np.float64)
+    return np.concatenate([-coeffs[..., :3], coeffs[..., 3:]], axis=-1)
+
+
+def quats_multiply(q1: np.ndarray, q2: np.ndarray) -> np.ndarray:
+    r"""Hamilton products :math:`q_1 q_2` of two arrays of quaternions"""
+    q1 = np.asarray(q1, dtype=np.float64)
+    q2 = np.asarray(q2, dtype=np.float64)
+    v1, w1 = q1[..., :3], q1[..., 3:]
+    v2, w2 = q2[..., :3], q2[..., 3:]
+
+    v = w1 * v2 + w2 * v1 + np.cross(v1, v2)
+    w = w1 * w2 - np.sum(v1 * v2, axis=-1, keepdims=True)
+    return np.concatenate([v, w], axis=-1)
+
+
+def quats_from_angle_axis(theta: np.ndarray, axis: np.ndarray) -> np.ndarray:
+    r"""Batched `quat_from_angle_axis`
+
+    :param theta: :py:`(...)` angles to rotate about the axes by
+    :param axis: :py:`(..., 3)` axes to rotate about, need not be normalized
+    :return: :py:`(..., 4)` coefficients
+    """
+    theta = np.asarray(theta, dtype=np.float64)[..., np.newaxis]
+    axis = np.asarray(axis, dtype=np.float64)
+    axis = axis / np.linalg.norm(axis, axis=-1, keepdims=True)
+
+    v = np.sin(theta / 2) * axis
+    w = np.broadcast_to(np.cos(theta / 2), v.shape[:-1] + (1,))
+    return np.concatenate([v, w], axis=-1)
+
+
+def angles_between_quats(q1: np.ndarray, q2: np.ndarray) -> np.ndarray:
+    r"""Batched `angle_between_quats`
+
+    :return: :py:`(...)` angular distances in radians
+    """
+    dq = quats_multiply(quats_conjugate(q1), q2)
+    return 2 * np.arctan2(np.linalg.norm(dq[..., :3], axis=-1), np.abs(dq[..., 3]))
+
+
+def quats_rotate_vectors(q: np.ndarray, v: np.ndarray) -> np.ndarray:
+    r"""Batched `quat_rotate_vector`
+
+    :param q: :py:`(..., 4)` coefficients
+    :param v: :py:`(..., 3)` vectors
+    :return: :py:`(..., 3)` rotated vectors
+
+    Like `quat_rotate_vector`, this computes :math:`q v q^{-1}`, so the
+    quaternions need not be unit.
+    """
+    q = np.asarray(q, dtype=np.float64)
+    v = np.asarray(v, dtype=np.float64)
+    u, w = q[..., :3], q[..., 3:]
+
+    uv = np.cross(u, v)
+    rotated = (
+        (w * w - np.sum(u * u, axis=-1, keepdims=True)) * v
+        + 2 * np.sum(u * v, axis=-1, keepdims=True) * u
+        + 2 * w * uv
+    )
+    return rotated / np.sum(q * q, axis=-1, keepdims=True)
+
+
 def download_and_unzip(file_url, local_directory):
     response = urlopen(file_url)
     zipfile = ZipFile(BytesIO(response.read()))
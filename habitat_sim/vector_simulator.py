@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Facebook, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import ctypes
+import multiprocessing
+from multiprocessing.connection import Connection
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from habitat_sim.logging import logger
+from habitat_sim.simulator import (
+    Configuration,
+    Simulator,
+    _observation_shape_and_dtype,
+)
+
+__all__ = ["VectorSimulator"]
+
+_STEP = "step"
+_RESET = "reset"
+_CALL = "call"
+_CLOSE = "close"
+
+
+def _as_array(raw, shape: Tuple[int, ...], dtype) -> np.ndarray:
+    return np.frombuffer(raw, dtype=dtype).reshape(shape)
+
+
+def _worker_loop(
+    connection: Connection,
+    make_config_fn: Callable[..., Configuration],
+    config_args: tuple,
+    index: int,
+    buffers: Dict[str, Tuple[Any, Tuple[int, ...], Any]],
+):
+    r"""Runs a single :ref:`Simulator` and services commands sent over
+    ``connection``. Sensor observations are read back directly into the shared
+    ``buffers`` at ``[slot, index]``; only the remaining (small) entries of the
+    observation dict are sent back through the pipe.
+    """
+    sim = None
+    try:
+        sim = Simulator(make_config_fn(*config_args))
+        views = {
+            uuid: _as_array(raw, shape, dtype)
+            for uuid, (raw, shape, dtype) in buffers.items()
+        }
+
+        def _out(slot):
+            return {uuid: view[slot, index] for uuid, view in views.items()}
+
+        def _write(out, observations):
+            extra = {}
+            for key, value in observations.items():
+                if key not in out:
+                    extra[key] = value
+                elif value is not out[key]:
+                    out[key][...] = value
+            return extra
+
+        while True:
+            command, data = connection.recv()
+            try:
+                if command == _STEP:
+                    slot, action = data
+                    out = _out(slot)
+                    result = _write(out, sim.step(action, out=out))
+                elif command == _RESET:
+                    out = _out(data)
+                    result = _write(out, sim.reset(out=out))
+                elif command == _CALL:
+                    name, args, kwargs = data
+                    result = getattr(sim, name)
+                    if callable(result):
+                        result = result(*args, **kwargs)
+                elif command == _CLOSE:
+                    break
+                else:
+                    raise NotImplementedError(f"Unknown command {command}")
+            except Exception as e:
+                connection.send((False, e))
+            else:
+                connection.send((True, result))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if sim is not None:
+            sim.close()
+        connection.close()
+
+
+class VectorSimulator:
+    r"""Runs several :ref:`Simulator` instances, each in its own worker
+    process, and steps them in lockstep
+
+    :param make_config_fn: Function that builds the :ref:`Configuration` for
+        a simulator. It is called once per environment in the worker process
+        (and once in the parent to size the observation buffers), so it must
+        be picklable, i.e. defined at module level.
+    :param config_args: One tuple of arguments to ``make_config_fn`` per
+        environment. The number of environments is :py:`len(config_args)`.
+    :param ring_size: Number of observation batches kept in shared memory.
+        Arrays returned by `step` and `reset` are views into this ring and stay
+        valid for the next :py:`ring_size - 1` calls.
+    :param multiprocessing_start_method: Start method for the workers. Fork is
+        not safe once a GL context exists, hence the default of forkserver.
+
+    Sensor observations are written by the workers straight into
+    shared-memory arrays of shape :py:`(num_envs, *sensor_shape)` per sensor
+    uuid, so nothing larger than the action and the collision flags is ever
+    pickled per step. Only the sensors of each environment's default agent are
+    batched and all environments must declare the same sensors.
+    """
+
+    def __init__(
+        self,
+        make_config_fn: Callable[..., Configuration],
+        config_args: Sequence[tuple],
+        ring_size: int = 2,
+        multiprocessing_start_method: str = "forkserver",
+    ):
+        assert len(config_args) > 0, "VectorSimulator needs an environment"
+        assert ring_size > 0
+
+        self.num_envs = len(config_args)
+        self._ring_size = ring_size
+        self._slot = ring_size - 1
+        self._closed = True
+
+        shapes = None
+        for args in config_args:
+            config = make_config_fn(*args)
+            agent_cfg = config.agents[config.sim_cfg.default_agent_id]
+            env_shapes = {}
+            for spec in agent_cfg.sensor_specifications:
+                assert (
+                    not spec.gpu2gpu_transfer
+                ), "VectorSimulator does not support gpu2gpu_transfer sensors"
+                env_shapes[spec.uuid] = _observation_shape_and_dtype(spec)
+
+            if shapes is None:
+                shapes = env_shapes
+            assert (
+                shapes == env_shapes
+            ), "All environments of a VectorSimulator must have the same sensors"
+
+        ctx = multiprocessing.get_context(multiprocessing_start_method)
+
+        self._buffers = {}
+        self._views: Dict[str, np.ndarray] = {}
+        for uuid, (shape, dtype) in shapes.items():
+            full_shape = (ring_size, self.num_envs) + tuple(shape)
+            nbytes = int(np.prod(full_shape)) * np.dtype(dtype).itemsize
+            raw = ctx.RawArray(ctypes.c_uint8, nbytes)
+            self._buffers[uuid] = (raw, full_shape, dtype)
+            self._views[uuid] = _as_array(raw, full_shape, dtype)
+
+        self._connections: List[Connection] = []
+        self._workers = []
+        for index, args in enumerate(config_args):
+            parent_conn, worker_conn = ctx.Pipe()
+            worker = ctx.Process(
+                target=_worker_loop,
+                args=(worker_conn, make_config_fn, args, index, self._buffers),
+                daemon=True,
+            )
+            worker.start()
+            worker_conn.close()
+            self._connections.append(parent_conn)
+            self._workers.append(worker)
+
+        self._closed = False
+
+    @property
+    def observation_shapes(self) -> Dict[str, Tuple[int, ...]]:
+        r"""Batched observation shape for every sensor uuid"""
+        return {uuid: view.shape[1:] for uuid, view in self._views.items()}
+
+    def _next_slot(self) -> int:
+        self._slot = (self._slot + 1) % self._ring_size
+        return self._slot
+
+    def _receive(self, indices):
+        # Drain every pipe before raising so the workers stay in sync
+        responses = [self._connections[index].recv() for index in indices]
+        for ok, result in responses:
+            if not ok:
+                raise result
+
+        return [result for _, result in responses]
+
+    def _batch(self, slot, extras: List[Dict]) -> Dict[str, Any]:
+        observations: Dict[str, Any] = {
+            uuid: view[slot] for uuid, view in self._views.items()
+        }
+        if len(extras) == self.num_envs and len(extras) > 0:
+            for key in extras[0]:
+                observations[key] = np.array([extra[key] for extra in extras])
+
+        return observations
+
+    def step(self, actions: Sequence[Any]) -> Dict[str, Any]:
+        r"""Steps every environment with its action
+
+        :param actions: One action per environment
+        :return: Observations batched along the first axis. Sensor entries are
+            views into the shared ring, other entries (e.g. :py:`"collided"`)
+            are stacked into arrays.
+        """
+        assert (
+            len(actions) == self.num_envs
+        ), "Need exactly one action per environment"
+        slot = self._next_slot()
+        for conn, action in zip(self._connections, actions):
+            conn.send((_STEP, (slot, action)))
+
+        return self._batch(slot, self._receive(range(self.num_envs)))
+
+    def reset(self, mask: Optional[Sequence[bool]] = None) -> Dict[str, np.ndarray]:
+        r"""Resets the environments selected by ``mask``
+
+        :param mask: Which environments to reset, all of them if :py:`None`
+        :return: Batched sensor observations. Environments that were not reset
+            keep their most recent observation.
+        """
+        if mask is None:
+            mask = [True] * self.num_envs
+        assert len(mask) == self.num_envs
+
+        prev_slot = self._slot
+        slot = self._next_slot()
+        indices = [i for i in range(self.num_envs) if mask[i]]
+        for i in indices:
+            self._connections[i].send((_RESET, slot))
+
+        for i in range(self.num_envs):
+            if not mask[i]:
+                for view in self._views.values():
+                    view[slot, i] = view[prev_slot, i]
+
+        self._receive(indices)
+        return self._batch(slot, [])
+
+    def call(
+        self,
+        method: str,
+        args: Sequence[Any] = (),
+        kwargs: Optional[Dict[str, Any]] = None,
+        indices: Optional[Sequence[int]] = None,
+    ) -> List[Any]:
+        r"""Calls a method (or reads an attribute) of the :ref:`Simulator` in
+        each selected environment
+
+        :param method: Name of the method or attribute
+        :param args: Positional arguments for the method
+        :param kwargs: Keyword arguments for the method
+        :param indices: Environments to call, all of them if :py:`None`
+        :return: The (picklable) return values, in the order of ``indices``
+        """
+        if indices is None:
+            indices = range(self.num_envs)
+        kwargs = kwargs if kwargs is not None else {}
+
+        for i in indices:
+            self._connections[i].send((_CALL, (method, tuple(args), kwargs)))
+
+        return self._receive(indices)
+
+    def close(self):
+        if self._closed:
+            return
+
+        for conn in self._connections:
+            try:
+                conn.send((_CLOSE, None))
+            except (BrokenPipeError, EOFError):
+                logger.warning("VectorSimulator worker exited before close")
+
+        for worker in self._workers:
+            worker.join()
+
+        for conn in self._connections:
+            conn.close()
+
+        self._closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __del__(self):
+        self.close()
@@ -2,7 +2,9 @@
 // This source code is licensed under the MIT license found in the
 // LICENSE file in the root directory of this source tree.
 
+#include <fstream>
 #include <functional>
+#include <mutex>
 
 #include <Corrade/Containers/ArrayViewStl.h>
 #include <Corrade/PluginManager/Manager.h>
@@ -23,6 +25,7 @@
 #include <Magnum/Trade/SceneData.h>
 #include <Magnum/Trade/TextureData.h>
 
+#include "esp/core/Profiler.h"
 #include "esp/geo/geo.h"
 #include "esp/gfx/GenericDrawable.h"
 #include "esp/gfx/PrimitiveIDDrawable.h"
@@ -55,9 +58,77 @@ namespace Cr = Corrade;
 namespace esp {
 namespace assets {
 
+namespace {
+
+//! Drops the cache's reference to the assets in the inclusive index range
+template <typename T>
+void releaseRange(std::vector<std::shared_ptr<T>>& assets,
+                  const std::pair<int, int>& range) {
+  if (range.first < 0)
+    return;
+  for (int i = range.first;
+       i <= range.second && i < static_cast<int>(assets.size()); ++i) {
+    assets[i].reset();
+  }
+}
+
+//! Reads a file without keeping its contents, so that it is served from the
+//! OS page cache when it is loaded for real
+void readAhead(const std::string& filename) {
+  std::ifstream file(filename, std::ifstream::in | std::ifstream::binary);
+  std::vector<char> chunk(1 << 20);
+  while (file.read(chunk.data(), chunk.size()) || file.gcount() > 0) {
+  }
+}
+
+//! State of the scene cache shared by all resource managers
+struct SceneCacheTotals {
+  std::mutex mutex;
+  ResourceManager::SceneCacheStats stats;
+  // Ticks on every use of a cached scene, orders the entries of all managers
+  uint64_t clock = 0;
+};
+
+SceneCacheTotals& sceneCacheTotals() {
+  static SceneCacheTotals totals;
+  return totals;
+}
+
+//! Feature of the nodes instantiating a cached scene, holding a reference to
+//! its cache entry so that the scene is not evicted while it is drawn
+class SceneAssetReference : public Magnum::SceneGraph::AbstractFeature3D {
+ public:
+  SceneAssetReference(scene::SceneNode& node,
+                      std::shared_ptr<const std::string> users)
+      : Magnum::SceneGraph::AbstractFeature3D{node},
+        users_{std::move(users)} {}
+
+ private:
+  std::shared_ptr<const std::string> users_;
+};
+
+}  // namespace
+
+ResourceManager::ResourceManager() {
+  importerManager_.setPreferredPlugins("GltfImporter", {"TinyGltfImporter"});
+#ifdef ESP_BUILD_ASSIMP_SUPPORT
+  importerManager_.setPreferredPlugins("ObjImporter", {"AssimpImporter"});
+#endif
+}
+
+ResourceManager::~ResourceManager() {
+  SceneCacheTotals& totals = sceneCacheTotals();
+  std::lock_guard<std::mutex> lock(totals.mutex);
+  for (const auto& entry : sceneCache_) {
+    totals.stats.bytes -= entry.second.size;
+  }
+  totals.stats.entries -= sceneCache_.size();
+}
+
 bool ResourceManager::loadScene(const AssetInfo& info,
                                 scene::SceneNode* parent, /* = nullptr */
                                 DrawableGroup* drawables /* = nullptr */) {
+  ESP_PROFILE_SCOPE("assets.load_scene");
   // scene mesh loading
   bool meshSuccess = true;
   if (info.filepath.compare(EMPTY_SCENE) != 0) {
@@ -65,6 +136,11 @@ bool ResourceManager::loadScene(const AssetInfo& info,
       LOG(ERROR) << "Cannot load from file " << info.filepath;
       meshSuccess = false;
     } else {
+      finishPrefetch(info.filepath);
+      const bool wasCached = resourceDict_.count(info.filepath) > 0;
+      // The nodes the scene is instantiated in are created after this one
+      MagnumObject* lastChild =
+          parent != nullptr ? parent->children().last() : nullptr;
       if (info.type == AssetType::INSTANCE_MESH) {
         meshSuccess = loadInstanceMeshData(info, parent, drawables);
       } else if (info.type == AssetType::FRL_PTEX_MESH) {
@@ -81,6 +157,18 @@ bool ResourceManager::loadScene(const AssetInfo& info,
       if (meshSuccess) {
         physicsSceneLibrary_[info.filepath].setString("renderMeshHandle",
                                                       info.filepath);
+        std::shared_ptr<const std::string> users =
+            touchSceneCacheEntry(info.filepath, wasCached);
+        if (!users) {
+          releaseImporter(info.filepath);
+        } else if (parent != nullptr) {
+          auto* child = lastChild != nullptr ? lastChild->nextSibling()
+                                             : parent->children().first();
+          for (; child != nullptr; child = child->nextSibling()) {
+            new SceneAssetReference{static_cast<scene::SceneNode&>(*child),
+                                    users};
+          }
+        }
       }
     }
   } else {
@@ -530,6 +618,8 @@ int ResourceManager::loadObject(const std::string& objPhysConfigFilename) {
       LOG(ERROR) << "Failed to load a physical object's render mesh: "
                  << objPhysConfigFilename << ", " << renderMeshFilename;
     }
+    // Instances of the object open an importer of their own
+    releaseImporter(renderMeshFilename);
   }
   //! Load collision mesh
   if (!collisionMeshFilename.empty()) {
@@ -548,6 +638,7 @@ int ResourceManager::loadObject(const std::string& objPhysConfigFilename) {
       LOG(ERROR) << "Failed to load a physical object's collision mesh: "
                  << objPhysConfigFilename << ", " << collisionMeshFilename;
     }
+    releaseImporter(collisionMeshFilename);
   }
 
   // NOTE: if we want to save these after edit we need to save the moved
@@ -793,20 +884,25 @@ bool ResourceManager::loadGeneralMeshData(
   MeshMetaData metaData;
   std::vector<Magnum::UnsignedInt> magnumData;
 
-  Magnum::PluginManager::Manager<Importer> manager;
-  std::unique_ptr<Importer> importer =
-      manager.loadAndInstantiate("AnySceneImporter");
-  manager.setPreferredPlugins("GltfImporter", {"TinyGltfImporter"});
-#ifdef ESP_BUILD_ASSIMP_SUPPORT
-  manager.setPreferredPlugins("ObjImporter", {"AssimpImporter"});
-#endif
-
-  // Optional File loading
-  if (!fileIsLoaded) {
-    if (!importer->openFile(filename)) {
+  // Reuse the importer of a previous load if there is one, as opening the
+  // file again re-parses all of it
+  Importer* importer = nullptr;
+  auto importerIt = importerDict_.find(filename);
+  if (importerIt != importerDict_.end() && importerIt->second->isOpened()) {
+    importer = importerIt->second.get();
+  } else if (!fileIsLoaded || drawData) {
+    std::unique_ptr<Importer> newImporter =
+        importerManager_.loadAndInstantiate("AnySceneImporter");
+    if (!newImporter || !newImporter->openFile(filename)) {
       LOG(ERROR) << "Cannot open file " << filename;
       return false;
     }
+    importer = newImporter.get();
+    importerDict_[filename] = std::move(newImporter);
+  }
+
+  // Optional File loading
+  if (!fileIsLoaded) {
     // if this is a new file, load it and add it to the dictionary
     loadTextures(*importer, &metaData);
     loadMaterials(*importer, &metaData);
@@ -862,15 +958,6 @@ bool ResourceManager::loadGeneralMeshData(
       }
     }  // forceReload
 
-    if (fileIsLoaded) {
-      // if the file was loaded, the importer didn't open the file, so open it
-      // before adding components
-      if (!importer->openFile(filename)) {
-        LOG(ERROR) << "Cannot open file " << filename;
-        return false;
-      }
-    }
-
     const quatf transform = info.frame.rotationFrameToWorld();
     newNode.setRotation(Magnum::Quaternion(transform));
     // Recursively add all children
@@ -1120,6 +1207,8 @@ bool ResourceManager::loadSUNCGHouseFile(const AssetInfo& houseInfo,
 
   // store nodeIds to obtain linearized index for semantic masks
   std::vector<std::string> nodeIds;
+  // object meshes, whose importers are closed once the house is loaded
+  std::set<std::string> objectFilenames;
 
   for (const auto& level : levels) {
     const auto& nodes = level["nodes"].GetArray();
@@ -1140,6 +1229,7 @@ bool ResourceManager::loadSUNCGHouseFile(const AssetInfo& houseInfo,
         objectNode.setId(nodeIndex);
         if (info.type == AssetType::SUNCG_OBJECT) {
           loadGeneralMeshData(info, &objectNode, drawables);
+          objectFilenames.insert(info.filepath);
         }
         return objectNode;
       };
@@ -1187,8 +1277,169 @@ bool ResourceManager::loadSUNCGHouseFile(const AssetInfo& houseInfo,
       }
     }
   }
+  for (const std::string& filename : objectFilenames) {
+    releaseImporter(filename);
+  }
   return true;
 }
 
+std::shared_ptr<const std::string> ResourceManager::touchSceneCacheEntry(
+    const std::string& filename,
+    bool wasCached) {
+  SceneCacheTotals& totals = sceneCacheTotals();
+  std::lock_guard<std::mutex> lock(totals.mutex);
+  auto entryIt = sceneCache_.find(filename);
+  if (entryIt != sceneCache_.end()) {
+    ++totals.stats.hits;
+  } else if (!wasCached) {
+    ++totals.stats.misses;
+    const size_t size = io::fileSize(filename);
+    auto users = std::make_shared<const std::string>(filename);
+    entryIt =
+        sceneCache_.emplace(filename, SceneCacheEntry{size, 0, users}).first;
+    totals.stats.bytes += size;
+    ++totals.stats.entries;
+  } else {
+    // Loaded before as something other than a scene, e.g. as an object
+    // mesh, which is never evicted
+    return nullptr;
+  }
+  entryIt->second.lastUse = ++totals.clock;
+  return entryIt->second.users;
+}
+
+void ResourceManager::releaseImporter(const std::string& filename) {
+  if (sceneCache_.count(filename) == 0) {
+    importerDict_.erase(filename);
+  }
+}
+
+void ResourceManager::evictScene(const std::string& filename) {
+  LOG(INFO) << "Evicting " << filename << " from the scene cache";
+  auto metaDataIt = resourceDict_.find(filename);
+  if (metaDataIt != resourceDict_.end()) {
+    // Only the references are dropped so that the indices of the assets of
+    // other files stay valid
+    const MeshMetaData& metaData = metaDataIt->second;
+    releaseRange(meshes_, metaData.meshIndex);
+    releaseRange(textures_, metaData.textureIndex);
+    releaseRange(materials_, metaData.materialIndex);
+    resourceDict_.erase(metaDataIt);
+  }
+  magnumMeshDict_.erase(filename);
+  importerDict_.erase(filename);
+  collisionMeshGroups_.erase(filename);
+  sceneCache_.erase(filename);
+}
+
+void ResourceManager::trimSceneCache(const std::set<std::string>& inUse) {
+  scenesInUse_ = inUse;
+  SceneCacheTotals& totals = sceneCacheTotals();
+  std::lock_guard<std::mutex> lock(totals.mutex);
+  while (totals.stats.budget != 0 &&
+         totals.stats.bytes > totals.stats.budget) {
+    // Least recently used scene that no node references
+    auto victim = sceneCache_.end();
+    for (auto it = sceneCache_.begin(); it != sceneCache_.end(); ++it) {
+      if (inUse.count(it->first) == 0 && it->second.users.use_count() == 1 &&
+          (victim == sceneCache_.end() ||
+           it->second.lastUse < victim->second.lastUse)) {
+        victim = it;
+      }
+    }
+    if (victim == sceneCache_.end()) {
+      // What is left is in use or cached by other managers
+      break;
+    }
+    totals.stats.bytes -= victim->second.size;
+    --totals.stats.entries;
+    ++totals.stats.evictions;
+    // evictScene() erases the entry
+    const std::string filename = victim->first;
+    evictScene(filename);
+  }
+}
+
+void ResourceManager::setSceneCacheBudget(size_t bytes) {
+  {
+    SceneCacheTotals& totals = sceneCacheTotals();
+    std::lock_guard<std::mutex> lock(totals.mutex);
+    totals.stats.budget = bytes;
+  }
+  trimSceneCache(scenesInUse_);
+}
+
+ResourceManager::SceneCacheStats ResourceManager::getSceneCacheStats() const {
+  SceneCacheTotals& totals = sceneCacheTotals();
+  std::lock_guard<std::mutex> lock(totals.mutex);
+  return totals.stats;
+}
+
+void ResourceManager::releaseSceneInstances(scene::SceneNode& parent) {
+  // Collected first, deleting a node unlinks it from its siblings
+  std::vector<MagnumObject*> instances;
+  for (auto& child : parent.children()) {
+    for (auto& feature : child.features()) {
+      if (dynamic_cast<SceneAssetReference*>(&feature) != nullptr) {
+        instances.push_back(&child);
+        break;
+      }
+    }
+  }
+  for (MagnumObject* instance : instances) {
+    delete instance;
+  }
+}
+
+void ResourceManager::prefetchScene(const AssetInfo& info) {
+  const std::string& filename = info.filepath;
+  if (filename.compare(EMPTY_SCENE) == 0 || !io::exists(filename) ||
+      resourceDict_.count(filename) > 0 ||
+      prefetchedImporters_.count(filename) > 0) {
+    return;
+  }
+
+  const bool isGltf = Cr::Utility::String::endsWith(filename, ".glb") ||
+                      Cr::Utility::String::endsWith(filename, ".gltf");
+  const bool isGeneralMesh = info.type == AssetType::MP3D_MESH ||
+                             info.type == AssetType::UNKNOWN;
+  if (isGltf && isGeneralMesh) {
+    // The plugin manager is not thread safe, so instantiate the concrete
+    // importer here and only open the file in the background
+    std::unique_ptr<Importer> importer =
+        importerManager_.loadAndInstantiate("GltfImporter");
+    if (importer) {
+      prefetchedImporters_.emplace(
+          filename,
+          std::async(std::launch::async,
+                     [filename, importer = std::move(importer)]() mutable {
+                       if (!importer->openFile(filename)) {
+                         importer = nullptr;
+                       }
+                       return std::move(importer);
+                     }));
+      return;
+    }
+  }
+
+  prefetchedImporters_.emplace(
+      filename, std::async(std::launch::async, [filename]() {
+        readAhead(filename);
+        return std::unique_ptr<Importer>{};
+      }));
+}
+
+void ResourceManager::finishPrefetch(const std::string& filename) {
+  auto it = prefetchedImporters_.find(filename);
+  if (it == prefetchedImporters_.end())
+    return;
+
+  std::unique_ptr<Importer> importer = it->second.get();
+  prefetchedImporters_.erase(it);
+  if (importer && importer->isOpened()) {
+    importerDict_[filename] = std::move(importer);
+  }
+}
+
 }  // namespace assets
 }  // namespace esp
@@ -6,12 +6,15 @@
 
 /** @file */
 
+#include <future>
 #include <map>
 #include <memory>
+#include <set>
 #include <string>
 #include <vector>
 
 #include <Corrade/Containers/Optional.h>
+#include <Corrade/PluginManager/Manager.h>
 #include <Magnum/GL/TextureFormat.h>
 #include <Magnum/MeshTools/Compile.h>
 #include <Magnum/MeshTools/Transform.h>
@@ -58,14 +61,34 @@ class ResourceManager {
   // a common design pattern for implementing
   // subsystems such as "resource manager", thats make up an engine is
   // to define a singleton class;
-  explicit ResourceManager(){};
-  ~ResourceManager() {}
+  explicit ResourceManager();
+  ~ResourceManager();
 
   // Stores references to a set of drawable elements
   using DrawableGroup = Magnum::SceneGraph::DrawableGroup3D;
   // Convenience typedef for Importer class
   using Importer = Magnum::Trade::AbstractImporter;
 
+  /**
+   * @brief Usage statistics of the cache of scene meshes loaded through
+   * @ref loadScene(), summed over all resource managers of the process.  See
+   * @ref setSceneCacheBudget().
+   */
+  struct SceneCacheStats {
+    //! Number of @ref loadScene() calls that reused cached assets
+    size_t hits = 0;
+    //! Number of @ref loadScene() calls that loaded assets from disk
+    size_t misses = 0;
+    //! Number of scenes evicted to stay within the budget
+    size_t evictions = 0;
+    //! Approximate size of the cached scenes, the sum of their file sizes
+    size_t bytes = 0;
+    //! Budget for @ref bytes, 0 if unlimited
+    size_t budget = size_t{2} << 30;
+    //! Number of cached scenes
+    size_t entries = 0;
+  };
+
   inline void compressTextures(bool newVal) { compressTextures_ = newVal; };
 
   //! Load Scene data + instantiate scene
@@ -133,6 +156,52 @@ class ResourceManager {
     return meshes_[meshIndex]->meshTransform_;
   }
 
+  /**
+   * @brief Starts loading the file data of a scene on a background thread, so
+   * that a later @ref loadScene() of the same file only has to instantiate it
+   * and upload it to the GPU.
+   *
+   * glTF scenes are opened and parsed by an importer in the background, for
+   * other formats the file is read ahead into the OS page cache.  Does nothing
+   * if the scene is already loaded or being prefetched.
+   */
+  void prefetchScene(const AssetInfo& info);
+
+  //======== Scene cache ========
+
+  /**
+   * @brief Sets the budget of the scene cache.
+   *
+   * Scenes loaded through @ref loadScene() stay in memory so that switching
+   * back to them does not touch the disk.  The budget is shared by all
+   * resource managers of the process: once the approximate size of their
+   * cached scenes, measured by the file sizes, exceeds it, the least recently
+   * used scenes that no scene node references any more are evicted.  Each
+   * manager only evicts its own scenes, as their GPU assets belong to its GL
+   * context.
+   *
+   * @param bytes The budget in bytes, 0 for no limit.  2 GiB by default.
+   */
+  void setSceneCacheBudget(size_t bytes);
+
+  /**
+   * @brief Evicts least recently used scenes until the cache fits its budget.
+   * @param inUse Filenames of the scenes which are instantiated in the active
+   * scene graphs and must not be evicted
+   */
+  void trimSceneCache(const std::set<std::string>& inUse);
+
+  //! Statistics of the scene cache of the whole process
+  SceneCacheStats getSceneCacheStats() const;
+
+  /**
+   * @brief Deletes the scene meshes instantiated under a node by
+   * @ref loadScene(), so that their assets can be evicted from the cache.
+   *
+   * Other children of the node, e.g. agents or physics objects, are kept.
+   */
+  static void releaseSceneInstances(scene::SceneNode& parent);
+
  protected:
   //======== Scene Functions ========
   //! Instantiate Scene:
@@ -271,6 +340,50 @@ class ResourceManager {
       const Magnum::Color4& color = Magnum::Color4{1});
 
   bool compressTextures_ = false;
+
+  // ======== Scene cache ========
+  //! Releases all assets of a cached scene
+  void evictScene(const std::string& filename);
+
+  /**
+   * @brief Records a hit or a miss of the scene cache and marks the scene as
+   * most recently used.
+   * @return Token held by the nodes instantiating the scene, which keeps it
+   * from being evicted.  Null if the file is not cached as a scene.
+   */
+  std::shared_ptr<const std::string> touchSceneCacheEntry(
+      const std::string& filename,
+      bool wasCached);
+
+  //! Closes the importer of a file unless it is kept for a cached scene
+  void releaseImporter(const std::string& filename);
+
+  // Must outlive the importers below
+  Corrade::PluginManager::Manager<Importer> importerManager_;
+  // Opened importers, kept so that cached files can be re-instantiated
+  // without re-parsing them from disk
+  std::map<std::string, std::unique_ptr<Importer>> importerDict_;
+
+  //! Waits for a pending prefetch of filename and adopts its importer
+  void finishPrefetch(const std::string& filename);
+
+  // Importers being opened on background threads by prefetchScene(), empty
+  // for files that are only read ahead
+  std::map<std::string, std::future<std::unique_ptr<Importer>>>
+      prefetchedImporters_;
+
+  struct SceneCacheEntry {
+    // Approximate size of the scene
+    size_t size;
+    // Tick of the process-wide cache clock at the last use
+    uint64_t lastUse;
+    // Shared with the nodes instantiating the scene
+    std::shared_ptr<const std::string> users;
+  };
+  // Scenes cached by this manager
+  std::map<std::string, SceneCacheEntry> sceneCache_;
+  // Scenes passed to the last trimSceneCache()
+  std::set<std::string> scenesInUse_;
 };
 
 }  // namespace assets
@@ -48,17 +48,179 @@ void initShortestPathBindings(py::module& m) {
       .def(py::init(&PathFinder::create<>))
       .def("get_bounds", &PathFinder::bounds)
       .def("get_random_navigable_point", &PathFinder::getRandomNavigablePoint)
+      .def("seed", &PathFinder::seed, "new_seed"_a)
+      .def(
+          "sample_navigable_points",
+          [](PathFinder& self, int n, py::object island, py::object yRange,
+             py::object minObstacleDistance, py::object seed, int maxTries) {
+            if (n < 0) {
+              throw py::value_error{"n must not be negative"};
+            }
+            NavPointConstraints constraints;
+            if (py::isinstance<py::int_>(island)) {
+              constraints.islandId = island.cast<int>();
+              if (constraints.islandId < 0) {
+                throw py::value_error{"island ids are not negative"};
+              }
+            } else if (!island.is_none()) {
+              constraints.sameIslandAs = true;
+              constraints.islandPoint = island.cast<vec3f>();
+            }
+            if (!yRange.is_none()) {
+              std::tie(constraints.minY, constraints.maxY) =
+                  yRange.cast<std::pair<float, float>>();
+            }
+            if (!minObstacleDistance.is_none()) {
+              constraints.minObstacleDistance =
+                  minObstacleDistance.cast<float>();
+            }
+            constraints.maxTries = maxTries;
+            // without a seed, draw one from the generator of the
+            // pathfinder, which PathFinder.seed reseeds
+            const uint32_t samplingSeed =
+                seed.is_none() ? self.randomSeed() : seed.cast<uint32_t>();
+
+            NavPoints points;
+            bool success;
+            {
+              py::gil_scoped_release release;
+              success = self.sampleNavigablePoints(n, constraints,
+                                                   samplingSeed, points);
+            }
+            if (!success) {
+              throw py::value_error{
+                  "Could not sample points meeting the constraints"};
+            }
+            return points;
+          },
+          R"(
+        Samples n points uniformly over the navigable area in one call,
+        returned as an (n, 3) array. Optionally only on the island with id
+        island, or on the island of the point island, with a height in
+        y_range = (min_y, max_y) and at least min_obstacle_distance from
+        obstacles. Raises ValueError if a point cannot be drawn in max_tries
+        tries.
+      )",
+          "n"_a, "island"_a = py::none(), "y_range"_a = py::none(),
+          "min_obstacle_distance"_a = py::none(), "seed"_a = py::none(),
+          "max_tries"_a = 100)
       .def("find_path", py::overload_cast<ShortestPath&>(&PathFinder::findPath),
            "path"_a)
       .def("find_path",
            py::overload_cast<MultiGoalShortestPath&>(&PathFinder::findPath),
            "path"_a)
+      .def(
+          "find_paths",
+          [](PathFinder& self, const NavPoints& starts, const NavPoints& ends,
+             bool returnPoints, int numThreads) -> py::object {
+            if (starts.rows() != ends.rows()) {
+              throw py::value_error{"starts and ends must have the same shape"};
+            }
+            Eigen::VectorXf geodesicDistances;
+            std::vector<NavPoints> points;
+            {
+              py::gil_scoped_release release;
+              self.findPaths(starts, ends, geodesicDistances,
+                             returnPoints ? &points : nullptr, numThreads);
+            }
+            if (returnPoints) {
+              return py::make_tuple(geodesicDistances, points);
+            }
+            return py::cast(geodesicDistances);
+          },
+          R"(
+        Finds the shortest path between each of the (N, 3) starts and ends in
+        parallel. Returns the (N,) geodesic distances, inf where there is no
+        path, and with return_points, also the list of (K, 3) points of each
+        path. num_threads defaults to the number of hardware threads.
+      )",
+          "starts"_a, "ends"_a, "return_points"_a = false, "num_threads"_a = 0)
+      .def(
+          "geodesic_distance_matrix",
+          [](PathFinder& self, const NavPoints& sources,
+             const NavPoints& targets, int numThreads) {
+            NavDistances geodesicDistances;
+            {
+              py::gil_scoped_release release;
+              self.geodesicDistanceMatrix(sources, targets, geodesicDistances,
+                                          numThreads);
+            }
+            return geodesicDistances;
+          },
+          R"(
+        Geodesic distances from each of the (M, 3) sources to each of the
+        (N, 3) targets, as an (M, N) array, inf where there is no path. Runs
+        one Dijkstra search over the navmesh polygons per source instead of a
+        search per pair, the sources in parallel. num_threads defaults to the
+        number of hardware threads.
+      )",
+          "sources"_a, "targets"_a, "num_threads"_a = 0)
       .def("try_step", &PathFinder::tryStep<Magnum::Vector3>, "start"_a,
            "end"_a)
       .def("try_step", &PathFinder::tryStep<vec3f>, "start"_a, "end"_a)
+      .def(
+          "try_step_batch",
+          [](PathFinder& self, const NavPoints& starts, const NavPoints& ends) {
+            if (starts.rows() != ends.rows()) {
+              throw py::value_error{"starts and ends must have the same shape"};
+            }
+            NavPoints filteredEnds;
+            {
+              py::gil_scoped_release release;
+              self.tryStepBatch(starts, ends, filteredEnds);
+            }
+            return filteredEnds;
+          },
+          R"(
+        Batched try_step, returns the (N, 3) end points of the (N, 3) steps
+        from starts to ends.
+      )",
+          "starts"_a, "ends"_a)
       .def("island_radius", &PathFinder::islandRadius, "pt"_a)
+      .def("island_id", &PathFinder::islandId,
+           R"(Id of the island of the point, -1 if it is not on the navmesh.)",
+           "pt"_a)
+      .def("same_island", &PathFinder::sameIsland,
+           R"(Whether there is a path between the two points.)", "a"_a, "b"_a)
+      .def_property_readonly(
+          "island_areas",
+          [](PathFinder& self) {
+            std::vector<float> areas = self.islandAreas();
+            return Eigen::VectorXf{
+                Eigen::Map<Eigen::VectorXf>(areas.data(), areas.size())};
+          },
+          R"(Surface area of each island, indexed by island id.)")
+      .def(
+          "island_id_batch",
+          [](PathFinder& self, const NavPoints& pts) {
+            Eigen::VectorXi ids;
+            {
+              py::gil_scoped_release release;
+              self.islandIdBatch(pts, ids);
+            }
+            return ids;
+          },
+          R"(Batched island_id, returns an (N,) int array.)", "pts"_a)
+      .def(
+          "same_island_batch",
+          [](PathFinder& self, const NavPoints& a, const NavPoints& b) {
+            if (a.rows() != b.rows()) {
+              throw py::value_error{"a and b must have the same shape"};
+            }
+            NavFlags same;
+            {
+              py::gil_scoped_release release;
+              self.sameIslandBatch(a, b, same);
+            }
+            return same;
+          },
+          R"(Batched same_island, returns an (N,) bool array.)", "a"_a, "b"_a)
       .def_property_readonly("is_loaded", &PathFinder::isLoaded)
-      .def("load_nav_mesh", &PathFinder::loadNavMesh)
+      .def("load_nav_mesh", &PathFinder::loadNavMesh,
+           py::call_guard<py::gil_scoped_release>(), "path"_a)
+      .def("clone", &PathFinder::clone,
+           R"(Creates a pathfinder that shares the loaded navmesh with this
+          one, but has its own queries, filter and seed.)")
       .def("distance_to_closest_obstacle",
            &PathFinder::distanceToClosestObstacle,
            R"(Returns the distance to the closest obstacle.)", "pt"_a,
@@ -70,7 +232,72 @@ void initShortestPathBindings(py::module& m) {
            "pt"_a, "max_search_radius"_a = 2.0)
       .def("is_navigable", &PathFinder::isNavigable,
            R"(Checks to see if the agent can stand at the specified point.)",
-           "pt"_a, "max_y_delta"_a = 0.5);
+           "pt"_a, "max_y_delta"_a = 0.5)
+      .def("snap_point", &PathFinder::snapPoint,
+           R"(Returns the closest navigable point, NaN if there is none.)",
+           "pt"_a)
+      .def(
+          "snap_point_batch",
+          [](PathFinder& self, const NavPoints& pts) {
+            NavPoints snappedPts;
+            {
+              py::gil_scoped_release release;
+              self.snapPointBatch(pts, snappedPts);
+            }
+            return snappedPts;
+          },
+          R"(Batched snap_point, returns the (N, 3) snapped points.)", "pts"_a)
+      .def(
+          "is_navigable_batch",
+          [](PathFinder& self, const NavPoints& pts, float maxYDelta) {
+            NavFlags navigable;
+            {
+              py::gil_scoped_release release;
+              self.isNavigableBatch(pts, navigable, maxYDelta);
+            }
+            return navigable;
+          },
+          R"(Batched is_navigable, returns an (N,) bool array.)", "pts"_a,
+          "max_y_delta"_a = 0.5)
+      .def(
+          "island_radius_batch",
+          [](PathFinder& self, const NavPoints& pts) {
+            Eigen::VectorXf radii;
+            {
+              py::gil_scoped_release release;
+              self.islandRadiusBatch(pts, radii);
+            }
+            return radii;
+          },
+          R"(Batched island_radius, returns an (N,) array.)", "pts"_a)
+      .def(
+          "distance_to_closest_obstacle_batch",
+          [](PathFinder& self, const NavPoints& pts, float maxSearchRadius) {
+            Eigen::VectorXf distances;
+            {
+              py::gil_scoped_release release;
+              self.distanceToClosestObstacleBatch(pts, distances,
+                                                  maxSearchRadius);
+            }
+            return distances;
+          },
+          R"(Batched distance_to_closest_obstacle, returns an (N,) array.)",
+          "pts"_a, "max_search_radius"_a = 2.0)
+      .def(
+          "closest_obstacle_surface_point_batch",
+          [](PathFinder& self, const NavPoints& pts, float maxSearchRadius) {
+            NavPoints hitPos, hitNormal;
+            Eigen::VectorXf hitDist;
+            {
+              py::gil_scoped_release release;
+              self.closestObstacleSurfacePointBatch(pts, hitPos, hitNormal,
+                                                    hitDist, maxSearchRadius);
+            }
+            return std::make_tuple(hitPos, hitNormal, hitDist);
+          },
+          R"(Batched closest_obstacle_surface_point, returns the (N, 3)
+          hit_pos, (N, 3) hit_normal and (N,) hit_dist.)",
+          "pts"_a, "max_search_radius"_a = 2.0);
 
   // this enum is used by GreedyGeodesicFollowerImpl so it needs to be defined
   // before it
@@ -8,6 +8,7 @@ namespace py = pybind11;
 using namespace py::literals;
 
 #include "esp/core/Configuration.h"
+#include "esp/core/Profiler.h"
 #include "esp/geo/OBB.h"
 #include "esp/gfx/RenderCamera.h"
 #include "esp/gfx/Renderer.h"
@@ -74,6 +75,32 @@ PYBIND11_MODULE(habitat_sim_bindings, m) {
       .def("set", &Configuration::set<float>)
       .def("set", &Configuration::set<bool>);
 
+  // ==== Profiler ====
+  py::class_<Profiler, std::unique_ptr<Profiler, py::nodelete>>(m, "Profiler")
+      .def_static(
+          "set_enabled",
+          [](bool enabled) { Profiler::instance().setEnabled(enabled); },
+          "enabled"_a)
+      .def_static("is_enabled",
+                  []() { return Profiler::instance().isEnabled(); })
+      .def_static("now_ns", &Profiler::nowNs)
+      .def_static(
+          "events",
+          []() {
+            std::vector<std::tuple<std::string, int64_t, int64_t, uint64_t>>
+                result;
+            for (const ProfileEvent& event : Profiler::instance().events()) {
+              result.emplace_back(event.name, event.startNs, event.durationNs,
+                                  event.threadId);
+            }
+            return result;
+          },
+          R"(Events recorded by the native stages as a list of
+          (name, start_ns, duration_ns, thread_id) tuples)")
+      .def_static("dropped_events",
+                  []() { return Profiler::instance().droppedEvents(); })
+      .def_static("clear", []() { Profiler::instance().clear(); });
+
   // !!Warning!!
   // CANNOT apply smart pointers to "SceneNode" or ANY its descendant classes,
   // namely, any class whose instance can be a node in the scene graph. Reason:
@@ -108,6 +135,40 @@ PYBIND11_MODULE(habitat_sim_bindings, m) {
       .def_property_readonly("absolute_translation",
                              &SceneNode::absoluteTranslation);
 
+  // ==== TransformationObserver ====
+  py::class_<TransformationObserver,
+             Magnum::SceneGraph::PyFeature<TransformationObserver>,
+             Magnum::SceneGraph::AbstractFeature3D,
+             Magnum::SceneGraph::PyFeatureHolder<TransformationObserver>>(
+      m, "TransformationObserver",
+      R"(TransformationObserver: flags when the node it is attached to, or
+      any of its ancestors, is transformed.)")
+      .def(py::init_alias<std::reference_wrapper<scene::SceneNode>>())
+      .def_property_readonly("changed", &TransformationObserver::hasChanged,
+                             R"(Whether the node moved since the last reset)")
+      .def("reset", &TransformationObserver::reset, R"(
+        Clears the changed flag, so that the next transformation sets it.
+      )")
+      .def_property_readonly("node", nodeGetter<TransformationObserver>,
+                             "Node this object is attached to");
+
+  m.def(
+      "get_node_poses",
+      [](const std::vector<SceneNode*>& nodes) {
+        NodePositions positions;
+        NodeRotations rotations;
+        getNodePoses(nodes, positions, rotations);
+        return std::make_tuple(positions, rotations);
+      },
+      R"(
+      Absolute translations, as an (N, 3) array, and local rotations, as an
+      (N, 4) array of [x, y, z, w] quaternion coefficients, of the nodes.)",
+      "nodes"_a);
+  m.def("set_node_poses", &setNodePoses, R"(
+      Resets the nodes' transformations and sets their translations and
+      rotations from (N, 3) and (N, 4) arrays as returned by get_node_poses.)",
+        "nodes"_a, "positions"_a, "rotations"_a);
+
   // ==== RenderCamera ====
   py::class_<RenderCamera, Magnum::SceneGraph::PyFeature<RenderCamera>,
              Magnum::SceneGraph::AbstractFeature3D,
@@ -330,7 +391,105 @@ PYBIND11_MODULE(habitat_sim_bindings, m) {
       .def("action", &ObjectControls::action, R"(
         Take action using this :py:class:`ObjectControls`.
       )",
-           "object"_a, "name"_a, "amount"_a, "apply_filter"_a = true);
+           "object"_a, "name"_a, "amount"_a, "apply_filter"_a = true)
+      .def(
+          "set_pathfinder_filter",
+          [](ObjectControls& self, PathFinder::ptr pathfinder) {
+            if (pathfinder == nullptr) {
+              self.setMoveFilterFunction(
+                  [](const vec3f&, const vec3f& end) { return end; });
+              return;
+            }
+            self.setMoveFilterFunction(
+                [pathfinder](const vec3f& start, const vec3f& end) {
+                  return pathfinder->isLoaded()
+                             ? pathfinder->tryStep(start, end)
+                             : end;
+                });
+          },
+          R"(
+        Filters moves with :py:`pathfinder.try_step` if its navmesh is loaded.
+        None removes the filter.
+      )",
+          "pathfinder"_a)
+      .def(
+          "action_sequence",
+          [](ObjectControls& self, SceneNode& body,
+             const std::vector<SceneNode*>& sensors,
+             const std::vector<std::string>& names,
+             const std::vector<float>& amounts,
+             const std::vector<bool>& bodyActions, bool applyFilter) {
+            std::vector<bool> collided;
+            NodePositions positions;
+            NodeRotations rotations;
+            if (!self.actionSequence(body, sensors, names, amounts,
+                                     bodyActions, applyFilter, collided,
+                                     positions, rotations)) {
+              throw py::value_error{"Invalid action sequence"};
+            }
+            return std::make_tuple(collided, positions, rotations);
+          },
+          R"(
+        Applies a sequence of moves to body (body actions) or sensors (sensor
+        actions). Returns whether each step collided and the (N, 3) positions
+        and (N, 4) [x, y, z, w] rotations of body after each step.
+      )",
+          "body"_a, "sensors"_a, "names"_a, "amounts"_a, "body_actions"_a,
+          "apply_filter"_a = true)
+      .def(
+          "pyrobot_noisy_action",
+          [](ObjectControls& self, SceneNode& object, const std::string& motion,
+             float amount, const std::string& robot,
+             const std::string& controller, float noiseMultiplier) {
+            if (!self.pyrobotNoisyAction(object, motion, amount, robot,
+                                         controller, noiseMultiplier)) {
+              throw py::value_error{"Invalid PyRobot noisy action"};
+            }
+          },
+          R"(
+        Moves or turns object with the actuation noise of a PyRobot robot and
+        controller. motion is one of moveForward, moveBackward, turnLeft or
+        turnRight.
+      )",
+          "object"_a, "motion"_a, "amount"_a, "robot"_a, "controller"_a,
+          "noise_multiplier"_a)
+      .def("seed", &ObjectControls::seed,
+           R"(Seed the generator of the actuation noise)", "new_seed"_a)
+      .def(
+          "get_random_state",
+          [](const ObjectControls& self) {
+            return py::bytes(self.getRandomState());
+          },
+          R"(State of the generator of the actuation noise)")
+      .def("set_random_state", &ObjectControls::setRandomState,
+           R"(Restore a state returned by get_random_state)", "state"_a);
+
+  py::class_<PyRobotMotionNoiseModel>(
+      m, "PyRobotMotionNoiseModel",
+      R"(Actuation noise of one kind of motion of a PyRobot robot, as diagonal
+      Gaussians truncated to 3 standard deviations.)")
+      .def_readonly("linear_mean", &PyRobotMotionNoiseModel::linearMean,
+                    R"(Mean of the noise along and perpendicular to the
+                    motion)")
+      .def_readonly("linear_cov", &PyRobotMotionNoiseModel::linearCov,
+                    R"(Variance of the noise along and perpendicular to the
+                    motion)")
+      .def_readonly("rotation_mean", &PyRobotMotionNoiseModel::rotationMean,
+                    R"(Mean of the noise of the rotation, in radians)")
+      .def_readonly("rotation_cov", &PyRobotMotionNoiseModel::rotationCov,
+                    R"(Variance of the noise of the rotation)");
+
+  py::class_<PyRobotControllerNoiseModel>(m, "PyRobotControllerNoiseModel")
+      .def_readonly("linear_motion", &PyRobotControllerNoiseModel::linearMotion)
+      .def_readonly("rotational_motion",
+                    &PyRobotControllerNoiseModel::rotationalMotion);
+
+  m.def("get_pyrobot_noise_models", &getPyRobotNoiseModels, R"(
+      Noise models of the pyrobot_noisy_* controls, as a dict of
+      PyRobotControllerNoiseModel by robot and controller name.
+
+      Parameters contributed from PyRobot, https://pyrobot.org/. Please cite
+      PyRobot if you use this noise model.)");
 
   // ==== Renderer ====
   py::class_<Renderer, Renderer::ptr>(m, "Renderer")
@@ -390,10 +549,32 @@ PYBIND11_MODULE(habitat_sim_bindings, m) {
            [](RenderTarget& self, py::object exc_type, py::object exc_value,
               py::object traceback) { self.renderExit(); })
       .def("read_frame_rgba", &RenderTarget::readFrameRgba,
-           "Reads RGBA frame into passed img in uint8 byte format.")
-      .def("read_frame_depth", &RenderTarget::readFrameDepth)
-      .def("read_frame_object_id", &RenderTarget::readFrameObjectId)
+           "Reads RGBA frame into passed img in uint8 byte format.", "img"_a,
+           "flip_vertically"_a = false)
+      .def("read_frame_depth", &RenderTarget::readFrameDepth, "img"_a,
+           "flip_vertically"_a = false)
+      .def("read_frame_object_id", &RenderTarget::readFrameObjectId, "img"_a,
+           "flip_vertically"_a = false)
       .def("blit_rgba_to_default", &RenderTarget::blitRgbaToDefault)
+      .def(
+          "start_read_frame_rgba",
+          [](RenderTarget& self) { self.startReadFrameRgba(); },
+          R"(Starts an asynchronous read of the RGBA frame in uint8 byte format.
+          Finish it with finish_read_frame())")
+      .def("start_read_frame_depth", &RenderTarget::startReadFrameDepth,
+           R"(Starts an asynchronous read of the depth frame.)")
+      .def(
+          "start_read_frame_object_id",
+          [](RenderTarget& self) { self.startReadFrameObjectId(); },
+          R"(Starts an asynchronous read of the object id frame.)")
+      .def_property_readonly("pending_reads", &RenderTarget::pendingReads)
+      .def("read_frame_ready", &RenderTarget::readFrameReady,
+           R"(Whether the oldest pending asynchronous read has completed.)")
+      .def("finish_read_frame", &RenderTarget::finishReadFrame,
+           py::call_guard<py::gil_scoped_release>(),
+           R"(Waits for the oldest pending asynchronous read and copies it into
+          the passed img.)",
+           "img"_a, "flip_vertically"_a = false)
 #ifdef ESP_BUILD_WITH_CUDA
       .def("read_frame_rgba_gpu",
            [](RenderTarget& self, size_t devPtr) {
@@ -507,6 +688,19 @@ PYBIND11_MODULE(habitat_sim_bindings, m) {
              return self != other;
            });
 
+  // ==== SceneCacheStats ====
+  py::class_<assets::ResourceManager::SceneCacheStats>(m, "SceneCacheStats")
+      .def_readonly("hits", &assets::ResourceManager::SceneCacheStats::hits)
+      .def_readonly("misses",
+                    &assets::ResourceManager::SceneCacheStats::misses)
+      .def_readonly("evictions",
+                    &assets::ResourceManager::SceneCacheStats::evictions)
+      .def_readonly("bytes", &assets::ResourceManager::SceneCacheStats::bytes)
+      .def_readonly("budget",
+                    &assets::ResourceManager::SceneCacheStats::budget)
+      .def_readonly("entries",
+                    &assets::ResourceManager::SceneCacheStats::entries);
+
   initShortestPathBindings(m);
 
   // ==== Simulator ====
@@ -520,6 +714,10 @@ PYBIND11_MODULE(habitat_sim_bindings, m) {
            pybind11::return_value_policy::reference)
       .def_property_readonly("semantic_scene", &Simulator::getSemanticScene)
       .def_property_readonly("renderer", &Simulator::getRenderer)
+      .def_static("load_semantic_scene", &Simulator::loadSemanticScene,
+                  R"(Loads the semantic annotations of a scene, if it has any,
+          without loading the scene itself. Needs no GL context.)",
+                  "scene"_a, "semantic_scene"_a)
       .def("seed", &Simulator::seed, "new_seed"_a)
       .def("reconfigure", &Simulator::reconfigure, "configuration"_a)
       .def("reset", &Simulator::reset)
@@ -535,6 +733,16 @@ PYBIND11_MODULE(habitat_sim_bindings, m) {
            "sceneID"_a = 0)
       .def("step_world", &Simulator::stepWorld, "dt"_a = 1.0 / 60.0)
       .def("get_world_time", &Simulator::getWorldTime)
+      .def("set_world_time", &Simulator::setWorldTime, "world_time"_a)
+      .def("get_random_state",
+           [](const Simulator& self) {
+             return py::bytes(self.getRandomState());
+           })
+      .def("set_random_state", &Simulator::setRandomState, "state"_a)
+      .def("prefetch_scene", &Simulator::prefetchScene, "scene"_a)
+      .def("set_scene_cache_budget", &Simulator::setSceneCacheBudget,
+           "bytes"_a)
+      .def("get_scene_cache_stats", &Simulator::getSceneCacheStats)
       .def("set_transformation", &Simulator::setTransformation, "transform"_a,
            "object_id"_a, "sceneID"_a = 0)
       .def("get_transformation", &Simulator::getTransformation, "object_id"_a,
@@ -547,6 +755,14 @@ PYBIND11_MODULE(habitat_sim_bindings, m) {
            "sceneID"_a = 0)
       .def("get_rotation", &Simulator::getRotation, "object_id"_a,
            "sceneID"_a = 0)
+      .def("set_linear_velocity", &Simulator::setLinearVelocity, "lin_vel"_a,
+           "object_id"_a, "sceneID"_a = 0)
+      .def("get_linear_velocity", &Simulator::getLinearVelocity, "object_id"_a,
+           "sceneID"_a = 0)
+      .def("set_angular_velocity", &Simulator::setAngularVelocity, "ang_vel"_a,
+           "object_id"_a, "sceneID"_a = 0)
+      .def("get_angular_velocity", &Simulator::getAngularVelocity,
+           "object_id"_a, "sceneID"_a = 0)
       .def("apply_force", &Simulator::applyForce, "force"_a,
            "relative_position"_a, "object_id"_a, "sceneID"_a = 0)
       .def("apply_torque", &Simulator::applyTorque, "torque"_a, "object_id"_a,
@@ -0,0 +1,53 @@
+// Copyright (c) Facebook, Inc. and its affiliates.
+// This source code is licensed under the MIT license found in the
+// LICENSE file in the root directory of this source tree.
+
+#include "Profiler.h"
+
+#include <chrono>
+#include <functional>
+#include <thread>
+
+namespace esp {
+namespace core {
+
+Profiler& Profiler::instance() {
+  static Profiler profiler;
+  return profiler;
+}
+
+int64_t Profiler::nowNs() {
+  return std::chrono::duration_cast<std::chrono::nanoseconds>(
+             std::chrono::steady_clock::now().time_since_epoch())
+      .count();
+}
+
+void Profiler::record(const char* name, int64_t startNs, int64_t durationNs) {
+  const uint64_t threadId =
+      std::hash<std::thread::id>{}(std::this_thread::get_id());
+  std::lock_guard<std::mutex> lock(mutex_);
+  if (events_.size() >= MaxEvents) {
+    ++dropped_;
+    return;
+  }
+  events_.push_back({name, startNs, durationNs, threadId});
+}
+
+std::vector<ProfileEvent> Profiler::events() const {
+  std::lock_guard<std::mutex> lock(mutex_);
+  return events_;
+}
+
+size_t Profiler::droppedEvents() const {
+  std::lock_guard<std::mutex> lock(mutex_);
+  return dropped_;
+}
+
+void Profiler::clear() {
+  std::lock_guard<std::mutex> lock(mutex_);
+  events_.clear();
+  dropped_ = 0;
+}
+
+}  // namespace core
+}  // namespace esp
@@ -0,0 +1,106 @@
+// Copyright (c) Facebook, Inc. and its affiliates.
+// This source code is licensed under the MIT license found in the
+// LICENSE file in the root directory of this source tree.
+
+#pragma once
+
+/** @file */
+
+#include <atomic>
+#include <cstdint>
+#include <mutex>
+#include <string>
+#include <vector>
+
+namespace esp {
+namespace core {
+
+/**
+ * @brief A timed section recorded by the @ref Profiler
+ */
+struct ProfileEvent {
+  //! Stage name, e.g. "gfx.draw"
+  std::string name;
+  //! Start time in nanoseconds on the steady clock
+  int64_t startNs = 0;
+  //! Duration in nanoseconds
+  int64_t durationNs = 0;
+  //! Hashed id of the thread that recorded the event
+  uint64_t threadId = 0;
+};
+
+/**
+ * @brief Process-wide, opt-in recorder of per-stage wall times.
+ *
+ * When disabled, a @ref ProfileScope costs a single relaxed atomic load. When
+ * enabled, every scope appends one @ref ProfileEvent under a mutex. At most
+ * @ref MaxEvents events are kept; further events are counted as dropped until
+ * @ref clear is called.
+ */
+class Profiler {
+ public:
+  static constexpr size_t MaxEvents = 1 << 20;
+
+  static Profiler& instance();
+
+  void setEnabled(bool enabled) {
+    enabled_.store(enabled, std::memory_order_relaxed);
+  }
+  bool isEnabled() const { return enabled_.load(std::memory_order_relaxed); }
+
+  //! Current time of the steady clock in nanoseconds
+  static int64_t nowNs();
+
+  void record(const char* name, int64_t startNs, int64_t durationNs);
+
+  //! Copy of the events recorded since the last @ref clear
+  std::vector<ProfileEvent> events() const;
+
+  //! Number of events discarded because @ref MaxEvents was reached
+  size_t droppedEvents() const;
+
+  void clear();
+
+ private:
+  Profiler() = default;
+
+  std::atomic<bool> enabled_{false};
+  mutable std::mutex mutex_;
+  std::vector<ProfileEvent> events_;
+  size_t dropped_ = 0;
+};
+
+/**
+ * @brief Records the lifetime of the scope as an event named @p name if the
+ * @ref Profiler is enabled on construction. @p name must outlive the scope.
+ */
+class ProfileScope {
+ public:
+  explicit ProfileScope(const char* name)
+      : name_(Profiler::instance().isEnabled() ? name : nullptr),
+        startNs_(name_ ? Profiler::nowNs() : 0) {}
+
+  ~ProfileScope() {
+    if (name_) {
+      Profiler::instance().record(name_, startNs_,
+                                  Profiler::nowNs() - startNs_);
+    }
+  }
+
+  ProfileScope(const ProfileScope&) = delete;
+  ProfileScope& operator=(const ProfileScope&) = delete;
+
+ private:
+  const char* name_;
+  int64_t startNs_;
+};
+
+}  // namespace core
+}  // namespace esp
+
+#define ESP_PROFILE_CONCAT_IMPL(a, b) a##b
+#define ESP_PROFILE_CONCAT(a, b) ESP_PROFILE_CONCAT_IMPL(a, b)
+
+//! Time the enclosing scope as stage @p name
+#define ESP_PROFILE_SCOPE(name) \
+  ::esp::core::ProfileScope ESP_PROFILE_CONCAT(espProfileScope_, __LINE__)(name)
@@ -5,6 +5,8 @@
 #pragma once
 
 #include <random>
+#include <sstream>
+#include <string>
 
 namespace esp {
 namespace core {
@@ -19,7 +21,26 @@ class Random {
         normal_float_01_(0, 1) {}
 
   //! Seed the random generator state with the given number
-  void seed(uint32_t newSeed) { gen_.seed(newSeed); }
+  void seed(uint32_t newSeed) {
+    gen_.seed(newSeed);
+    // The normal distribution caches every other sample, which would otherwise
+    // come from the previous stream
+    normal_float_01_.reset();
+  }
+
+  //! Return the state of the generator, to be passed to @ref setState
+  std::string getState() const {
+    std::ostringstream os;
+    // Along with the sample the normal distribution may have cached
+    os << gen_ << ' ' << normal_float_01_;
+    return os.str();
+  }
+
+  //! Restore a state returned by @ref getState
+  void setState(const std::string& state) {
+    std::istringstream is(state);
+    is >> gen_ >> normal_float_01_;
+  }
 
   //! Return randomly sampled int distributed uniformly in [0,
   //! std::numeric_limits<int>::max()]
@@ -6,6 +6,7 @@
 #include <Magnum/GL/BufferImage.h>
 #include <Magnum/GL/DefaultFramebuffer.h>
 #include <Magnum/GL/Framebuffer.h>
+#include <Magnum/GL/OpenGL.h>
 #include <Magnum/GL/PixelFormat.h>
 #include <Magnum/GL/Renderbuffer.h>
 #include <Magnum/GL/RenderbufferFormat.h>
@@ -19,8 +20,13 @@
 #include "RenderTarget.h"
 #include "magnum.h"
 
+#include "esp/core/Profiler.h"
 #include "esp/gfx/DepthUnprojection.h"
 
+#include <algorithm>
+#include <array>
+#include <cstring>
+
 #ifdef ESP_BUILD_WITH_CUDA
 #include <cuda_gl_interop.h>
 #include <cuda_runtime.h>
@@ -39,7 +45,58 @@ const GL::Framebuffer::ColorAttachment ObjectIdBuffer =
 const GL::Framebuffer::ColorAttachment UnprojectedDepthBuffer =
     GL::Framebuffer::ColorAttachment{0};
 
+namespace {
+
+/**
+ * @brief Copies a tightly packed image, optionally reversing the row order
+ */
+void copyRows(Containers::ArrayView<const char> src,
+              const MutableImageView2D& dst,
+              bool flipVertically) {
+  const std::size_t height = dst.size().y();
+  const std::size_t rowStride = dst.data().size() / height;
+  CORRADE_INTERNAL_ASSERT(src.size() >= dst.data().size());
+
+  char* out = dst.data().data();
+  if (!flipVertically) {
+    std::memcpy(out, src.data(), dst.data().size());
+    return;
+  }
+  for (std::size_t row = 0; row < height; ++row) {
+    std::memcpy(out + row * rowStride,
+                src.data() + (height - 1 - row) * rowStride, rowStride);
+  }
+}
+
+/**
+ * @brief Reverses the row order of a tightly packed image in place, turning
+ * OpenGL's bottom-to-top layout into the top-to-bottom layout expected by
+ * image libraries and numpy.  Swaps rows pairwise so no scratch image is
+ * needed.
+ */
+void flipRowsInPlace(const MutableImageView2D& view) {
+  const std::size_t height = view.size().y();
+  if (height < 2)
+    return;
+
+  char* data = view.data().data();
+  const std::size_t rowStride = view.data().size() / height;
+  for (std::size_t top = 0, bottom = height - 1; top < bottom;
+       ++top, --bottom) {
+    std::swap_ranges(data + top * rowStride, data + (top + 1) * rowStride,
+                     data + bottom * rowStride);
+  }
+}
+
+}  // namespace
+
 struct RenderTarget::Impl {
+  struct AsyncRead {
+    GL::BufferImage2D image{NoCreate};
+    GLsync fence = nullptr;
+    bool unprojectDepth = false;
+  };
+
   Impl(const Magnum::Vector2i& size,
        const Magnum::Vector2& depthUnprojection,
        DepthShader* depthShader)
@@ -121,11 +178,15 @@ struct RenderTarget::Impl {
                                   GL::FramebufferBlit::Color);
   }
 
-  void readFrameRgba(const MutableImageView2D& view) {
+  void readFrameRgba(const MutableImageView2D& view, bool flipVertically) {
+    ESP_PROFILE_SCOPE("gfx.readback");
     framebuffer_.mapForRead(RgbaBuffer).read(framebuffer_.viewport(), view);
+    if (flipVertically)
+      flipRowsInPlace(view);
   }
 
-  void readFrameDepth(const MutableImageView2D& view) {
+  void readFrameDepth(const MutableImageView2D& view, bool flipVertically) {
+    ESP_PROFILE_SCOPE("gfx.readback");
     if (depthShader_) {
       unprojectDepthGPU();
       depthUnprojectionFrameBuffer_.mapForRead(UnprojectedDepthBuffer)
@@ -138,16 +199,133 @@ struct RenderTarget::Impl {
       unprojectDepth(depthUnprojection_,
                      Containers::arrayCast<Magnum::Float>(view.data()));
     }
+    if (flipVertically)
+      flipRowsInPlace(view);
   }
 
-  void readFrameObjectId(const MutableImageView2D& view) {
+  void readFrameObjectId(const MutableImageView2D& view, bool flipVertically) {
+    ESP_PROFILE_SCOPE("gfx.readback");
     framebuffer_.mapForRead(ObjectIdBuffer).read(framebuffer_.viewport(), view);
+    if (flipVertically)
+      flipRowsInPlace(view);
   }
 
   Magnum::Vector2i framebufferSize() const {
     return framebuffer_.viewport().size();
   }
 
+  AsyncRead& beginAsyncRead() {
+    CORRADE_INTERNAL_ASSERT(asyncReadCount_ < AsyncReadSlots);
+    AsyncRead& read =
+        asyncReads_[(asyncReadHead_ + asyncReadCount_) % AsyncReadSlots];
+    ++asyncReadCount_;
+    read.unprojectDepth = false;
+    return read;
+  }
+
+  void endAsyncRead(AsyncRead& read) {
+    // Everything queued so far, including the pixel transfer into the
+    // buffer, has finished once the fence is signalled
+    read.fence = glFenceSync(GL_SYNC_GPU_COMMANDS_COMPLETE, 0);
+    // Make sure the commands are submitted, otherwise waiting on the fence
+    // from another context could deadlock
+    glFlush();
+  }
+
+  void startRead(GL::AbstractFramebuffer& framebuffer,
+                 GL::PixelFormat format,
+                 GL::PixelType type,
+                 AsyncRead& read) {
+    // Each slot keeps its pixel buffer from frame to frame, it is only
+    // created on first use or when the format changes. Reading into it
+    // reallocates its storage only if the viewport grew.
+    if (!read.image.buffer().id() || read.image.format() != format ||
+        read.image.type() != type) {
+      read.image = GL::BufferImage2D{format, type};
+    }
+    framebuffer.read(framebuffer_.viewport(), read.image,
+                     GL::BufferUsage::StreamRead);
+  }
+
+  void startRead(GL::AbstractFramebuffer& framebuffer,
+                 Magnum::PixelFormat format,
+                 AsyncRead& read) {
+    startRead(framebuffer, GL::pixelFormat(format), GL::pixelType(format),
+              read);
+  }
+
+  void startReadFrameRgba(Magnum::PixelFormat format) {
+    AsyncRead& read = beginAsyncRead();
+    framebuffer_.mapForRead(RgbaBuffer);
+    startRead(framebuffer_, format, read);
+    endAsyncRead(read);
+  }
+
+  void startReadFrameDepth() {
+    AsyncRead& read = beginAsyncRead();
+    if (depthShader_) {
+      unprojectDepthGPU();
+      depthUnprojectionFrameBuffer_.mapForRead(UnprojectedDepthBuffer);
+      startRead(depthUnprojectionFrameBuffer_, Magnum::PixelFormat::R32F, read);
+    } else {
+      startRead(framebuffer_, GL::PixelFormat::DepthComponent,
+                GL::PixelType::Float, read);
+      read.unprojectDepth = true;
+    }
+    endAsyncRead(read);
+  }
+
+  void startReadFrameObjectId(Magnum::PixelFormat format) {
+    AsyncRead& read = beginAsyncRead();
+    framebuffer_.mapForRead(ObjectIdBuffer);
+    startRead(framebuffer_, format, read);
+    endAsyncRead(read);
+  }
+
+  int pendingReads() const { return asyncReadCount_; }
+
+  bool readFrameReady() const {
+    if (asyncReadCount_ == 0)
+      return false;
+
+    GLint status = GL_UNSIGNALED;
+    glGetSynciv(asyncReads_[asyncReadHead_].fence, GL_SYNC_STATUS,
+                sizeof(status), nullptr, &status);
+    return status == GL_SIGNALED;
+  }
+
+  void finishReadFrame(const MutableImageView2D& view, bool flipVertically) {
+    ESP_PROFILE_SCOPE("gfx.readback");
+    CORRADE_INTERNAL_ASSERT(asyncReadCount_ > 0);
+    AsyncRead& read = asyncReads_[asyncReadHead_];
+    CORRADE_INTERNAL_ASSERT(read.image.size() == view.size());
+
+    GLenum result = GL_TIMEOUT_EXPIRED;
+    while (result == GL_TIMEOUT_EXPIRED) {
+      // 100ms per wait, looping so a slow frame is never silently dropped
+      result = glClientWaitSync(read.fence, GL_SYNC_FLUSH_COMMANDS_BIT,
+                                100000000);
+    }
+    CORRADE_INTERNAL_ASSERT(result != GL_WAIT_FAILED);
+    glDeleteSync(read.fence);
+    read.fence = nullptr;
+
+    const std::size_t size = view.data().size();
+    Containers::ArrayView<char> mapped = read.image.buffer().map(
+        0, size, GL::Buffer::MapFlag::Read);
+    CORRADE_INTERNAL_ASSERT(mapped);
+    copyRows(mapped, view, flipVertically);
+    read.image.buffer().unmap();
+
+    if (read.unprojectDepth) {
+      unprojectDepth(depthUnprojection_,
+                     Containers::arrayCast<Magnum::Float>(view.data()));
+    }
+
+    asyncReadHead_ = (asyncReadHead_ + 1) % AsyncReadSlots;
+    --asyncReadCount_;
+  }
+
 #ifdef ESP_BUILD_WITH_CUDA
   void readFrameRgbaGPU(uint8_t* devPtr) {
     // TODO: Consider implementing the GPU read functions with EGLImage
@@ -214,6 +392,10 @@ struct RenderTarget::Impl {
 #endif
 
   ~Impl() {
+    for (AsyncRead& read : asyncReads_) {
+      if (read.fence != nullptr)
+        glDeleteSync(read.fence);
+    }
 #ifdef ESP_BUILD_WITH_CUDA
     if (colorBufferCugl_ != nullptr)
       checkCudaErrors(cudaGraphicsUnregisterResource(colorBufferCugl_));
@@ -236,6 +418,11 @@ struct RenderTarget::Impl {
   GL::Mesh depthUnprojectionMesh_;
   GL::Framebuffer depthUnprojectionFrameBuffer_;
 
+  // Ring of pixel buffers for asynchronous reads, oldest pending read first
+  std::array<AsyncRead, AsyncReadSlots> asyncReads_;
+  int asyncReadHead_ = 0;
+  int asyncReadCount_ = 0;
+
 #ifdef ESP_BUILD_WITH_CUDA
   cudaGraphicsResource_t colorBufferCugl_ = nullptr;
   cudaGraphicsResource_t objecIdBufferCugl_ = nullptr;
@@ -258,16 +445,44 @@ void RenderTarget::renderExit() {
   pimpl_->renderExit();
 }
 
-void RenderTarget::readFrameRgba(const Magnum::MutableImageView2D& view) {
-  pimpl_->readFrameRgba(view);
+void RenderTarget::readFrameRgba(const Magnum::MutableImageView2D& view,
+                                 bool flipVertically) {
+  pimpl_->readFrameRgba(view, flipVertically);
+}
+
+void RenderTarget::readFrameDepth(const Magnum::MutableImageView2D& view,
+                                 bool flipVertically) {
+  pimpl_->readFrameDepth(view, flipVertically);
+}
+
+void RenderTarget::readFrameObjectId(const Magnum::MutableImageView2D& view,
+                                 bool flipVertically) {
+  pimpl_->readFrameObjectId(view, flipVertically);
+}
+
+void RenderTarget::startReadFrameRgba(Magnum::PixelFormat format) {
+  pimpl_->startReadFrameRgba(format);
+}
+
+void RenderTarget::startReadFrameDepth() {
+  pimpl_->startReadFrameDepth();
+}
+
+void RenderTarget::startReadFrameObjectId(Magnum::PixelFormat format) {
+  pimpl_->startReadFrameObjectId(format);
+}
+
+int RenderTarget::pendingReads() const {
+  return pimpl_->pendingReads();
 }
 
-void RenderTarget::readFrameDepth(const Magnum::MutableImageView2D& view) {
-  pimpl_->readFrameDepth(view);
+bool RenderTarget::readFrameReady() const {
+  return pimpl_->readFrameReady();
 }
 
-void RenderTarget::readFrameObjectId(const Magnum::MutableImageView2D& view) {
-  pimpl_->readFrameObjectId(view);
+void RenderTarget::finishReadFrame(const Magnum::MutableImageView2D& view,
+                                   bool flipVertically) {
+  pimpl_->finishReadFrame(view, flipVertically);
 }
 
 void RenderTarget::blitRgbaToDefault() {
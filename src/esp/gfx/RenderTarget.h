@@ -5,6 +5,7 @@
 #pragma once
 
 #include <Magnum/Magnum.h>
+#include <Magnum/PixelFormat.h>
 
 #include "esp/core/esp.h"
 
@@ -71,8 +72,11 @@ class RenderTarget {
    *
    * @param[in, out] view Preallocated memory that will be populated with the
    * result.  The result will be read as the pixel format of this view.
+   * @param flipVertically Whether or not to return the rows top-to-bottom
+   * instead of in OpenGL's bottom-to-top order.  The flip is done in place.
    */
-  void readFrameRgba(const Magnum::MutableImageView2D& view);
+  void readFrameRgba(const Magnum::MutableImageView2D& view,
+                     bool flipVertically = false);
 
   /**
    * @brief Retrieve the depth rendering results.
@@ -80,8 +84,10 @@ class RenderTarget {
    * @param[in, out] view Preallocated memory that will be populated with the
    * result.  The PixelFormat of the image must only specify the R channel,
    * generally @ref Magnum::PixelFormat::R32F
+   * @param flipVertically See @ref readFrameRgba()
    */
-  void readFrameDepth(const Magnum::MutableImageView2D& view);
+  void readFrameDepth(const Magnum::MutableImageView2D& view,
+                      bool flipVertically = false);
 
   /**
    * @brief Reads the ObjectID rendering results into the memory specified by
@@ -92,8 +98,68 @@ class RenderTarget {
    * be a format which a uint16_t can be interpreted as, generally @ref
    * Magnum::PixelFormat::R32UI, @ref Magnum::PixelFormat::R32I, or @ref
    * Magnum::PixelFormat::R16UI
+   * @param flipVertically See @ref readFrameRgba()
    */
-  void readFrameObjectId(const Magnum::MutableImageView2D& view);
+  void readFrameObjectId(const Magnum::MutableImageView2D& view,
+                         bool flipVertically = false);
+
+  /**
+   * @brief Maximum number of asynchronous reads that can be in flight
+   */
+  static constexpr int AsyncReadSlots = 2;
+
+  /**
+   * @brief Starts an asynchronous read of the RGBA rendering results into an
+   * internal pixel buffer object and returns without waiting for the GPU.
+   *
+   * The frame can be rendered over as soon as this returns.  Retrieve the
+   * result with @ref finishReadFrame().  At most @ref AsyncReadSlots reads
+   * may be pending at once.
+   *
+   * @param format The pixel format the result will be read as
+   */
+  void startReadFrameRgba(
+      Magnum::PixelFormat format = Magnum::PixelFormat::RGBA8Unorm);
+
+  /**
+   * @brief Starts an asynchronous read of the depth rendering results.  See
+   * @ref startReadFrameRgba()
+   *
+   * The result is unprojected on the GPU if the target has a DepthShader,
+   * otherwise in @ref finishReadFrame().
+   */
+  void startReadFrameDepth();
+
+  /**
+   * @brief Starts an asynchronous read of the ObjectID rendering results.
+   * See @ref startReadFrameRgba()
+   *
+   * @param format The pixel format the result will be read as
+   */
+  void startReadFrameObjectId(
+      Magnum::PixelFormat format = Magnum::PixelFormat::R32UI);
+
+  /**
+   * @brief Number of asynchronous reads that were started but not finished
+   */
+  int pendingReads() const;
+
+  /**
+   * @brief Whether the oldest pending asynchronous read has completed on the
+   * GPU, i.e. whether @ref finishReadFrame() would not block
+   */
+  bool readFrameReady() const;
+
+  /**
+   * @brief Waits for the oldest pending asynchronous read and copies its
+   * result into view
+   *
+   * @param[in, out] view Preallocated memory that will be populated with the
+   * result.  Must match the size and pixel size of the started read.
+   * @param flipVertically See @ref readFrameRgba()
+   */
+  void finishReadFrame(const Magnum::MutableImageView2D& view,
+                       bool flipVertically = false);
 
   /**
    * @brief Blits the rgba buffer from internal FBO to default frame buffer
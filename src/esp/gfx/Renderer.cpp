@@ -17,6 +17,7 @@
 #include <Magnum/Image.h>
 #include <Magnum/PixelFormat.h>
 
+#include "esp/core/Profiler.h"
 #include "esp/gfx/DepthUnprojection.h"
 #include "esp/gfx/magnum.h"
 
@@ -33,6 +34,7 @@ struct Renderer::Impl {
   ~Impl() { LOG(INFO) << "Deconstructing Renderer"; }
 
   void draw(RenderCamera& camera, MagnumDrawableGroup& drawables) {
+    ESP_PROFILE_SCOPE("gfx.draw");
     camera.draw(drawables);
   }
 
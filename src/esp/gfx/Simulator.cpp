@@ -4,12 +4,14 @@
 
 #include "Simulator.h"
 
+#include <set>
 #include <string>
 
 #include <Corrade/Utility/Directory.h>
 
 #include "Drawable.h"
 
+#include "esp/core/Profiler.h"
 #include "esp/core/esp.h"
 #include "esp/gfx/RenderCamera.h"
 #include "esp/gfx/Renderer.h"
@@ -24,6 +26,24 @@ namespace Cr = Corrade;
 namespace esp {
 namespace gfx {
 
+namespace {
+
+std::string getSceneMeshFilename(const scene::SceneConfiguration& sceneCfg) {
+  if (sceneCfg.filepaths.count("mesh")) {
+    return sceneCfg.filepaths.at("mesh");
+  }
+  return sceneCfg.id;
+}
+
+std::string getHouseFilename(const scene::SceneConfiguration& sceneCfg) {
+  if (sceneCfg.filepaths.count("house")) {
+    return sceneCfg.filepaths.at("house");
+  }
+  return io::changeExtension(getSceneMeshFilename(sceneCfg), ".house");
+}
+
+}  // namespace
+
 Simulator::Simulator(const SimulatorConfiguration& cfg) {
   // initalize members according to cfg
   // NOTE: NOT SO GREAT NOW THAT WE HAVE virtual functions
@@ -46,15 +66,8 @@ void Simulator::reconfigure(const SimulatorConfiguration& cfg) {
   config_ = cfg;
 
   // load scene
-  std::string sceneFilename = cfg.scene.id;
-  if (cfg.scene.filepaths.count("mesh")) {
-    sceneFilename = cfg.scene.filepaths.at("mesh");
-  }
-
-  std::string houseFilename = io::changeExtension(sceneFilename, ".house");
-  if (cfg.scene.filepaths.count("house")) {
-    houseFilename = cfg.scene.filepaths.at("house");
-  }
+  std::string sceneFilename = getSceneMeshFilename(cfg.scene);
+  std::string houseFilename = getHouseFilename(cfg.scene);
 
   const assets::AssetInfo sceneInfo =
       assets::AssetInfo::fromPath(sceneFilename);
@@ -65,6 +78,12 @@ void Simulator::reconfigure(const SimulatorConfiguration& cfg) {
   // TODO:
   // We need to make a design decision here:
   // when doing reconfigure, shall we delete all of the previous scene graphs
+  // Until then, only the scene meshes are removed from them, so that their
+  // assets can leave the scene cache
+  for (int sceneID : sceneID_) {
+    assets::ResourceManager::releaseSceneInstances(
+        sceneManager_.getSceneGraph(sceneID).getRootNode());
+  }
   activeSceneID_ = sceneManager_.initSceneGraph();
 
   // LOG(INFO) << "Active scene graph ID = " << activeSceneID_;
@@ -95,6 +114,7 @@ void Simulator::reconfigure(const SimulatorConfiguration& cfg) {
       loadSuccess =
           resourceManager_.loadScene(sceneInfo, &rootNode, &drawables);
     }
+    std::set<std::string> scenesInUse{sceneInfo.filepath};
     if (!loadSuccess) {
       LOG(ERROR) << "cannot load " << sceneFilename;
       // Pass the error to the python through pybind11 allowing graceful exit
@@ -119,10 +139,15 @@ void Simulator::reconfigure(const SimulatorConfiguration& cfg) {
             assets::AssetInfo::fromPath(semanticMeshFilename);
         resourceManager_.loadScene(semanticSceneInfo, &semanticRootNode,
                                    &semanticDrawables);
+        scenesInUse.insert(semanticSceneInfo.filepath);
       }
       LOG(INFO) << "Loaded.";
     }
 
+    // Keep previously loaded scenes around for later reconfigures, as long
+    // as they fit into the cache budget
+    resourceManager_.trimSceneCache(scenesInUse);
+
     // instance meshes and suncg houses contain their semantic annotations
     if (sceneInfo.type == assets::AssetType::SUNCG_SCENE ||
         sceneInfo.type == assets::AssetType::INSTANCE_MESH) {
@@ -132,28 +157,32 @@ void Simulator::reconfigure(const SimulatorConfiguration& cfg) {
 
   semanticScene_ = nullptr;
   semanticScene_ = scene::SemanticScene::create();
-  switch (sceneInfo.type) {
+  loadSemanticScene(cfg.scene, *semanticScene_);
+
+  // now reset to sample agent state
+  reset();
+}
+
+bool Simulator::loadSemanticScene(const scene::SceneConfiguration& sceneCfg,
+                                  scene::SemanticScene& semanticScene) {
+  const std::string sceneFilename = getSceneMeshFilename(sceneCfg);
+  std::string houseFilename = getHouseFilename(sceneCfg);
+  switch (assets::AssetInfo::fromPath(sceneFilename).type) {
     case assets::AssetType::INSTANCE_MESH:
       houseFilename = Cr::Utility::Directory::join(
           Cr::Utility::Directory::path(houseFilename), "info_semantic.json");
-      if (io::exists(houseFilename)) {
-        scene::SemanticScene::loadReplicaHouse(houseFilename, *semanticScene_);
-      }
-      break;
+      return io::exists(houseFilename) &&
+             scene::SemanticScene::loadReplicaHouse(houseFilename,
+                                                    semanticScene);
     case assets::AssetType::MP3D_MESH:
-      if (io::exists(houseFilename)) {
-        scene::SemanticScene::loadMp3dHouse(houseFilename, *semanticScene_);
-      }
-      break;
+      return io::exists(houseFilename) &&
+             scene::SemanticScene::loadMp3dHouse(houseFilename, semanticScene);
     case assets::AssetType::SUNCG_SCENE:
-      scene::SemanticScene::loadSuncgHouse(sceneFilename, *semanticScene_);
-      break;
+      return scene::SemanticScene::loadSuncgHouse(sceneFilename,
+                                                  semanticScene);
     default:
-      break;
+      return false;
   }
-
-  // now reset to sample agent state
-  reset();
 }
 
 void Simulator::reset() {
@@ -312,13 +341,68 @@ Magnum::Quaternion Simulator::getRotation(const int objectID,
   return Magnum::Quaternion();
 }
 
+void Simulator::setLinearVelocity(const Magnum::Vector3& linVel,
+                                  const int objectID,
+                                  const int sceneID) {
+  if (physicsManager_ != nullptr && sceneID >= 0 && sceneID < sceneID_.size()) {
+    physicsManager_->setLinearVelocity(objectID, linVel);
+  }
+}
+
+Magnum::Vector3 Simulator::getLinearVelocity(const int objectID,
+                                             const int sceneID) {
+  if (physicsManager_ != nullptr && sceneID >= 0 && sceneID < sceneID_.size()) {
+    return physicsManager_->getLinearVelocity(objectID);
+  }
+  return Magnum::Vector3();
+}
+
+void Simulator::setAngularVelocity(const Magnum::Vector3& angVel,
+                                   const int objectID,
+                                   const int sceneID) {
+  if (physicsManager_ != nullptr && sceneID >= 0 && sceneID < sceneID_.size()) {
+    physicsManager_->setAngularVelocity(objectID, angVel);
+  }
+}
+
+Magnum::Vector3 Simulator::getAngularVelocity(const int objectID,
+                                              const int sceneID) {
+  if (physicsManager_ != nullptr && sceneID >= 0 && sceneID < sceneID_.size()) {
+    return physicsManager_->getAngularVelocity(objectID);
+  }
+  return Magnum::Vector3();
+}
+
 double Simulator::stepWorld(const double dt) {
+  ESP_PROFILE_SCOPE("physics.step_world");
   if (physicsManager_ != nullptr) {
     physicsManager_->stepPhysics(dt);
   }
   return getWorldTime();
 }
 
+void Simulator::prefetchScene(const scene::SceneConfiguration& sceneCfg) {
+  resourceManager_.prefetchScene(
+      assets::AssetInfo::fromPath(getSceneMeshFilename(sceneCfg)));
+
+  // TODO: remove hardcoded filename change, see reconfigure()
+  const std::string semanticMeshFilename =
+      io::removeExtension(getHouseFilename(sceneCfg)) + "_semantic.ply";
+  if (io::exists(semanticMeshFilename)) {
+    resourceManager_.prefetchScene(
+        assets::AssetInfo::fromPath(semanticMeshFilename));
+  }
+}
+
+void Simulator::setSceneCacheBudget(size_t bytes) {
+  resourceManager_.setSceneCacheBudget(bytes);
+}
+
+assets::ResourceManager::SceneCacheStats Simulator::getSceneCacheStats()
+    const {
+  return resourceManager_.getSceneCacheStats();
+}
+
 // get the simulated world time (0 if no physics enabled)
 double Simulator::getWorldTime() {
   if (physicsManager_ != nullptr) {
@@ -327,5 +411,11 @@ double Simulator::getWorldTime() {
   return NO_TIME;
 }
 
+void Simulator::setWorldTime(double worldTime) {
+  if (physicsManager_ != nullptr) {
+    physicsManager_->setWorldTime(worldTime);
+  }
+}
+
 }  // namespace gfx
 }  // namespace esp
@@ -67,6 +67,16 @@ class Simulator {
   scene::SceneGraph& getActiveSceneGraph();
   scene::SceneGraph& getActiveSemanticSceneGraph();
 
+  /**
+   * @brief Load the semantic annotations of a scene, if it has any, without
+   * loading the scene itself. Needs no GL context.
+   * @param sceneCfg The scene whose annotations to load.
+   * @param semanticScene The scene to load the annotations into.
+   * @return Whether annotations were found and loaded.
+   */
+  static bool loadSemanticScene(const scene::SceneConfiguration& sceneCfg,
+                                scene::SemanticScene& semanticScene);
+
   void saveFrame(const std::string& filename);
 
   /**
@@ -224,6 +234,55 @@ class Simulator {
    */
   Magnum::Quaternion getRotation(const int objectID, const int sceneID = 0);
 
+  /**
+   * @brief Set the linear velocity of an object.
+   * See @ref esp::physics::PhysicsManager::setLinearVelocity.
+   * @param linVel The desired linear velocity of the object.
+   * @param objectID The object ID and key identifying the object in @ref
+   * esp::physics::PhysicsManager::existingObjects_.
+   * @param sceneID !! Not used currently !! Specifies which physical scene of
+   * the object.
+   */
+  void setLinearVelocity(const Magnum::Vector3& linVel,
+                         const int objectID,
+                         const int sceneID = 0);
+
+  /**
+   * @brief Get the linear velocity of an object.
+   * See @ref esp::physics::PhysicsManager::getLinearVelocity.
+   * @param objectID The object ID and key identifying the object in @ref
+   * esp::physics::PhysicsManager::existingObjects_.
+   * @param sceneID !! Not used currently !! Specifies which physical scene of
+   * the object.
+   * @return The linear velocity of the object.
+   */
+  Magnum::Vector3 getLinearVelocity(const int objectID, const int sceneID = 0);
+
+  /**
+   * @brief Set the angular velocity of an object.
+   * See @ref esp::physics::PhysicsManager::setAngularVelocity.
+   * @param angVel The desired angular velocity of the object.
+   * @param objectID The object ID and key identifying the object in @ref
+   * esp::physics::PhysicsManager::existingObjects_.
+   * @param sceneID !! Not used currently !! Specifies which physical scene of
+   * the object.
+   */
+  void setAngularVelocity(const Magnum::Vector3& angVel,
+                          const int objectID,
+                          const int sceneID = 0);
+
+  /**
+   * @brief Get the angular velocity of an object.
+   * See @ref esp::physics::PhysicsManager::getAngularVelocity.
+   * @param objectID The object ID and key identifying the object in @ref
+   * esp::physics::PhysicsManager::existingObjects_.
+   * @param sceneID !! Not used currently !! Specifies which physical scene of
+   * the object.
+   * @return The angular velocity of the object.
+   */
+  Magnum::Vector3 getAngularVelocity(const int objectID,
+                                     const int sceneID = 0);
+
   // the physical world has a notion of time which passes during
   // animation/simulation/action/etc... return the new world time after stepping
 
@@ -250,6 +309,47 @@ class Simulator {
    */
   double getWorldTime();
 
+  /**
+   * @brief Set the current time in the simulated world without stepping it,
+   * e.g. to restore a snapshot. Does nothing if no @ref
+   * esp::physics::PhysicsManager is initialized. See @ref
+   * esp::physics::PhysicsManager::setWorldTime.
+   * @param worldTime The new world time.
+   */
+  void setWorldTime(double worldTime);
+
+  /**
+   * @brief Get the state of the simulator's random number generator, to be
+   * restored with @ref setRandomState.
+   */
+  std::string getRandomState() const { return random_.getState(); }
+
+  /**
+   * @brief Restore a random number generator state returned by @ref
+   * getRandomState.
+   */
+  void setRandomState(const std::string& state) { random_.setState(state); }
+
+  /**
+   * @brief Start loading the scene files of a future @ref reconfigure() on
+   * background threads.  See @ref esp::assets::ResourceManager::prefetchScene.
+   * @param sceneCfg The scene that will be loaded next.
+   */
+  void prefetchScene(const scene::SceneConfiguration& sceneCfg);
+
+  /**
+   * @brief Set the memory budget of the cache of scenes loaded by previous
+   * reconfigures.  See @ref esp::assets::ResourceManager::setSceneCacheBudget.
+   * @param bytes The budget in bytes, 0 for no limit.
+   */
+  void setSceneCacheBudget(size_t bytes);
+
+  /**
+   * @brief Get hit, miss and eviction counts of the scene cache.  See @ref
+   * esp::assets::ResourceManager::getSceneCacheStats.
+   */
+  assets::ResourceManager::SceneCacheStats getSceneCacheStats() const;
+
  protected:
   Simulator(){};
 
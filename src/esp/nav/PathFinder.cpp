@@ -3,7 +3,12 @@
 // LICENSE file in the root directory of this source tree.
 
 #include "PathFinder.h"
+#include <algorithm>
+#include <atomic>
+#include <functional>
+#include <queue>
 #include <stack>
+#include <thread>
 #include <unordered_map>
 
 #include <Magnum/Magnum.h>
@@ -18,7 +23,9 @@
 #include <limits>
 
 #include "esp/assets/MeshData.h"
+#include "esp/core/Profiler.h"
 #include "esp/core/esp.h"
+#include "esp/core/random.h"
 
 #include "DetourNavMesh.h"
 #include "DetourNavMeshBuilder.h"
@@ -75,7 +82,9 @@ class IslandSystem {
         if (navMesh->isValidPolyRef(startRef) &&
             (polyToIsland_.find(startRef) == polyToIsland_.end())) {
           uint32_t newIslandId = islandRadius_.size();
-          expandFrom(navMesh, filter, newIslandId, startRef, islandVerts);
+          float area = expandFrom(navMesh, filter, newIslandId, startRef,
+                                  islandVerts);
+          islandArea_.emplace_back(area);
 
           // The radius is calculated as the max deviation from the mean for all
           // points in the island
@@ -118,17 +127,32 @@ class IslandSystem {
     return islandRadius_[itRef->second];
   }
 
+  //! Id of the island of a polygon, -1 if it is not on any
+  inline int islandId(dtPolyRef ref) const {
+    auto itRef = polyToIsland_.find(ref);
+    if (itRef == polyToIsland_.end())
+      return -1;
+
+    return itRef->second;
+  }
+
+  //! Surface area of each island, indexed by island id
+  inline const std::vector<float>& islandAreas() const { return islandArea_; }
+
  private:
   std::unordered_map<dtPolyRef, uint32_t> polyToIsland_;
   std::vector<float> islandRadius_;
+  std::vector<float> islandArea_;
 
-  void expandFrom(const dtNavMesh* navMesh,
+  // Returns the surface area of the island
+  float expandFrom(const dtNavMesh* navMesh,
                   const dtQueryFilter* filter,
                   const uint32_t newIslandId,
                   const dtPolyRef& startRef,
                   std::vector<vec3f>& islandVerts) {
     polyToIsland_.emplace(startRef, newIslandId);
     islandVerts.clear();
+    float area = 0;
 
     // Force std::stack to be implemented via an std::vector as linked
     // lists are gross
@@ -144,10 +168,18 @@ class IslandSystem {
       const dtPoly* poly = 0;
       navMesh->getTileAndPolyByRefUnsafe(ref, &tile, &poly);
 
+      const size_t firstVert = islandVerts.size();
       for (int iVert = 0; iVert < poly->vertCount; ++iVert) {
         islandVerts.emplace_back(
             Eigen::Map<vec3f>(&tile->verts[poly->verts[iVert] * 3]));
       }
+      // Polygons are convex, so their area is the one of their triangle fan
+      for (int iVert = 2; iVert < poly->vertCount; ++iVert) {
+        const vec3f& a = islandVerts[firstVert];
+        const vec3f& b = islandVerts[firstVert + iVert - 1];
+        const vec3f& c = islandVerts[firstVert + iVert];
+        area += 0.5f * (b - a).cross(c - a).norm();
+      }
 
       // Iterate over all neighbours
       for (unsigned int iLink = poly->firstLink; iLink != DT_NULL_LINK;
@@ -170,6 +202,8 @@ class IslandSystem {
         stack.push(neighbourRef);
       }
     }
+
+    return area;
   }
 };
 }  // namespace impl
@@ -203,17 +237,17 @@ enum PolyFlags {
 };
 }  // namespace
 
-PathFinder::PathFinder() : navMesh_(0), navQuery_(0), filter_(0) {
+PathFinder::PathFinder() : navQuery_(0), filter_(0) {
   filter_ = new dtQueryFilter();
   filter_->setIncludeFlags(POLYFLAGS_WALK);
   filter_->setExcludeFlags(0);
 }
 
 void PathFinder::free() {
-  if (navMesh_) {
-    dtFreeNavMesh(navMesh_);
-    navMesh_ = 0;
-  }
+  // the pooled queries reference the navmesh
+  freeQueryPool();
+  // the navmesh is only freed once its last clone lets go of it
+  navMesh_.reset();
   if (navQuery_) {
     dtFreeNavMeshQuery(navQuery_);
     navQuery_ = 0;
@@ -222,9 +256,7 @@ void PathFinder::free() {
     delete filter_;
   }
 
-  if (islandSystem_) {
-    delete islandSystem_;
-  }
+  islandSystem_.reset();
 }
 
 bool PathFinder::build(const NavMeshSettings& bs,
@@ -512,8 +544,7 @@ bool PathFinder::build(const NavMeshSettings& bs,
       return false;
     }
 
-    navMesh_ = 0;
-    navMesh_ = dtAllocNavMesh();
+    navMesh_.reset(dtAllocNavMesh(), dtFreeNavMesh);
     if (!navMesh_) {
       dtFree(navData);
       LOG(ERROR) << "Could not allocate Detour navmesh";
@@ -539,14 +570,17 @@ bool PathFinder::build(const NavMeshSettings& bs,
 }
 
 bool PathFinder::initNavQuery() {
+  // the pooled queries are for the previous navmesh
+  freeQueryPool();
   navQuery_ = dtAllocNavMeshQuery();
-  dtStatus status = navQuery_->init(navMesh_, 2048);
+  dtStatus status = navQuery_->init(navMesh_.get(), 2048);
   if (dtStatusFailed(status)) {
     LOG(ERROR) << "Could not init Detour navmesh query";
     return false;
   }
 
-  islandSystem_ = new impl::IslandSystem(navMesh_, filter_);
+  islandSystem_ =
+      std::make_shared<impl::IslandSystem>(navMesh_.get(), filter_);
 
   return true;
 }
@@ -665,11 +699,31 @@ bool PathFinder::loadNavMesh(const std::string& path) {
 
   fclose(fp);
 
-  navMesh_ = mesh;
+  navMesh_.reset(mesh, dtFreeNavMesh);
   bounds_ = std::make_pair(bmin, bmax);
   return initNavQuery();
 }
 
+PathFinder::ptr PathFinder::clone() const {
+  auto pathFinder = PathFinder::create();
+  *pathFinder->filter_ = *filter_;
+  pathFinder->bounds_ = bounds_;
+  if (!navMesh_) {
+    return pathFinder;
+  }
+
+  pathFinder->navQuery_ = dtAllocNavMeshQuery();
+  dtStatus status = pathFinder->navQuery_->init(navMesh_.get(), 2048);
+  if (dtStatusFailed(status)) {
+    LOG(ERROR) << "Could not init Detour navmesh query";
+    return pathFinder;
+  }
+  pathFinder->navMesh_ = navMesh_;
+  pathFinder->islandSystem_ = islandSystem_;
+
+  return pathFinder;
+}
+
 bool PathFinder::saveNavMesh(const std::string& path) {
   if (!navMesh_)
     return false;
@@ -684,7 +738,7 @@ bool PathFinder::saveNavMesh(const std::string& path) {
   header.version = NAVMESHSET_VERSION;
   header.numTiles = 0;
   for (int i = 0; i < navMesh_->getMaxTiles(); ++i) {
-    const dtMeshTile* tile = ((const dtNavMesh*)navMesh_)->getTile(i);
+    const dtMeshTile* tile = ((const dtNavMesh*)navMesh_.get())->getTile(i);
     if (!tile || !tile->header || !tile->dataSize)
       continue;
     header.numTiles++;
@@ -694,7 +748,7 @@ bool PathFinder::saveNavMesh(const std::string& path) {
 
   // Store tiles.
   for (int i = 0; i < navMesh_->getMaxTiles(); ++i) {
-    const dtMeshTile* tile = ((const dtNavMesh*)navMesh_)->getTile(i);
+    const dtMeshTile* tile = ((const dtNavMesh*)navMesh_.get())->getTile(i);
     if (!tile || !tile->header || !tile->dataSize)
       continue;
 
@@ -715,6 +769,7 @@ void PathFinder::seed(uint32_t newSeed) {
   // TODO: this should be using core::Random instead, but passing function
   // to navQuery_->findRandomPoint needs to be figured out first
   srand(newSeed);
+  random_.seed(newSeed);
 }
 
 // Returns a random number [0..1]
@@ -732,6 +787,154 @@ vec3f PathFinder::getRandomNavigablePoint() {
   return pt;
 }
 
+namespace {
+//! A triangle of the fan of a navmesh polygon
+struct NavTriangle {
+  dtPolyRef ref;
+  vec3f a, b, c;
+};
+
+//! Twice the area of a triangle projected on the xz plane, as Detour weights
+//! polygons when sampling
+float triangleArea2D(const vec3f& a, const vec3f& b, const vec3f& c) {
+  return std::abs((b[0] - a[0]) * (c[2] - a[2]) -
+                  (c[0] - a[0]) * (b[2] - a[2]));
+}
+}  // namespace
+
+bool PathFinder::sampleNavigablePoints(int n,
+                                       const NavPointConstraints& constraints,
+                                       uint32_t seed,
+                                       NavPoints& points) {
+  ESP_PROFILE_SCOPE("nav.sample_navigable_points");
+  points.resize(n, 3);
+  if (n == 0) {
+    return true;
+  }
+  if (!isLoaded()) {
+    LOG(ERROR) << "Cannot sample points without a navmesh";
+    return false;
+  }
+  std::unique_lock<std::mutex> lock;
+  dtNavMeshQuery* navQuery = lockPooledQuery(lock);
+  if (navQuery == nullptr) {
+    return false;
+  }
+
+  int island = constraints.islandId;
+  if (constraints.sameIslandAs) {
+    island = islandIdWithQuery(constraints.islandPoint, navQuery);
+    if (island < 0) {
+      LOG(ERROR) << "The island point is not on the navmesh";
+      return false;
+    }
+  }
+
+  // Collect the triangles of the eligible polygons with their cumulative
+  // area
+  std::vector<NavTriangle> triangles;
+  std::vector<float> cumulativeArea;
+  float totalArea = 0;
+  const dtNavMesh* navMesh = navMesh_.get();
+  for (int iTile = 0; iTile < navMesh->getMaxTiles(); ++iTile) {
+    const dtMeshTile* tile = navMesh->getTile(iTile);
+    if (!tile || !tile->header)
+      continue;
+
+    for (int jPoly = 0; jPoly < tile->header->polyCount; ++jPoly) {
+      const dtPoly* poly = &tile->polys[jPoly];
+      if (poly->getType() != DT_POLYTYPE_GROUND)
+        continue;
+      dtPolyRef ref = navMesh->encodePolyId(iTile, tile->salt, jPoly);
+      if (!filter_->passFilter(ref, tile, poly))
+        continue;
+      if (island >= 0 && islandSystem_->islandId(ref) != island)
+        continue;
+
+      auto vert = [&](int iVert) -> vec3f {
+        return Eigen::Map<vec3f>(&tile->verts[poly->verts[iVert] * 3]);
+      };
+      float polyMinY = std::numeric_limits<float>::infinity();
+      float polyMaxY = -std::numeric_limits<float>::infinity();
+      for (int iVert = 0; iVert < poly->vertCount; ++iVert) {
+        polyMinY = std::min(polyMinY, vert(iVert)[1]);
+        polyMaxY = std::max(polyMaxY, vert(iVert)[1]);
+      }
+      if (polyMaxY < constraints.minY || polyMinY > constraints.maxY)
+        continue;
+
+      for (int iVert = 2; iVert < poly->vertCount; ++iVert) {
+        NavTriangle triangle{ref, vert(0), vert(iVert - 1), vert(iVert)};
+        const float area = triangleArea2D(triangle.a, triangle.b, triangle.c);
+        if (area <= 0)
+          continue;
+        totalArea += area;
+        triangles.push_back(triangle);
+        cumulativeArea.push_back(totalArea);
+      }
+    }
+  }
+  if (triangles.empty()) {
+    LOG(ERROR) << "No navigable area meets the sampling constraints";
+    return false;
+  }
+
+  core::Random random(seed);
+  auto drawPoint = [&](float u) -> vec3f {
+    const int iTriangle = std::min<int>(
+        std::lower_bound(cumulativeArea.begin(), cumulativeArea.end(),
+                         u * totalArea) -
+            cumulativeArea.begin(),
+        triangles.size() - 1);
+    const NavTriangle& triangle = triangles[iTriangle];
+
+    const float s = std::sqrt(random.uniform_float_01());
+    const float t = random.uniform_float_01();
+    vec3f pt = (1 - s) * triangle.a + s * (1 - t) * triangle.b +
+               s * t * triangle.c;
+    float height;
+    if (dtStatusSucceed(
+            navQuery->getPolyHeight(triangle.ref, pt.data(), &height))) {
+      pt[1] = height;
+    }
+    return pt;
+  };
+  auto meetsConstraints = [&](const vec3f& pt) {
+    if (pt[1] < constraints.minY || pt[1] > constraints.maxY)
+      return false;
+    return constraints.minObstacleDistance <= 0 ||
+           closestObstacleSurfacePointWithQuery(
+               pt, constraints.minObstacleDistance, navQuery)
+                   .hitDist >= constraints.minObstacleDistance;
+  };
+
+  for (int i = 0; i < n; ++i) {
+    // the first draw is stratified, retries are drawn from the whole area
+    float u = (i + random.uniform_float_01()) / n;
+    int iTry = 0;
+    vec3f pt = drawPoint(u);
+    while (!meetsConstraints(pt)) {
+      if (++iTry >= constraints.maxTries) {
+        LOG(ERROR) << "Could not sample a point meeting the constraints in "
+                   << constraints.maxTries << " tries";
+        return false;
+      }
+      pt = drawPoint(random.uniform_float_01());
+    }
+    points.row(i) = pt.transpose();
+  }
+
+  // shuffle so that the order of the points does not follow the strata
+  for (int i = n - 1; i > 0; --i) {
+    const int j = random.uniform_uint() % (i + 1);
+    if (i != j) {
+      points.row(i).swap(points.row(j));
+    }
+  }
+
+  return true;
+}
+
 bool PathFinder::findPath(ShortestPath& path) {
   MultiGoalShortestPath tmp;
   tmp.requestedStart = path.requestedStart;
@@ -746,6 +949,11 @@ bool PathFinder::findPath(ShortestPath& path) {
 }
 
 bool PathFinder::findPath(MultiGoalShortestPath& path) {
+  return findPathWithQuery(path, navQuery_);
+}
+
+bool PathFinder::findPathWithQuery(MultiGoalShortestPath& path,
+                                   dtNavMeshQuery* navQuery) {
   // initialize
   static const int MAX_POLYS = 256;
   dtPolyRef polys[MAX_POLYS];
@@ -758,7 +966,7 @@ bool PathFinder::findPath(MultiGoalShortestPath& path) {
   int numPolys = 0;
   dtStatus status;
   std::tie(status, startRef, pathStart) =
-      projectToPoly(path.requestedStart, navQuery_, filter_);
+      projectToPoly(path.requestedStart, navQuery, filter_);
 
   if (status != DT_SUCCESS || startRef == 0) {
     return false;
@@ -771,7 +979,7 @@ bool PathFinder::findPath(MultiGoalShortestPath& path) {
     pathEnds.emplace_back();
     endRefs.emplace_back();
     std::tie(status, endRefs.back(), pathEnds.back()) =
-        projectToPoly(rqEnd, navQuery_, filter_);
+        projectToPoly(rqEnd, navQuery, filter_);
 
     pathEndsCoords.emplace_back(pathEnds.back()[0]);
     pathEndsCoords.emplace_back(pathEnds.back()[1]);
@@ -800,7 +1008,7 @@ bool PathFinder::findPath(MultiGoalShortestPath& path) {
   }
 
   int goalFoundIdx;
-  status = navQuery_->findBidirPathToAny(
+  status = navQuery->findBidirPathToAny(
       endRefs.size(), startRef, endRefs.data(), path.requestedStart.data(),
       pathEndsCoords.data(), filter_, polys, &numPolys, MAX_POLYS,
       &goalFoundIdx);
@@ -812,7 +1020,7 @@ bool PathFinder::findPath(MultiGoalShortestPath& path) {
     const vec3f& closestRequestedEnd = path.requestedEnds[goalFoundIdx];
 
     path.points.resize(MAX_POLYS);
-    status = navQuery_->findStraightPath(
+    status = navQuery->findStraightPath(
         path.requestedStart.data(), closestRequestedEnd.data(), polys, numPolys,
         path.points[0].data(), 0, 0, &numPoints, MAX_POLYS);
 
@@ -841,20 +1049,28 @@ bool PathFinder::findPath(MultiGoalShortestPath& path) {
 
 template <typename T>
 T PathFinder::tryStep(const T& start, const T& end) {
+  ESP_PROFILE_SCOPE("nav.try_step");
+  return tryStepWithQuery(start, end, navQuery_);
+}
+
+template <typename T>
+T PathFinder::tryStepWithQuery(const T& start,
+                               const T& end,
+                               dtNavMeshQuery* navQuery) {
   static const int MAX_POLYS = 256;
   dtPolyRef polys[MAX_POLYS];
 
   dtPolyRef startRef, endRef;
   vec3f pathStart, pathEnd;
   std::tie(std::ignore, startRef, pathStart) =
-      projectToPoly(start, navQuery_, filter_);
+      projectToPoly(start, navQuery, filter_);
   std::tie(std::ignore, endRef, pathEnd) =
-      projectToPoly(end, navQuery_, filter_);
+      projectToPoly(end, navQuery, filter_);
   vec3f endPoint;
   int numPolys;
-  navQuery_->moveAlongSurface(startRef, pathStart.data(), pathEnd.data(),
-                              filter_, endPoint.data(), polys, &numPolys,
-                              MAX_POLYS);
+  navQuery->moveAlongSurface(startRef, pathStart.data(), pathEnd.data(),
+                             filter_, endPoint.data(), polys, &numPolys,
+                             MAX_POLYS);
 
   // Hack to deal with infinitely thin walls in recast allowing you to
   // transition between two different connected components
@@ -862,7 +1078,7 @@ T PathFinder::tryStep(const T& start, const T& end) {
   // is in the same connected component as the startRef according to
   // findNearestPoly
   std::tie(std::ignore, endRef, std::ignore) =
-      projectToPoly(endPoint, navQuery_, filter_);
+      projectToPoly(endPoint, navQuery, filter_);
   if (!this->islandSystem_->hasConnection(startRef, endRef)) {
     // There isn't a connection!  This happens when endPoint is on an edge
     // shared between two different connected components (aka infinitely thin
@@ -889,15 +1105,491 @@ T PathFinder::tryStep(const T& start, const T& end) {
   return T{endPoint};
 }
 
+void PathFinder::findPaths(const NavPoints& starts,
+                           const NavPoints& ends,
+                           Eigen::VectorXf& geodesicDistances,
+                           std::vector<NavPoints>* points,
+                           int numThreads) {
+  ESP_PROFILE_SCOPE("nav.find_paths");
+  ASSERT(starts.rows() == ends.rows());
+  const int numPaths = starts.rows();
+  geodesicDistances.setConstant(numPaths,
+                                std::numeric_limits<float>::infinity());
+  if (points != nullptr) {
+    points->assign(numPaths, NavPoints{});
+  }
+  if (numPaths == 0 || !isLoaded()) {
+    return;
+  }
+
+  if (numThreads <= 0) {
+    numThreads = std::max(1u, std::thread::hardware_concurrency());
+  }
+  // each thread takes at least a few paths, spawning threads for a handful of
+  // searches is not worth it
+  constexpr int minPathsPerThread = 8;
+  numThreads = std::max(
+      1, std::min(numThreads,
+                  (numPaths + minPathsPerThread - 1) / minPathsPerThread));
+
+  std::lock_guard<std::mutex> lock(queryPoolMutex_);
+  if (!growQueryPool(numThreads)) {
+    return;
+  }
+
+  std::atomic<int> nextPath{0};
+  auto worker = [&](dtNavMeshQuery* navQuery) {
+    MultiGoalShortestPath path;
+    path.requestedEnds.resize(1);
+    for (int i = nextPath++; i < numPaths; i = nextPath++) {
+      path.requestedStart = starts.row(i).transpose();
+      path.requestedEnds[0] = ends.row(i).transpose();
+      path.points.clear();
+      if (!findPathWithQuery(path, navQuery)) {
+        continue;
+      }
+
+      geodesicDistances[i] = path.geodesicDistance;
+      if (points != nullptr) {
+        NavPoints& pathPoints = (*points)[i];
+        pathPoints.resize(path.points.size(), 3);
+        for (int j = 0; j < path.points.size(); ++j) {
+          pathPoints.row(j) = path.points[j].transpose();
+        }
+      }
+    }
+  };
+
+  std::vector<std::thread> threads;
+  for (int iThread = 1; iThread < numThreads; ++iThread) {
+    threads.emplace_back(worker, queryPool_[iThread]);
+  }
+  worker(queryPool_[0]);
+  for (auto& thread : threads) {
+    thread.join();
+  }
+}
+
+namespace {
+//! Dense indices of the polygons of a navmesh, for searches that label all of
+//! them
+class PolygonIndex {
+ public:
+  explicit PolygonIndex(const dtNavMesh* navMesh) : navMesh_{navMesh} {
+    tileOffsets_.resize(navMesh->getMaxTiles());
+    for (int iTile = 0; iTile < navMesh->getMaxTiles(); ++iTile) {
+      tileOffsets_[iTile] = refs_.size();
+      const dtMeshTile* tile = navMesh->getTile(iTile);
+      if (!tile || !tile->header)
+        continue;
+
+      for (int jPoly = 0; jPoly < tile->header->polyCount; ++jPoly) {
+        refs_.push_back(navMesh->encodePolyId(iTile, tile->salt, jPoly));
+      }
+    }
+  }
+
+  int size() const { return refs_.size(); }
+
+  dtPolyRef ref(int index) const { return refs_[index]; }
+
+  int index(dtPolyRef ref) const {
+    unsigned int salt, iTile, iPoly;
+    navMesh_->decodePolyId(ref, salt, iTile, iPoly);
+    return tileOffsets_[iTile] + iPoly;
+  }
+
+ private:
+  const dtNavMesh* navMesh_;
+  std::vector<int> tileOffsets_;
+  std::vector<dtPolyRef> refs_;
+};
+
+//! Midpoint of the portal a link leads through, where the A* of Detour
+//! places the node of the neighbouring polygon
+vec3f portalMidpoint(dtPolyRef fromRef,
+                     const dtMeshTile* fromTile,
+                     const dtPoly* fromPoly,
+                     const dtLink& link,
+                     const dtMeshTile* toTile,
+                     const dtPoly* toPoly) {
+  // Off-mesh connections are entered and left at their end vertices
+  if (fromPoly->getType() == DT_POLYTYPE_OFFMESH_CONNECTION) {
+    return Eigen::Map<const vec3f>(
+        &fromTile->verts[fromPoly->verts[link.edge] * 3]);
+  }
+  if (toPoly->getType() == DT_POLYTYPE_OFFMESH_CONNECTION) {
+    for (unsigned int iLink = toPoly->firstLink; iLink != DT_NULL_LINK;
+         iLink = toTile->links[iLink].next) {
+      if (toTile->links[iLink].ref == fromRef) {
+        return Eigen::Map<const vec3f>(
+            &toTile->verts[toPoly->verts[toTile->links[iLink].edge] * 3]);
+      }
+    }
+  }
+
+  const vec3f left =
+      Eigen::Map<const vec3f>(&fromTile->verts[fromPoly->verts[link.edge] * 3]);
+  const vec3f right = Eigen::Map<const vec3f>(
+      &fromTile->verts[fromPoly->verts[(link.edge + 1) % fromPoly->vertCount] *
+                       3]);
+  // Links across tile borders may only cover part of the edge
+  if (link.side != 0xff && (link.bmin != 0 || link.bmax != 255)) {
+    const float tmin = link.bmin / 255.0f;
+    const float tmax = link.bmax / 255.0f;
+    return left + (right - left) * (0.5f * (tmin + tmax));
+  }
+  return 0.5f * (left + right);
+}
+
+//! Dijkstra search over the polygons of a navmesh, with the costs of the A*
+//! of Detour: a polygon is reached at the midpoint of the portal it is
+//! entered through
+class PolygonSearch {
+ public:
+  explicit PolygonSearch(const PolygonIndex& index)
+      : index_(index),
+        costs_(index.size()),
+        parents_(index.size()),
+        positions_(index.size()) {}
+
+  //! Labels every polygon reachable from a start point on startRef
+  void run(const dtNavMesh* navMesh,
+           const dtQueryFilter* filter,
+           dtPolyRef startRef,
+           const vec3f& startPos) {
+    std::fill(costs_.begin(), costs_.end(),
+              std::numeric_limits<float>::infinity());
+    const int start = index_.index(startRef);
+    costs_[start] = 0;
+    parents_[start] = -1;
+    positions_[start] = startPos;
+
+    typedef std::pair<float, int> QueueEntry;
+    std::priority_queue<QueueEntry, std::vector<QueueEntry>,
+                        std::greater<QueueEntry>>
+        queue;
+    queue.emplace(0, start);
+    while (!queue.empty()) {
+      const float cost = queue.top().first;
+      const int current = queue.top().second;
+      queue.pop();
+      // Reached again more cheaply since it was queued
+      if (cost > costs_[current])
+        continue;
+
+      const dtPolyRef ref = index_.ref(current);
+      const dtMeshTile* tile = 0;
+      const dtPoly* poly = 0;
+      navMesh->getTileAndPolyByRefUnsafe(ref, &tile, &poly);
+
+      dtPolyRef parentRef = 0;
+      const dtMeshTile* parentTile = 0;
+      const dtPoly* parentPoly = 0;
+      if (parents_[current] >= 0) {
+        parentRef = index_.ref(parents_[current]);
+        navMesh->getTileAndPolyByRefUnsafe(parentRef, &parentTile,
+                                           &parentPoly);
+      }
+
+      for (unsigned int iLink = poly->firstLink; iLink != DT_NULL_LINK;
+           iLink = tile->links[iLink].next) {
+        const dtLink& link = tile->links[iLink];
+        const dtPolyRef neighbourRef = link.ref;
+        if (neighbourRef == 0 || neighbourRef == parentRef)
+          continue;
+
+        const dtMeshTile* neighbourTile = 0;
+        const dtPoly* neighbourPoly = 0;
+        navMesh->getTileAndPolyByRefUnsafe(neighbourRef, &neighbourTile,
+                                           &neighbourPoly);
+        if (!filter->passFilter(neighbourRef, neighbourTile, neighbourPoly))
+          continue;
+
+        const vec3f position = portalMidpoint(ref, tile, poly, link,
+                                              neighbourTile, neighbourPoly);
+        const float neighbourCost =
+            cost + filter->getCost(positions_[current].data(),
+                                   position.data(), parentRef, parentTile,
+                                   parentPoly, ref, tile, poly, neighbourRef,
+                                   neighbourTile, neighbourPoly);
+        const int neighbour = index_.index(neighbourRef);
+        if (neighbourCost < costs_[neighbour]) {
+          costs_[neighbour] = neighbourCost;
+          parents_[neighbour] = current;
+          positions_[neighbour] = position;
+          queue.emplace(neighbourCost, neighbour);
+        }
+      }
+    }
+  }
+
+  //! Polygons from the start to endRef, empty if the search did not reach it
+  void corridor(dtPolyRef endRef, std::vector<dtPolyRef>& polys) const {
+    polys.clear();
+    int current = index_.index(endRef);
+    if (std::isinf(costs_[current]))
+      return;
+
+    for (; current >= 0; current = parents_[current]) {
+      polys.push_back(index_.ref(current));
+    }
+    std::reverse(polys.begin(), polys.end());
+  }
+
+ private:
+  const PolygonIndex& index_;
+  std::vector<float> costs_;
+  std::vector<int> parents_;
+  std::vector<vec3f> positions_;
+};
+
+//! Runs task(i, iThread) for every i in [0, numTasks), on up to numThreads
+//! threads
+void parallelFor(int numTasks,
+                 int numThreads,
+                 const std::function<void(int, int)>& task) {
+  std::atomic<int> nextTask{0};
+  auto worker = [&](int iThread) {
+    for (int i = nextTask++; i < numTasks; i = nextTask++) {
+      task(i, iThread);
+    }
+  };
+
+  std::vector<std::thread> threads;
+  numThreads = std::min(numThreads, numTasks);
+  for (int iThread = 1; iThread < numThreads; ++iThread) {
+    threads.emplace_back(worker, iThread);
+  }
+  worker(0);
+  for (auto& thread : threads) {
+    thread.join();
+  }
+}
+}  // namespace
+
+void PathFinder::geodesicDistanceMatrix(const NavPoints& sources,
+                                        const NavPoints& targets,
+                                        NavDistances& geodesicDistances,
+                                        int numThreads) {
+  ESP_PROFILE_SCOPE("nav.geodesic_distance_matrix");
+  const int numSources = sources.rows();
+  const int numTargets = targets.rows();
+  geodesicDistances.setConstant(numSources, numTargets,
+                                std::numeric_limits<float>::infinity());
+  if (numSources == 0 || numTargets == 0 || !isLoaded()) {
+    return;
+  }
+
+  if (numThreads <= 0) {
+    numThreads = std::max(1u, std::thread::hardware_concurrency());
+  }
+
+  std::lock_guard<std::mutex> lock(queryPoolMutex_);
+  if (!growQueryPool(numThreads)) {
+    return;
+  }
+
+  auto nearestPolys = [&](const NavPoints& pts, std::vector<dtPolyRef>& refs) {
+    refs.assign(pts.rows(), 0);
+    parallelFor(pts.rows(), numThreads, [&](int i, int iThread) {
+      dtStatus status;
+      dtPolyRef ref;
+      std::tie(status, ref, std::ignore) = projectToPoly(
+          vec3f{pts.row(i).transpose()}, queryPool_[iThread], filter_);
+      if (status == DT_SUCCESS) {
+        refs[i] = ref;
+      }
+    });
+  };
+  std::vector<dtPolyRef> sourceRefs, targetRefs;
+  nearestPolys(sources, sourceRefs);
+  nearestPolys(targets, targetRefs);
+
+  const PolygonIndex polygonIndex(navMesh_.get());
+  std::vector<PolygonSearch> searches(numThreads, PolygonSearch{polygonIndex});
+  std::vector<std::vector<dtPolyRef>> corridors(numThreads);
+  std::vector<std::vector<vec3f>> straightPaths(numThreads);
+
+  // Sources are taken a batch of one per thread at a time, so that the
+  // searches of a batch fit in memory whatever the number of sources
+  for (int first = 0; first < numSources; first += numThreads) {
+    const int batchSize = std::min(numThreads, numSources - first);
+    parallelFor(batchSize, numThreads, [&](int b, int) {
+      const int iSource = first + b;
+      if (sourceRefs[iSource] != 0) {
+        searches[b].run(navMesh_.get(), filter_, sourceRefs[iSource],
+                        sources.row(iSource).transpose());
+      }
+    });
+
+    parallelFor(batchSize * numTargets, numThreads, [&](int i, int iThread) {
+      const int b = i / numTargets;
+      const int iSource = first + b;
+      const int iTarget = i % numTargets;
+      if (sourceRefs[iSource] == 0 || targetRefs[iTarget] == 0) {
+        return;
+      }
+      const vec3f source = sources.row(iSource).transpose();
+      const vec3f target = targets.row(iTarget).transpose();
+      if (target.isApprox(source)) {
+        geodesicDistances(iSource, iTarget) = 0;
+        return;
+      }
+
+      std::vector<dtPolyRef>& corridor = corridors[iThread];
+      searches[b].corridor(targetRefs[iTarget], corridor);
+      if (corridor.empty()) {
+        return;
+      }
+
+      std::vector<vec3f>& straightPath = straightPaths[iThread];
+      straightPath.resize(corridor.size() + 2);
+      int numPoints = 0;
+      dtStatus status = queryPool_[iThread]->findStraightPath(
+          source.data(), target.data(), corridor.data(), corridor.size(),
+          straightPath[0].data(), 0, 0, &numPoints, straightPath.size());
+      if (dtStatusFailed(status) || numPoints == 0) {
+        return;
+      }
+
+      float geodesicDistance = 0;
+      for (int k = 1; k < numPoints; ++k) {
+        geodesicDistance += (straightPath[k] - straightPath[k - 1]).norm();
+      }
+      geodesicDistances(iSource, iTarget) = geodesicDistance;
+    });
+  }
+}
+
+bool PathFinder::growQueryPool(int size) const {
+  while (queryPool_.size() < size) {
+    dtNavMeshQuery* navQuery = dtAllocNavMeshQuery();
+    dtStatus status = navQuery->init(navMesh_.get(), 2048);
+    if (dtStatusFailed(status)) {
+      LOG(ERROR) << "Could not init Detour navmesh query";
+      dtFreeNavMeshQuery(navQuery);
+      return false;
+    }
+    queryPool_.push_back(navQuery);
+  }
+  return true;
+}
+
+void PathFinder::freeQueryPool() {
+  std::lock_guard<std::mutex> lock(queryPoolMutex_);
+  for (dtNavMeshQuery* navQuery : queryPool_) {
+    dtFreeNavMeshQuery(navQuery);
+  }
+  queryPool_.clear();
+}
+
+dtNavMeshQuery* PathFinder::lockPooledQuery(
+    std::unique_lock<std::mutex>& lock) const {
+  lock = std::unique_lock<std::mutex>(queryPoolMutex_);
+  if (navMesh_ == nullptr || !growQueryPool(1)) {
+    return nullptr;
+  }
+  return queryPool_[0];
+}
+
 template vec3f PathFinder::tryStep<vec3f>(const vec3f&, const vec3f&);
 template Magnum::Vector3 PathFinder::tryStep<Magnum::Vector3>(
     const Magnum::Vector3&,
     const Magnum::Vector3&);
 
+void PathFinder::tryStepBatch(const NavPoints& starts,
+                              const NavPoints& ends,
+                              NavPoints& filteredEnds) {
+  ESP_PROFILE_SCOPE("nav.try_step_batch");
+  ASSERT(starts.rows() == ends.rows());
+  std::unique_lock<std::mutex> lock;
+  dtNavMeshQuery* navQuery = lockPooledQuery(lock);
+  if (navQuery == nullptr) {
+    filteredEnds = ends;
+    return;
+  }
+
+  filteredEnds.resize(ends.rows(), 3);
+  for (int i = 0; i < ends.rows(); ++i) {
+    filteredEnds.row(i) = tryStepWithQuery<vec3f>(
+        starts.row(i).transpose(), ends.row(i).transpose(), navQuery);
+  }
+}
+
+int PathFinder::islandId(const vec3f& pt) const {
+  if (!isLoaded()) {
+    return -1;
+  }
+  return islandIdWithQuery(pt, navQuery_);
+}
+
+int PathFinder::islandIdWithQuery(const vec3f& pt,
+                                  dtNavMeshQuery* navQuery) const {
+  dtPolyRef ptRef;
+  dtStatus status;
+  std::tie(status, ptRef, std::ignore) = projectToPoly(pt, navQuery, filter_);
+  if (status != DT_SUCCESS || ptRef == 0) {
+    return -1;
+  }
+  return islandSystem_->islandId(ptRef);
+}
+
+bool PathFinder::sameIsland(const vec3f& a, const vec3f& b) const {
+  const int islandA = islandId(a);
+  return islandA >= 0 && islandA == islandId(b);
+}
+
+std::vector<float> PathFinder::islandAreas() const {
+  if (!isLoaded() || !islandSystem_) {
+    return {};
+  }
+  return islandSystem_->islandAreas();
+}
+
+void PathFinder::islandIdBatch(const NavPoints& pts,
+                               Eigen::VectorXi& ids) const {
+  ESP_PROFILE_SCOPE("nav.island_id_batch");
+  ids.setConstant(pts.rows(), -1);
+  std::unique_lock<std::mutex> lock;
+  dtNavMeshQuery* navQuery = lockPooledQuery(lock);
+  if (navQuery == nullptr) {
+    return;
+  }
+
+  for (int i = 0; i < pts.rows(); ++i) {
+    ids[i] = islandIdWithQuery(pts.row(i).transpose(), navQuery);
+  }
+}
+
+void PathFinder::sameIslandBatch(const NavPoints& a,
+                                 const NavPoints& b,
+                                 NavFlags& same) const {
+  ESP_PROFILE_SCOPE("nav.same_island_batch");
+  ASSERT(a.rows() == b.rows());
+  same.setConstant(a.rows(), false);
+  std::unique_lock<std::mutex> lock;
+  dtNavMeshQuery* navQuery = lockPooledQuery(lock);
+  if (navQuery == nullptr) {
+    return;
+  }
+
+  for (int i = 0; i < a.rows(); ++i) {
+    const int islandA = islandIdWithQuery(a.row(i).transpose(), navQuery);
+    same[i] = islandA >= 0 &&
+              islandA == islandIdWithQuery(b.row(i).transpose(), navQuery);
+  }
+}
+
 float PathFinder::islandRadius(const vec3f& pt) const {
+  return islandRadiusWithQuery(pt, navQuery_);
+}
+
+float PathFinder::islandRadiusWithQuery(const vec3f& pt,
+                                        dtNavMeshQuery* navQuery) const {
   dtPolyRef ptRef;
   dtStatus status;
-  std::tie(status, ptRef, std::ignore) = projectToPoly(pt, navQuery_, filter_);
+  std::tie(status, ptRef, std::ignore) = projectToPoly(pt, navQuery, filter_);
   if (status != DT_SUCCESS || ptRef == 0) {
     return 0.0;
   } else {
@@ -914,29 +1606,42 @@ float PathFinder::distanceToClosestObstacle(
 HitRecord PathFinder::closestObstacleSurfacePoint(
     const vec3f& pt,
     const float maxSearchRadius /*= 2.0*/) const {
+  return closestObstacleSurfacePointWithQuery(pt, maxSearchRadius, navQuery_);
+}
+
+HitRecord PathFinder::closestObstacleSurfacePointWithQuery(
+    const vec3f& pt,
+    const float maxSearchRadius,
+    dtNavMeshQuery* navQuery) const {
   dtPolyRef ptRef;
   dtStatus status;
   vec3f polyPt;
-  std::tie(status, ptRef, polyPt) = projectToPoly(pt, navQuery_, filter_);
+  std::tie(status, ptRef, polyPt) = projectToPoly(pt, navQuery, filter_);
   if (status != DT_SUCCESS || ptRef == 0) {
     return {vec3f(0, 0, 0), vec3f(0, 0, 0),
             std::numeric_limits<float>::infinity()};
   } else {
     vec3f hitPos, hitNormal;
     float hitDist;
-    navQuery_->findDistanceToWall(ptRef, polyPt.data(), maxSearchRadius,
-                                  filter_, &hitDist, hitPos.data(),
-                                  hitNormal.data());
+    navQuery->findDistanceToWall(ptRef, polyPt.data(), maxSearchRadius,
+                                 filter_, &hitDist, hitPos.data(),
+                                 hitNormal.data());
     return {hitPos, hitNormal, hitDist};
   }
 }
 
 bool PathFinder::isNavigable(const vec3f& pt,
                              const float maxYDelta /*= 0.5*/) const {
+  return isNavigableWithQuery(pt, maxYDelta, navQuery_);
+}
+
+bool PathFinder::isNavigableWithQuery(const vec3f& pt,
+                                      const float maxYDelta,
+                                      dtNavMeshQuery* navQuery) const {
   dtPolyRef ptRef;
   dtStatus status;
   vec3f polyPt;
-  std::tie(status, ptRef, polyPt) = projectToPoly(pt, navQuery_, filter_);
+  std::tie(status, ptRef, polyPt) = projectToPoly(pt, navQuery, filter_);
 
   if (status != DT_SUCCESS || ptRef == 0)
     return false;
@@ -949,5 +1654,114 @@ bool PathFinder::isNavigable(const vec3f& pt,
   return true;
 }
 
+vec3f PathFinder::snapPoint(const vec3f& pt) const {
+  return snapPointWithQuery(pt, navQuery_);
+}
+
+vec3f PathFinder::snapPointWithQuery(const vec3f& pt,
+                                     dtNavMeshQuery* navQuery) const {
+  dtStatus status;
+  dtPolyRef ptRef;
+  vec3f polyPt;
+  std::tie(status, ptRef, polyPt) = projectToPoly(pt, navQuery, filter_);
+  if (status != DT_SUCCESS || ptRef == 0) {
+    return vec3f::Constant(std::numeric_limits<float>::quiet_NaN());
+  }
+  return polyPt;
+}
+
+void PathFinder::snapPointBatch(const NavPoints& pts,
+                                NavPoints& snappedPts) const {
+  ESP_PROFILE_SCOPE("nav.snap_point_batch");
+  snappedPts.setConstant(pts.rows(), 3,
+                         std::numeric_limits<float>::quiet_NaN());
+  std::unique_lock<std::mutex> lock;
+  dtNavMeshQuery* navQuery = lockPooledQuery(lock);
+  if (navQuery == nullptr) {
+    return;
+  }
+
+  for (int i = 0; i < pts.rows(); ++i) {
+    snappedPts.row(i) =
+        snapPointWithQuery(pts.row(i).transpose(), navQuery).transpose();
+  }
+}
+
+void PathFinder::isNavigableBatch(const NavPoints& pts,
+                                  NavFlags& navigable,
+                                  const float maxYDelta /*= 0.5*/) const {
+  ESP_PROFILE_SCOPE("nav.is_navigable_batch");
+  navigable.setConstant(pts.rows(), false);
+  std::unique_lock<std::mutex> lock;
+  dtNavMeshQuery* navQuery = lockPooledQuery(lock);
+  if (navQuery == nullptr) {
+    return;
+  }
+
+  for (int i = 0; i < pts.rows(); ++i) {
+    navigable[i] =
+        isNavigableWithQuery(pts.row(i).transpose(), maxYDelta, navQuery);
+  }
+}
+
+void PathFinder::islandRadiusBatch(const NavPoints& pts,
+                                   Eigen::VectorXf& radii) const {
+  ESP_PROFILE_SCOPE("nav.island_radius_batch");
+  radii.setZero(pts.rows());
+  std::unique_lock<std::mutex> lock;
+  dtNavMeshQuery* navQuery = lockPooledQuery(lock);
+  if (navQuery == nullptr) {
+    return;
+  }
+
+  for (int i = 0; i < pts.rows(); ++i) {
+    radii[i] = islandRadiusWithQuery(pts.row(i).transpose(), navQuery);
+  }
+}
+
+void PathFinder::distanceToClosestObstacleBatch(
+    const NavPoints& pts,
+    Eigen::VectorXf& distances,
+    const float maxSearchRadius /*= 2.0*/) const {
+  ESP_PROFILE_SCOPE("nav.distance_to_closest_obstacle_batch");
+  distances.setConstant(pts.rows(), std::numeric_limits<float>::infinity());
+  std::unique_lock<std::mutex> lock;
+  dtNavMeshQuery* navQuery = lockPooledQuery(lock);
+  if (navQuery == nullptr) {
+    return;
+  }
+
+  for (int i = 0; i < pts.rows(); ++i) {
+    distances[i] = closestObstacleSurfacePointWithQuery(
+                       pts.row(i).transpose(), maxSearchRadius, navQuery)
+                       .hitDist;
+  }
+}
+
+void PathFinder::closestObstacleSurfacePointBatch(
+    const NavPoints& pts,
+    NavPoints& hitPos,
+    NavPoints& hitNormal,
+    Eigen::VectorXf& hitDist,
+    const float maxSearchRadius /*= 2.0*/) const {
+  ESP_PROFILE_SCOPE("nav.closest_obstacle_surface_point_batch");
+  hitPos.setZero(pts.rows(), 3);
+  hitNormal.setZero(pts.rows(), 3);
+  hitDist.setConstant(pts.rows(), std::numeric_limits<float>::infinity());
+  std::unique_lock<std::mutex> lock;
+  dtNavMeshQuery* navQuery = lockPooledQuery(lock);
+  if (navQuery == nullptr) {
+    return;
+  }
+
+  for (int i = 0; i < pts.rows(); ++i) {
+    const HitRecord hit = closestObstacleSurfacePointWithQuery(
+        pts.row(i).transpose(), maxSearchRadius, navQuery);
+    hitPos.row(i) = hit.hitPos.transpose();
+    hitNormal.row(i) = hit.hitNormal.transpose();
+    hitDist[i] = hit.hitDist;
+  }
+}
+
 }  // namespace nav
 }  // namespace esp
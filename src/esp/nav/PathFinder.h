@@ -4,10 +4,13 @@
 
 #pragma once
 
+#include <limits>
+#include <mutex>
 #include <string>
 #include <vector>
 
 #include "esp/core/esp.h"
+#include "esp/core/random.h"
 
 // forward declarations
 class dtNavMesh;
@@ -22,6 +25,14 @@ struct MeshData;
 }
 namespace nav {
 
+//! (N, 3) points of a batch of queries, one row per query
+typedef Eigen::Matrix<float, Eigen::Dynamic, 3, Eigen::RowMajor> NavPoints;
+//! (N) flags of a batch of queries
+typedef Eigen::Array<bool, Eigen::Dynamic, 1> NavFlags;
+//! (M, N) distances between two batches of points
+typedef Eigen::Matrix<float, Eigen::Dynamic, Eigen::Dynamic, Eigen::RowMajor>
+    NavDistances;
+
 struct HitRecord {
   vec3f hitPos;
   vec3f hitNormal;
@@ -51,6 +62,22 @@ struct MultiGoalShortestPath {
   ESP_SMART_POINTERS(MultiGoalShortestPath)
 };
 
+//! Constraints on the points drawn by @ref PathFinder::sampleNavigablePoints
+struct NavPointConstraints {
+  //! Only sample points on the same island as @ref islandPoint
+  bool sameIslandAs = false;
+  vec3f islandPoint = vec3f::Zero();
+  //! Only sample points on this island, if not negative
+  int islandId = -1;
+  //! Only sample points with a height in [minY, maxY]
+  float minY = -std::numeric_limits<float>::infinity();
+  float maxY = std::numeric_limits<float>::infinity();
+  //! Only sample points at least this far from obstacles
+  float minObstacleDistance = 0;
+  //! Number of draws for each point before giving up
+  int maxTries = 100;
+};
+
 struct NavMeshSettings {
   //! Cell size in world units
   float cellSize;
@@ -124,24 +151,146 @@ class PathFinder : public std::enable_shared_from_this<PathFinder> {
 
   vec3f getRandomNavigablePoint();
 
+  /**
+   * @brief Samples points uniformly over the area of the navmesh, in one
+   * call.
+   *
+   * The points are stratified: the area of the navmesh is split into n
+   * equal parts, one point is drawn from each and the points are shuffled.
+   * Points that do not meet the constraints are drawn again from the whole
+   * eligible area.
+   *
+   * Safe to call concurrently with the other queries.
+   *
+   * @param n Number of points
+   * @param constraints Constraints on the points
+   * @param seed Seed of the sampling, see @ref randomSeed
+   * @param[out] points Resized to (n, 3), the points
+   * @return false if no navigable area meets the constraints or a point
+   * could not be drawn in @ref NavPointConstraints::maxTries tries
+   */
+  bool sampleNavigablePoints(int n,
+                             const NavPointConstraints& constraints,
+                             uint32_t seed,
+                             NavPoints& points);
+
+  //! Draws a seed from the random generator of the pathfinder, which
+  //! @ref seed reseeds
+  uint32_t randomSeed() { return random_.uniform_uint(); }
+
   bool findPath(ShortestPath& path);
   bool findPath(MultiGoalShortestPath& path);
 
+  /**
+   * @brief Finds the shortest path between each start and end, in parallel.
+   *
+   * Each thread searches with its own Detour navmesh query, taken from a
+   * pool that is kept until the navmesh changes.
+   *
+   * @param starts (N, 3) start points
+   * @param ends (N, 3) end points
+   * @param[out] geodesicDistances Resized to N, the geodesic distance of each
+   * path, infinity where there is none
+   * @param[out] points If not null, resized to N, the (K, 3) points of each
+   * path, empty where there is none
+   * @param numThreads Number of threads to use, the number of hardware
+   * threads if not positive
+   */
+  void findPaths(const NavPoints& starts,
+                 const NavPoints& ends,
+                 Eigen::VectorXf& geodesicDistances,
+                 std::vector<NavPoints>* points = nullptr,
+                 int numThreads = 0);
+
+  /**
+   * @brief Geodesic distances from each source to each target, with a single
+   * search per source.
+   *
+   * A Dijkstra search from each source labels every navmesh polygon it can
+   * reach with the polygon it is reached from, using the costs of the A* of
+   * @ref findPath.  The path to each target follows these labels back to the
+   * source and is straightened like in @ref findPath.  Sources are searched
+   * in parallel, then the paths to the targets are straightened in parallel.
+   *
+   * @param sources (M, 3) source points
+   * @param targets (N, 3) target points
+   * @param[out] geodesicDistances Resized to (M, N), infinity where there is
+   * no path
+   * @param numThreads Number of threads to use, the number of hardware
+   * threads if not positive
+   */
+  void geodesicDistanceMatrix(const NavPoints& sources,
+                              const NavPoints& targets,
+                              NavDistances& geodesicDistances,
+                              int numThreads = 0);
+
   template <typename T>
   T tryStep(const T& start, const T& end);
 
+  /**
+   * @brief Batched @ref tryStep, one step per row.
+   *
+   * Safe to call concurrently with the other queries.
+   *
+   * @param starts (N, 3) start points
+   * @param ends (N, 3) end points
+   * @param[out] filteredEnds Resized to (N, 3), the end point of each step
+   * after sliding along the navmesh, the unfiltered end if no navmesh is
+   * loaded
+   */
+  void tryStepBatch(const NavPoints& starts,
+                    const NavPoints& ends,
+                    NavPoints& filteredEnds);
+
   bool loadNavMesh(const std::string& path);
 
+  /**
+   * @brief Creates a pathfinder that shares the loaded navmesh and its
+   * islands with this one.
+   *
+   * The navmesh is only read after loading, so the two pathfinders can be
+   * used independently: the clone has its own navmesh queries, query filter
+   * and random generator, and loading another navmesh in either leaves the
+   * other untouched.
+   */
+  PathFinder::ptr clone() const;
+
   bool saveNavMesh(const std::string& path);
 
   void free();
 
-  bool isLoaded() { return navMesh_ != nullptr; }
+  bool isLoaded() const { return navMesh_ != nullptr; }
 
   void seed(uint32_t newSeed);
 
   float islandRadius(const vec3f& pt) const;
 
+  /**
+   * @brief Id of the island, i.e. connected component, of the navmesh a
+   * point is on.
+   *
+   * Islands are labeled when the navmesh is loaded, so this and
+   * @ref sameIsland take constant time.
+   *
+   * @return The id, in [0, number of islands), -1 if the point is not on the
+   * navmesh or no navmesh is loaded
+   */
+  int islandId(const vec3f& pt) const;
+
+  //! Whether there is a path between two points
+  bool sameIsland(const vec3f& a, const vec3f& b) const;
+
+  //! Surface area of each island, indexed by island id, empty if no navmesh
+  //! is loaded
+  std::vector<float> islandAreas() const;
+
+  //! Batched @ref islandId and @ref sameIsland, safe to call concurrently
+  //! with the other queries
+  void islandIdBatch(const NavPoints& pts, Eigen::VectorXi& ids) const;
+  void sameIslandBatch(const NavPoints& a,
+                       const NavPoints& b,
+                       NavFlags& same) const;
+
   float distanceToClosestObstacle(const vec3f& pt,
                                   const float maxSearchRadius = 2.0) const;
   HitRecord closestObstacleSurfacePoint(
@@ -150,20 +299,90 @@ class PathFinder : public std::enable_shared_from_this<PathFinder> {
 
   bool isNavigable(const vec3f& pt, const float maxYDelta = 0.5) const;
 
+  /**
+   * @brief Snaps a point to the closest point on the navmesh.
+   *
+   * @return The closest navigable point, NaN if there is none within the
+   * search box of the navmesh queries
+   */
+  vec3f snapPoint(const vec3f& pt) const;
+
+  /**
+   * @brief Batched queries, one query per row of the (N, 3) points, for
+   * callers that have many points at once.
+   *
+   * They are safe to call concurrently with the other queries. Without a
+   * navmesh, every point gets the result of a point off the navmesh.
+   */
+  void snapPointBatch(const NavPoints& pts, NavPoints& snappedPts) const;
+  void isNavigableBatch(const NavPoints& pts,
+                        NavFlags& navigable,
+                        const float maxYDelta = 0.5) const;
+  void islandRadiusBatch(const NavPoints& pts, Eigen::VectorXf& radii) const;
+  void distanceToClosestObstacleBatch(const NavPoints& pts,
+                                      Eigen::VectorXf& distances,
+                                      const float maxSearchRadius = 2.0) const;
+  void closestObstacleSurfacePointBatch(
+      const NavPoints& pts,
+      NavPoints& hitPos,
+      NavPoints& hitNormal,
+      Eigen::VectorXf& hitDist,
+      const float maxSearchRadius = 2.0) const;
+
   std::pair<vec3f, vec3f> bounds() const { return bounds_; }
 
   friend impl::ActionSpaceGraph;
 
  protected:
   bool initNavQuery();
+
+  //! findPath with the given navmesh query, so that paths can be searched
+  //! concurrently
+  bool findPathWithQuery(MultiGoalShortestPath& path,
+                         dtNavMeshQuery* navQuery);
+
+  template <typename T>
+  T tryStepWithQuery(const T& start, const T& end, dtNavMeshQuery* navQuery);
+
+  //! Single point queries with the given navmesh query
+  int islandIdWithQuery(const vec3f& pt, dtNavMeshQuery* navQuery) const;
+  vec3f snapPointWithQuery(const vec3f& pt, dtNavMeshQuery* navQuery) const;
+  bool isNavigableWithQuery(const vec3f& pt,
+                            const float maxYDelta,
+                            dtNavMeshQuery* navQuery) const;
+  float islandRadiusWithQuery(const vec3f& pt, dtNavMeshQuery* navQuery) const;
+  HitRecord closestObstacleSurfacePointWithQuery(
+      const vec3f& pt,
+      const float maxSearchRadius,
+      dtNavMeshQuery* navQuery) const;
+
+  //! Allocates navmesh queries until the pool has size of them
+  bool growQueryPool(int size) const;
+  void freeQueryPool();
+
+  /**
+   * @brief Locks the query pool and lends its first query.
+   *
+   * Batched queries run without the GIL, concurrently with other calls, so
+   * they cannot use the shared navQuery_.
+   *
+   * @param[out] lock Holds the pool until the query is no longer used
+   * @return The query, null if no navmesh is loaded
+   */
+  dtNavMeshQuery* lockPooledQuery(std::unique_lock<std::mutex>& lock) const;
+
+  mutable std::vector<dtNavMeshQuery*> queryPool_;
+  mutable std::mutex queryPoolMutex_;
   std::vector<vec3f> prevEnds;
 
-  impl::IslandSystem* islandSystem_ = nullptr;
+  //! shared with the clones of this pathfinder
+  std::shared_ptr<impl::IslandSystem> islandSystem_;
+  std::shared_ptr<dtNavMesh> navMesh_;
 
-  dtNavMesh* navMesh_;
   dtNavMeshQuery* navQuery_;
   dtQueryFilter* filter_;
   std::pair<vec3f, vec3f> bounds_;
+  core::Random random_;
   ESP_SMART_POINTERS(PathFinder)
 };
 
@@ -244,6 +244,20 @@ void PhysicsManager::applyImpulseTorque(const int physObjectID,
   }
 }
 
+void PhysicsManager::setLinearVelocity(const int physObjectID,
+                                       const Magnum::Vector3& linVel) {
+  if (existingObjects_.count(physObjectID) > 0) {
+    existingObjects_[physObjectID]->setLinearVelocity(linVel);
+  }
+}
+
+void PhysicsManager::setAngularVelocity(const int physObjectID,
+                                        const Magnum::Vector3& angVel) {
+  if (existingObjects_.count(physObjectID) > 0) {
+    existingObjects_[physObjectID]->setAngularVelocity(angVel);
+  }
+}
+
 void PhysicsManager::setTransformation(const int physObjectID,
                                        const Magnum::Matrix4& trans) {
   if (existingObjects_.count(physObjectID) > 0) {
@@ -356,6 +370,22 @@ Magnum::Quaternion PhysicsManager::getRotation(const int physObjectID) {
   }
 }
 
+Magnum::Vector3 PhysicsManager::getLinearVelocity(const int physObjectID) {
+  if (existingObjects_.count(physObjectID) > 0) {
+    return existingObjects_[physObjectID]->getLinearVelocity();
+  } else {
+    return Magnum::Vector3();
+  }
+}
+
+Magnum::Vector3 PhysicsManager::getAngularVelocity(const int physObjectID) {
+  if (existingObjects_.count(physObjectID) > 0) {
+    return existingObjects_[physObjectID]->getAngularVelocity();
+  } else {
+    return Magnum::Vector3();
+  }
+}
+
 //============ Object Setter functions =============
 void PhysicsManager::setMass(const int physObjectID, const double mass) {
   // TODO: talk to property library
@@ -217,6 +217,12 @@ class PhysicsManager {
    */
   virtual double getWorldTime() { return worldTime_; };
 
+  /** @brief Set the current @ref worldTime_ of the physical world, e.g. when
+   * restoring a snapshot of the simulation. Does not step the world.
+   * @param worldTime The new world time.
+   */
+  void setWorldTime(double worldTime) { worldTime_ = worldTime; };
+
   /** @brief Get the current gravity in the physical world. By default returns
    * [0,0,0] since their is no notion of force in a kinematic world.
    * @return The current gravity vector in the physical world.
@@ -411,6 +417,24 @@ class PhysicsManager {
    */
   Magnum::Quaternion getRotation(const int physObjectID);
 
+  /** @brief Get the linear velocity of an object.
+   * See @ref RigidObject::getLinearVelocity.
+   * @param physObjectID The object ID and key identifying the object in @ref
+   * PhysicsManager::existingObjects_.
+   * @return The linear velocity of the object in the global coordinate
+   * system.
+   */
+  Magnum::Vector3 getLinearVelocity(const int physObjectID);
+
+  /** @brief Get the angular velocity of an object.
+   * See @ref RigidObject::getAngularVelocity.
+   * @param physObjectID The object ID and key identifying the object in @ref
+   * PhysicsManager::existingObjects_.
+   * @return The angular velocity of the object in the global coordinate
+   * system.
+   */
+  Magnum::Vector3 getAngularVelocity(const int physObjectID);
+
   // ============ Object Setter functions =============
   // Setters that interface with physics need to take
 
@@ -644,6 +668,23 @@ class PhysicsManager {
   void applyImpulseTorque(const int physObjectID,
                           const Magnum::Vector3& impulse);
 
+  /** @brief Set the linear velocity of an object.
+   * See @ref RigidObject::setLinearVelocity.
+   * @param physObjectID The object ID and key identifying the object in @ref
+   * PhysicsManager::existingObjects_.
+   * @param linVel The linear velocity in the global coordinate system.
+   */
+  void setLinearVelocity(const int physObjectID, const Magnum::Vector3& linVel);
+
+  /** @brief Set the angular velocity of an object.
+   * See @ref RigidObject::setAngularVelocity.
+   * @param physObjectID The object ID and key identifying the object in @ref
+   * PhysicsManager::existingObjects_.
+   * @param angVel The angular velocity in the global coordinate system.
+   */
+  void setAngularVelocity(const int physObjectID,
+                          const Magnum::Vector3& angVel);
+
  protected:
   /** @brief Check if a particular mesh can be used as a collision mesh for a
    * particular physics implemenation. Always True for base @ref PhysicsManager
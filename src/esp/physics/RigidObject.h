@@ -206,6 +206,37 @@ class RigidObject : public scene::SceneNode {
    */
   virtual void applyImpulseTorque(const Magnum::Vector3& impulse);
 
+  /**
+   * @brief Get the linear velocity of the object's center of mass. Always
+   * zero without a dervied dynamics implementation.
+   * @return The linear velocity in the global coordinate system.
+   */
+  virtual Magnum::Vector3 getLinearVelocity() { return Magnum::Vector3(); }
+
+  /**
+   * @brief Get the angular velocity of the object. Always zero without a
+   * dervied dynamics implementation.
+   * @return The angular velocity in the global coordinate system.
+   */
+  virtual Magnum::Vector3 getAngularVelocity() { return Magnum::Vector3(); }
+
+  /**
+   * @brief Set the linear velocity of the object's center of mass. Does
+   * nothing for @ref MotionType::STATIC and @ref MotionType::KINEMATIC
+   * objects.
+   * @param linVel The linear velocity in the global coordinate system.
+   */
+  virtual void setLinearVelocity(
+      CORRADE_UNUSED const Magnum::Vector3& linVel){};
+
+  /**
+   * @brief Set the angular velocity of the object. Does nothing for @ref
+   * MotionType::STATIC and @ref MotionType::KINEMATIC objects.
+   * @param angVel The angular velocity in the global coordinate system.
+   */
+  virtual void setAngularVelocity(
+      CORRADE_UNUSED const Magnum::Vector3& angVel){};
+
   /**
    * @brief Remove the object from any connected physics simulator implemented
    * by a derived @ref PhysicsManager. Does nothing for default @ref
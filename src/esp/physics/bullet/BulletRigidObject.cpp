@@ -309,6 +309,36 @@ void BulletRigidObject::applyImpulseTorque(const Magnum::Vector3& impulse) {
   }
 }
 
+Magnum::Vector3 BulletRigidObject::getLinearVelocity() {
+  if (rigidObjectType_ != RigidObjectType::OBJECT) {
+    return Magnum::Vector3();
+  }
+  return Magnum::Vector3(bObjectRigidBody_->getLinearVelocity());
+}
+
+Magnum::Vector3 BulletRigidObject::getAngularVelocity() {
+  if (rigidObjectType_ != RigidObjectType::OBJECT) {
+    return Magnum::Vector3();
+  }
+  return Magnum::Vector3(bObjectRigidBody_->getAngularVelocity());
+}
+
+void BulletRigidObject::setLinearVelocity(const Magnum::Vector3& linVel) {
+  if (rigidObjectType_ == RigidObjectType::OBJECT &&
+      objectMotionType_ == MotionType::DYNAMIC) {
+    setActive();
+    bObjectRigidBody_->setLinearVelocity(btVector3(linVel));
+  }
+}
+
+void BulletRigidObject::setAngularVelocity(const Magnum::Vector3& angVel) {
+  if (rigidObjectType_ == RigidObjectType::OBJECT &&
+      objectMotionType_ == MotionType::DYNAMIC) {
+    setActive();
+    bObjectRigidBody_->setAngularVelocity(btVector3(angVel));
+  }
+}
+
 //! Synchronize Physics transformations
 //! Needed after changing the pose from Magnum side
 void BulletRigidObject::syncPose() {
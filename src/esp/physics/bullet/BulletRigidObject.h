@@ -143,6 +143,38 @@ class BulletRigidObject : public RigidObject {
    */
   void applyImpulseTorque(const Magnum::Vector3& impulse);
 
+  /**
+   * @brief Get the linear velocity of the object's center of mass. Zero for
+   * @ref RigidObjectType::SCENE. See @ref btRigidBody::getLinearVelocity.
+   * @return The linear velocity in the global coordinate system.
+   */
+  Magnum::Vector3 getLinearVelocity();
+
+  /**
+   * @brief Get the angular velocity of the object. Zero for @ref
+   * RigidObjectType::SCENE. See @ref btRigidBody::getAngularVelocity.
+   * @return The angular velocity in the global coordinate system.
+   */
+  Magnum::Vector3 getAngularVelocity();
+
+  /**
+   * @brief Set the linear velocity of the object's center of mass.
+   * Does nothing for @ref MotionType::STATIC and @ref
+   * MotionType::KINEMATIC objects. Calls @ref setActive().
+   * See @ref btRigidBody::setLinearVelocity.
+   * @param linVel The linear velocity in the global coordinate system.
+   */
+  void setLinearVelocity(const Magnum::Vector3& linVel);
+
+  /**
+   * @brief Set the angular velocity of the object.
+   * Does nothing for @ref MotionType::STATIC and @ref
+   * MotionType::KINEMATIC objects. Calls @ref setActive().
+   * See @ref btRigidBody::setAngularVelocity.
+   * @param angVel The angular velocity in the global coordinate system.
+   */
+  void setAngularVelocity(const Magnum::Vector3& angVel);
+
   /**
    * @brief Remove the object from the world.
    * See @ref btDiscreteDynamicsWorld::removeRigidBody for @ref
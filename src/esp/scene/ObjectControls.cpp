@@ -4,6 +4,9 @@
 
 #include "ObjectControls.h"
 
+#include <algorithm>
+#include <cmath>
+
 #include <Magnum/EigenIntegration/Integration.h>
 
 #include "SceneNode.h"
@@ -14,6 +17,52 @@ using Magnum::EigenIntegration::cast;
 namespace esp {
 namespace scene {
 
+namespace {
+// same tolerance as the collision check of the python ObjectControls
+constexpr float CollisionEps = 1e-5;
+
+// noise is always truncated to 3 standard deviations
+constexpr float NoiseTruncationStdevs = 3.0f;
+
+PyRobotMotionNoiseModel motionNoise(float linearMean0,
+                                    float linearMean1,
+                                    float linearCov0,
+                                    float linearCov1,
+                                    float rotationMean,
+                                    float rotationCov) {
+  return {vec2f{linearMean0, linearMean1}, vec2f{linearCov0, linearCov1},
+          rotationMean, rotationCov};
+}
+}  // namespace
+
+const PyRobotNoiseModels& getPyRobotNoiseModels() {
+  // clang-format off
+  static const PyRobotNoiseModels models{
+      {"LoCoBot", {
+          {"ILQR", {
+              motionNoise(0.014, 0.009, 0.006, 0.005, 0.008, 0.004),
+              motionNoise(0.003, 0.003, 0.002, 0.003, 0.023, 0.012)}},
+          {"Proportional", {
+              motionNoise(0.017, 0.042, 0.007, 0.023, 0.031, 0.026),
+              motionNoise(0.001, 0.005, 0.001, 0.004, 0.043, 0.017)}},
+          {"Movebase", {
+              motionNoise(0.074, 0.036, 0.019, 0.033, 0.189, 0.038),
+              motionNoise(0.002, 0.003, 0.0, 0.002, 0.219, 0.019)}}}},
+      {"LoCoBot-Lite", {
+          {"ILQR", {
+              motionNoise(0.142, 0.023, 0.008, 0.008, 0.031, 0.028),
+              motionNoise(0.002, 0.002, 0.001, 0.002, 0.122, 0.03)}},
+          {"Proportional", {
+              motionNoise(0.135, 0.043, 0.007, 0.009, 0.049, 0.009),
+              motionNoise(0.002, 0.002, 0.002, 0.001, 0.054, 0.061)}},
+          {"Movebase", {
+              motionNoise(0.192, 0.117, 0.055, 0.144, 0.128, 0.143),
+              motionNoise(0.002, 0.001, 0.001, 0.001, 0.173, 0.025)}}}},
+  };
+  // clang-format on
+  return models;
+}
+
 SceneNode& moveRight(SceneNode& object, float distance) {
   // TODO: this assumes no scale is applied
   object.translateLocal(object.transformation().right() * distance);
@@ -112,5 +161,164 @@ ObjectControls& ObjectControls::action(SceneNode& object,
   return *this;
 }
 
+float ObjectControls::sampleTruncatedGaussian(float mean,
+                                              float cov,
+                                              float low) {
+  const float stdev = std::sqrt(cov);
+  if (stdev == 0) {
+    return mean;
+  }
+
+  const float a = std::max((low - mean) / stdev, -NoiseTruncationStdevs);
+  const float b = NoiseTruncationStdevs;
+  // a is at most -mean / stdev < 0 for all noise models, so at least half of
+  // the samples are accepted
+  float z = 0;
+  do {
+    z = random_.normal_float_01();
+  } while (z < a || z > b);
+
+  return mean + stdev * z;
+}
+
+bool ObjectControls::pyrobotNoisyAction(SceneNode& object,
+                                        const std::string& motion,
+                                        float amount,
+                                        const std::string& robot,
+                                        const std::string& controller,
+                                        float noiseMultiplier) {
+  const auto& models = getPyRobotNoiseModels();
+  auto robotIt = models.find(robot);
+  if (robotIt == models.end()) {
+    LOG(ERROR) << "Unknown PyRobot robot " << robot;
+    return false;
+  }
+  auto controllerIt = robotIt->second.find(controller);
+  if (controllerIt == robotIt->second.end()) {
+    LOG(ERROR) << "Unknown PyRobot controller " << controller;
+    return false;
+  }
+
+  float translateAmount = 0, rotateAmount = 0;
+  if (motion == "moveForward") {
+    translateAmount = amount;
+  } else if (motion == "moveBackward") {
+    translateAmount = -amount;
+  } else if (motion == "turnLeft") {
+    rotateAmount = amount;
+  } else if (motion == "turnRight") {
+    rotateAmount = -amount;
+  } else {
+    LOG(ERROR) << "Unknown PyRobot noisy motion " << motion;
+    return false;
+  }
+  const bool linear = motion == "moveForward" || motion == "moveBackward";
+  const PyRobotControllerNoiseModel& controllerModel = controllerIt->second;
+  const PyRobotMotionNoiseModel& model = linear
+                                             ? controllerModel.linearMotion
+                                             : controllerModel.rotationalMotion;
+
+  // Perform the action in the coordinate system of the node
+  const Magnum::Matrix4 transform = object.transformation();
+  const Magnum::Vector3 moveAx = -transform.backward();
+  const Magnum::Vector3 perpAx = transform.right();
+
+  // The robot always moves a little bit along an intended translation, so
+  // the noise along it is truncated to 95% of the amount, and always turns a
+  // little bit for an intended rotation. Noise is multiplied by the sign of
+  // the motion (+ eps to make 0 positive) so that both directions overshoot.
+  const float translationSign = translateAmount + 1e-8f >= 0 ? 1.0f : -1.0f;
+  vec2f translationNoise{
+      sampleTruncatedGaussian(
+          model.linearMean[0], model.linearCov[0],
+          linear ? -0.95f * std::abs(translateAmount)
+                 : -std::numeric_limits<float>::max()),
+      sampleTruncatedGaussian(model.linearMean[1], model.linearCov[1])};
+  translationNoise *= noiseMultiplier * translationSign;
+
+  object.translateLocal(moveAx * (translateAmount + translationNoise[0]) +
+                        perpAx * translationNoise[1]);
+
+  const float rotationSign = rotateAmount + 1e-8f >= 0 ? 1.0f : -1.0f;
+  const float rotationNoise =
+      noiseMultiplier * rotationSign *
+      sampleTruncatedGaussian(
+          model.rotationMean, model.rotationCov,
+          linear ? -std::numeric_limits<float>::max()
+                 : -0.95f * std::abs(float(Magnum::Rad(
+                                Magnum::Deg(rotateAmount)))));
+
+  object.rotateYLocal(Magnum::Rad(Magnum::Deg(rotateAmount)) +
+                      Magnum::Rad(rotationNoise));
+  object.setRotation(object.rotation().normalized());
+
+  return true;
+}
+
+bool ObjectControls::actionSequence(SceneNode& body,
+                                    const std::vector<SceneNode*>& sensors,
+                                    const std::vector<std::string>& actNames,
+                                    const std::vector<float>& amounts,
+                                    const std::vector<bool>& bodyActions,
+                                    bool applyFilter,
+                                    std::vector<bool>& collided,
+                                    NodePositions& positions,
+                                    NodeRotations& rotations) {
+  const size_t numSteps = actNames.size();
+  if (amounts.size() != numSteps || bodyActions.size() != numSteps) {
+    LOG(ERROR) << "Got " << numSteps << " actions but " << amounts.size()
+               << " amounts and " << bodyActions.size() << " body flags";
+    return false;
+  }
+
+  std::vector<const MoveFunc*> moveFuncs;
+  moveFuncs.reserve(numSteps);
+  for (const auto& actName : actNames) {
+    auto it = moveFuncMap_.find(actName);
+    if (it == moveFuncMap_.end()) {
+      LOG(ERROR) << "Tried to perform unknown action with name " << actName;
+      return false;
+    }
+    moveFuncs.push_back(&it->second);
+  }
+
+  collided.assign(numSteps, false);
+  positions.resize(numSteps, 3);
+  rotations.resize(numSteps, 4);
+  for (size_t i = 0; i < numSteps; ++i) {
+    const MoveFunc& moveFunc = *moveFuncs[i];
+    if (bodyActions[i]) {
+      const vec3f startPosition = cast<vec3f>(body.absoluteTranslation());
+      moveFunc(body, amounts[i]);
+      const vec3f endPosition = cast<vec3f>(body.absoluteTranslation());
+      if (applyFilter) {
+        const vec3f filteredEndPosition =
+            moveFilterFunc_(startPosition, endPosition);
+        body.translate(
+            Magnum::Vector3(vec3f(filteredEndPosition - endPosition)));
+
+        // A shorter move than requested is a collision, a different end
+        // position alone is not (e.g. when going up stairs)
+        collided[i] =
+            (filteredEndPosition - startPosition).squaredNorm() +
+                CollisionEps <
+            (endPosition - startPosition).squaredNorm();
+      }
+    } else {
+      for (SceneNode* sensor : sensors) {
+        moveFunc(*sensor, amounts[i]);
+      }
+    }
+
+    const Magnum::Vector3 position = body.absoluteTranslation();
+    const Magnum::Quaternion rotation = body.rotation();
+    positions.row(i) << position.x(), position.y(), position.z();
+    rotations.row(i) << rotation.vector().x(), rotation.vector().y(),
+        rotation.vector().z(), rotation.scalar();
+  }
+
+  return true;
+}
+
 }  // namespace scene
 }  // namespace esp
@@ -5,16 +5,45 @@
 #pragma once
 
 #include <functional>
+#include <limits>
 #include <map>
 #include <string>
+#include <vector>
 
 #include "esp/core/esp.h"
+#include "esp/core/random.h"
+#include "esp/scene/SceneNode.h"
 
 namespace esp {
 namespace scene {
 
-// forward declaration
-class SceneNode;
+/**
+ * @brief Actuation noise of one kind of motion of a PyRobot robot, as
+ * diagonal Gaussians truncated to 3 standard deviations.
+ *
+ * Parameters contributed from PyRobot, https://pyrobot.org/. Please cite
+ * PyRobot if you use this noise model.
+ */
+struct PyRobotMotionNoiseModel {
+  //! Mean and variance of the noise along and perpendicular to the motion
+  vec2f linearMean, linearCov;
+  //! Mean and variance of the noise of the rotation, in radians
+  float rotationMean, rotationCov;
+};
+
+struct PyRobotControllerNoiseModel {
+  PyRobotMotionNoiseModel linearMotion;
+  PyRobotMotionNoiseModel rotationalMotion;
+};
+
+//! Noise models by robot and controller
+typedef std::map<std::string,
+                 std::map<std::string, PyRobotControllerNoiseModel>>
+    PyRobotNoiseModels;
+
+//! The noise models of the LoCoBot and LoCoBot-Lite, used by the python
+//! pyrobot_noisy_* controls
+const PyRobotNoiseModels& getPyRobotNoiseModels();
 
 class ObjectControls {
  public:
@@ -35,6 +64,68 @@ class ObjectControls {
     return action(object, actName, distance, applyFilter);
   }
 
+  /**
+   * @brief Applies a sequence of moves, as calling @ref action for each of
+   * them would, and records the outcome of every step.
+   *
+   * Body moves are applied to @p body and filtered with the move filter
+   * function if @p applyFilter is true, sensor moves are applied, unfiltered,
+   * to each of @p sensors.
+   *
+   * @param body The node body moves are applied to
+   * @param sensors The nodes sensor moves are applied to
+   * @param actNames Name of the move function of each step
+   * @param amounts Amount of each step
+   * @param bodyActions Whether each step moves the body or the sensors
+   * @param applyFilter Whether to filter the body moves
+   * @param[out] collided Whether the filter shortened each step
+   * @param[out] positions Absolute translation of @p body after each step
+   * @param[out] rotations Rotation of @p body after each step
+   * @return false, without moving anything, if a move function is unknown or
+   * the lengths of the inputs differ
+   */
+  bool actionSequence(SceneNode& body,
+                      const std::vector<SceneNode*>& sensors,
+                      const std::vector<std::string>& actNames,
+                      const std::vector<float>& amounts,
+                      const std::vector<bool>& bodyActions,
+                      bool applyFilter,
+                      std::vector<bool>& collided,
+                      NodePositions& positions,
+                      NodeRotations& rotations);
+
+  /**
+   * @brief Moves or turns a node with PyRobot actuation noise.
+   *
+   * Implements the python pyrobot_noisy_* controls.
+   *
+   * @param object The node to move
+   * @param motion One of "moveForward", "moveBackward", "turnLeft" or
+   * "turnRight"
+   * @param amount Distance in meters or angle in degrees
+   * @param robot Robot to simulate, "LoCoBot" or "LoCoBot-Lite"
+   * @param controller Controller to simulate, "ILQR", "Proportional" or
+   * "Movebase"
+   * @param noiseMultiplier Multiplier on the noise amount
+   * @return false, without moving the node, if any name is unknown
+   */
+  bool pyrobotNoisyAction(SceneNode& object,
+                          const std::string& motion,
+                          float amount,
+                          const std::string& robot,
+                          const std::string& controller,
+                          float noiseMultiplier);
+
+  //! Seed the generator of the actuation noise
+  void seed(uint32_t newSeed) { random_.seed(newSeed); }
+
+  //! Get the state of the generator of the actuation noise, to be restored
+  //! with @ref setRandomState
+  std::string getRandomState() const { return random_.getState(); }
+
+  //! Restore a generator state returned by @ref getRandomState
+  void setRandomState(const std::string& state) { random_.setState(state); }
+
   inline const std::map<std::string, MoveFunc>& getMoveFuncMap() const {
     return moveFuncMap_;
   }
@@ -45,6 +136,14 @@ class ObjectControls {
   };
   std::map<std::string, MoveFunc> moveFuncMap_;
 
+  //! Sample of a Gaussian truncated to [max(low, mean - 3 stdev),
+  //! mean + 3 stdev]
+  float sampleTruncatedGaussian(float mean,
+                                float cov,
+                                float low = -std::numeric_limits<float>::max());
+
+  core::Random random_;
+
   ESP_SMART_POINTERS(ObjectControls)
 };
 
@@ -25,5 +25,42 @@ SceneNode& SceneNode::createChild() {
   return *node;
 }
 
+TransformationObserver::TransformationObserver(SceneNode& node)
+    : Magnum::SceneGraph::AbstractFeature3D{node} {}
+
+void TransformationObserver::reset() {
+  changed_ = false;
+  object().setClean();
+}
+
+void getNodePoses(const std::vector<SceneNode*>& nodes,
+                  NodePositions& positions,
+                  NodeRotations& rotations) {
+  positions.resize(nodes.size(), 3);
+  rotations.resize(nodes.size(), 4);
+  for (int i = 0; i < nodes.size(); ++i) {
+    const Vector3 position = nodes[i]->absoluteTranslation();
+    const Quaternion rotation = nodes[i]->rotation();
+    positions.row(i) << position.x(), position.y(), position.z();
+    rotations.row(i) << rotation.vector().x(), rotation.vector().y(),
+        rotation.vector().z(), rotation.scalar();
+  }
+}
+
+void setNodePoses(const std::vector<SceneNode*>& nodes,
+                  const NodePositions& positions,
+                  const NodeRotations& rotations) {
+  ASSERT(positions.rows() == nodes.size());
+  ASSERT(rotations.rows() == nodes.size());
+  for (int i = 0; i < nodes.size(); ++i) {
+    nodes[i]->resetTransformation();
+    nodes[i]->setTranslation(
+        Vector3{positions(i, 0), positions(i, 1), positions(i, 2)});
+    nodes[i]->setRotation(
+        Quaternion{Vector3{rotations(i, 0), rotations(i, 1), rotations(i, 2)},
+                   rotations(i, 3)});
+  }
+}
+
 }  // namespace scene
 }  // namespace esp
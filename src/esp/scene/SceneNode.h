@@ -5,6 +5,8 @@
 #pragma once
 
 #include <Corrade/Containers/Containers.h>
+#include <Magnum/SceneGraph/AbstractFeature.h>
+#include <vector>
 #include "esp/core/esp.h"
 #include "esp/gfx/magnum.h"
 
@@ -64,5 +66,63 @@ class SceneNode : public MagnumObject {
   int id_ = ID_UNDEFINED;
 };
 
+/**
+ * @brief Feature flagging changes of the absolute transformation of its node,
+ * i.e. the node or any of its ancestors being moved.
+ *
+ * Relies on the dirty tracking of the scene graph: a clean node notifies its
+ * features when it or an ancestor is transformed. Call @ref reset() once a
+ * change has been handled, which cleans the node so that the next change is
+ * flagged again.
+ */
+class TransformationObserver : public Magnum::SceneGraph::AbstractFeature3D {
+ public:
+  explicit TransformationObserver(SceneNode& node);
+
+  //! Whether the node moved since the last @ref reset()
+  bool hasChanged() const { return changed_; }
+
+  //! Clears the flag and cleans the node
+  void reset();
+
+ protected:
+  void markDirty() override { changed_ = true; }
+
+  // a new node starts out dirty, so it would not report its first change
+  bool changed_ = true;
+};
+
+//! (N, 3) positions of a batch of nodes, one row per node
+typedef Eigen::Matrix<float, Eigen::Dynamic, 3, Eigen::RowMajor>
+    NodePositions;
+//! (N, 4) rotations of a batch of nodes as quaternion coefficients in
+//! [x, y, z, w] order, one row per node
+typedef Eigen::Matrix<float, Eigen::Dynamic, 4, Eigen::RowMajor>
+    NodeRotations;
+
+/**
+ * @brief Reads the absolute translation and the local rotation of each node,
+ * in the same layout as the agent state.
+ *
+ * @param nodes The nodes to read
+ * @param[out] positions Resized to (N, 3)
+ * @param[out] rotations Resized to (N, 4)
+ */
+void getNodePoses(const std::vector<SceneNode*>& nodes,
+                  NodePositions& positions,
+                  NodeRotations& rotations);
+
+/**
+ * @brief Resets the transformation of each node and sets its translation and
+ * rotation. The children of the nodes keep their local transformation.
+ *
+ * @param nodes The nodes to write
+ * @param positions (N, 3) translations
+ * @param rotations (N, 4) rotations as [x, y, z, w] quaternion coefficients
+ */
+void setNodePoses(const std::vector<SceneNode*>& nodes,
+                  const NodePositions& positions,
+                  const NodeRotations& rotations);
+
 }  // namespace scene
 }  // namespace esp
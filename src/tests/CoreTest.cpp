@@ -6,6 +6,7 @@
 
 #include "esp/core/Configuration.h"
 #include "esp/core/esp.h"
+#include "esp/core/random.h"
 #include "esp/io/json.h"
 
 using namespace esp::core;
@@ -28,3 +29,38 @@ TEST(CoreTest, JsonTest) {
   EXPECT_EQ(t[1], 2);
   EXPECT_EQ(esp::io::jsonToString(json), "{\"test\":[1,2,3,4]}");
 }
+
+TEST(CoreTest, RandomSeedTest) {
+  Random random(0);
+  random.seed(1);
+  std::vector<float> samples;
+  for (int i = 0; i < 4; ++i) {
+    samples.push_back(random.normal_float_01());
+  }
+
+  // An odd number of draws leaves a sample cached in the normal distribution
+  for (int i = 0; i < 3; ++i) {
+    random.normal_float_01();
+  }
+  random.seed(1);
+  for (int i = 0; i < 4; ++i) {
+    EXPECT_EQ(random.normal_float_01(), samples[i]);
+  }
+}
+
+TEST(CoreTest, RandomStateTest) {
+  Random random(0);
+  // Saved while the normal distribution has a sample cached
+  random.normal_float_01();
+  const std::string state = random.getState();
+  std::vector<float> samples;
+  for (int i = 0; i < 4; ++i) {
+    samples.push_back(random.normal_float_01());
+  }
+
+  random.normal_float_01();
+  random.setState(state);
+  for (int i = 0; i < 4; ++i) {
+    EXPECT_EQ(random.normal_float_01(), samples[i]);
+  }
+}
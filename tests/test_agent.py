@@ -73,3 +73,62 @@ def test_change_state():
         for k, v in state.sensor_states.items():
             assert k in new_state.sensor_states
             _check_state_same(v, new_state.sensor_states[k])
+
+
+def test_state_cache():
+    scene_graph = habitat_sim.SceneGraph()
+    agent = habitat_sim.Agent(scene_graph.get_root_node().create_child())
+
+    state = agent.state
+    cached_state = agent.state
+    assert agent.state_cache_info()["hits"] == 1
+    _check_state_same(cached_state, state)
+
+    # Callers get their own copy of the cached state
+    cached_state.position += 1.0
+    for v in cached_state.sensor_states.values():
+        v.position += 1.0
+    _check_state_same(agent.state, state)
+
+    agent.act("move_forward")
+    new_state = agent.state
+    assert new_state is not state
+    assert not np.allclose(new_state.position, state.position)
+
+    # Transforming the nodes directly invalidates the cache as well
+    agent.scene_node.translate(np.array([1.0, 0.0, 0.0]))
+    moved_state = agent.state
+    assert np.allclose(moved_state.position, new_state.position + [1.0, 0.0, 0.0])
+
+    for k, v in agent.sensors.items():
+        v.node.translate(np.array([0.0, 1.0, 0.0]))
+        assert np.allclose(
+            agent.state.sensor_states[k].position,
+            moved_state.sensor_states[k].position + [0.0, 1.0, 0.0],
+        )
+        moved_state = agent.state
+
+    agent.set_state(state)
+    _check_state_same(agent.state, state)
+    assert agent.state_cache_info()["misses"] == 4 + len(agent.sensors)
+
+
+def test_act_sequence():
+    scene_graph = habitat_sim.SceneGraph()
+    agent = habitat_sim.Agent(scene_graph.get_root_node().create_child())
+    actions = ["move_forward", "turn_left", "move_forward", "turn_right"] * 5
+
+    start_state = agent.state
+    expected_positions = []
+    for action in actions:
+        agent.act(action)
+        expected_positions.append(agent.state.position)
+
+    agent.state = start_state
+    result = agent.act_sequence(actions)
+    assert not result["collided"].any()
+    assert np.allclose(result["position"], expected_positions, atol=1e-5)
+    _check_state_same(
+        habitat_sim.AgentState(result["position"][-1], result["rotation"][-1]),
+        agent.state,
+    )
@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+from habitat_sim.benchmark import (
+    BenchmarkSettings,
+    compare,
+    run_benchmarks,
+    scenarios,
+    summarize,
+)
+
+
+def _results(**metrics):
+    return dict(
+        metadata={},
+        scenarios={
+            "step": dict(
+                status="ok",
+                metrics={k: summarize([v / 1e3] * 3) for k, v in metrics.items()},
+            ),
+            "physics_step": dict(status="skipped", reason="No physics"),
+        },
+    )
+
+
+def test_summarize():
+    stats = summarize([0.001, 0.002, 0.003, 0.004])
+    assert stats["count"] == 4
+    assert stats["min"] == pytest.approx(1.0)
+    assert stats["max"] == pytest.approx(4.0)
+    assert stats["p50"] == pytest.approx(2.5)
+    assert stats["p50"] <= stats["p90"] <= stats["p95"] <= stats["p99"]
+
+
+def test_compare():
+    baseline = _results(step=10.0, readback=2.0)
+    current = _results(step=10.5, readback=3.0, new_metric=1.0)
+
+    regressions = compare(baseline, current, threshold=0.1)
+    assert [(r.scenario, r.metric) for r in regressions] == [("step", "readback")]
+    assert regressions[0].ratio == pytest.approx(1.5)
+
+    assert len(compare(baseline, current, threshold=0.6)) == 0
+    # Round-trips through JSON
+    assert len(compare(json.loads(json.dumps(baseline)), current)) == 1
+
+
+@pytest.mark.gfxtest
+def test_run_benchmarks():
+    settings = BenchmarkSettings(width=64, height=64, iterations=5, warmup=1)
+    results = run_benchmarks(settings, ["readback_only", "async_step", "navmesh"])
+    json.dumps(results)
+
+    assert set(results["scenarios"].keys()) == {
+        "readback_only",
+        "async_step",
+        "navmesh",
+    }
+    for result in results["scenarios"].values():
+        assert result["status"] in ("ok", "skipped")
+        if result["status"] == "ok":
+            for stats in result["metrics"].values():
+                assert stats["count"] == settings.iterations
+
+    async_step = results["scenarios"]["async_step"]
+    if async_step["status"] == "ok":
+        assert set(async_step["metrics"].keys()) == {
+            "async_step",
+            "async_step_latency",
+            "async_step_wait",
+            "async_step_frame_interval",
+        }
+
+    assert not scenarios["navmesh"].needs_gl
+    assert scenarios["async_step"].needs_gl
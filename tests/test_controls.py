@@ -42,6 +42,38 @@ def test_no_move_fun():
         agent.act("move_forward")
 
 
+def test_dispatch_follows_registry():
+    scene_graph = habitat_sim.SceneGraph()
+    agent_config = habitat_sim.AgentConfiguration()
+    agent_config.action_space = dict(
+        step_up=habitat_sim.ActionSpec(
+            "test_dispatch_step_up", habitat_sim.ActuationSpec(amount=0.5)
+        )
+    )
+    agent = habitat_sim.Agent(scene_graph.get_root_node().create_child(), agent_config)
+
+    with pytest.raises(AssertionError):
+        agent.act("step_up")
+
+    @habitat_sim.registry.register_move_fn(
+        name="test_dispatch_step_up", body_action=True
+    )
+    class StepUp(habitat_sim.SceneNodeControl):
+        def __call__(self, scene_node, actuation_spec):
+            scene_node.translate_local(habitat_sim.geo.UP * actuation_spec.amount)
+
+    state = agent.state
+    agent.act("step_up")
+    assert np.allclose(agent.state.position, state.position + [0.0, 0.5, 0.0])
+
+    # Actions added to the action space after configuration are picked up too
+    agent.agent_config.action_space["step_up_more"] = habitat_sim.ActionSpec(
+        "test_dispatch_step_up", habitat_sim.ActuationSpec(amount=1.0)
+    )
+    agent.act("step_up_more")
+    assert np.allclose(agent.state.position, state.position + [0.0, 1.5, 0.0])
+
+
 @attr.s(auto_attribs=True)
 class ExpectedDelta:
     delta_pos: np.array = np.array([0, 0, 0])
@@ -181,3 +213,54 @@ def test_default_sensor_contorls(action, expected):
     for k, v in state.sensor_states.items():
         assert k in new_state.sensor_states
         _check_state_expected(v, new_state.sensor_states[k], expected)
+
+
+def test_batched_kinematics_match_agents():
+    num_agents = 8
+    scene_graph = habitat_sim.SceneGraph()
+    agent_config = habitat_sim.AgentConfiguration()
+    agent_config.action_space = dict(
+        move_forward=habitat_sim.ActionSpec(
+            "move_forward", habitat_sim.ActuationSpec(amount=0.25)
+        ),
+        move_left=habitat_sim.ActionSpec(
+            "move_left", habitat_sim.ActuationSpec(amount=0.1)
+        ),
+        turn_left=habitat_sim.ActionSpec(
+            "turn_left", habitat_sim.ActuationSpec(amount=10.0)
+        ),
+        turn_right=habitat_sim.ActionSpec(
+            "turn_right", habitat_sim.ActuationSpec(amount=30.0)
+        ),
+    )
+    agents = [
+        habitat_sim.Agent(scene_graph.get_root_node().create_child(), agent_config)
+        for _ in range(num_agents)
+    ]
+    kinematics = habitat_sim.BatchedKinematicAgents(
+        num_agents, agent_config.action_space
+    )
+
+    rng = np.random.RandomState(0)
+    action_names = list(agent_config.action_space.keys())
+    for _ in range(50):
+        indices = rng.randint(len(action_names), size=num_agents)
+        actions = [action_names[i] for i in indices]
+        assert not np.any(kinematics.step(actions))
+        for agent, action in zip(agents, actions):
+            agent.act(action)
+
+        for agent, state in zip(agents, kinematics.get_agent_states()):
+            agent_state = agent.get_state()
+            assert np.allclose(agent_state.position, state.position, atol=1e-4)
+            assert angle_between_quats(agent_state.rotation, state.rotation) < 1e-4
+
+    with pytest.raises(AssertionError):
+        habitat_sim.BatchedKinematicAgents(
+            num_agents,
+            dict(
+                look_up=habitat_sim.ActionSpec(
+                    "look_up", habitat_sim.ActuationSpec(amount=10.0)
+                )
+            ),
+        )
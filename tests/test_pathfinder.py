@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Facebook, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import os.path as osp
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+import habitat_sim
+
+base_dir = osp.abspath(osp.join(osp.dirname(__file__), ".."))
+
+test_navmeshes = [
+    osp.join(
+        base_dir, "data/scene_datasets/habitat-test-scenes/skokloster-castle.navmesh"
+    ),
+    osp.join(base_dir, "data/scene_datasets/habitat-test-scenes/van-gogh-room.navmesh"),
+]
+
+
+@pytest.fixture(params=test_navmeshes)
+def pathfinder(request):
+    if not osp.exists(request.param):
+        pytest.skip(f"{request.param} not found")
+
+    pathfinder = habitat_sim.PathFinder()
+    pathfinder.load_nav_mesh(request.param)
+    assert pathfinder.is_loaded
+    pathfinder.seed(0)
+    return pathfinder
+
+
+def _random_points(pathfinder, n):
+    return np.array([pathfinder.get_random_navigable_point() for _ in range(n)])
+
+
+def test_find_paths(pathfinder):
+    starts = _random_points(pathfinder, 100)
+    ends = _random_points(pathfinder, 100)
+
+    distances, points = pathfinder.find_paths(starts, ends, return_points=True)
+    assert distances.shape == (100,)
+    assert len(points) == 100
+    for start, end, distance, path_points in zip(starts, ends, distances, points):
+        path = habitat_sim.ShortestPath()
+        path.requested_start = start
+        path.requested_end = end
+        if not pathfinder.find_path(path):
+            assert np.isinf(distance)
+            assert len(path_points) == 0
+            continue
+
+        assert np.isclose(distance, path.geodesic_distance, rtol=1e-5)
+        assert np.allclose(path_points, np.array(path.points), atol=1e-5)
+
+    assert np.array_equal(pathfinder.find_paths(starts, ends, num_threads=1), distances)
+
+    with pytest.raises(ValueError):
+        pathfinder.find_paths(starts, ends[:-1])
+
+
+def test_clone(pathfinder):
+    clone = pathfinder.clone()
+    assert clone.is_loaded
+    assert np.allclose(clone.get_bounds(), pathfinder.get_bounds())
+
+    starts = pathfinder.sample_navigable_points(20, seed=0)
+    ends = pathfinder.sample_navigable_points(20, seed=1)
+    assert np.array_equal(
+        clone.find_paths(starts, ends), pathfinder.find_paths(starts, ends)
+    )
+
+    # Seeding or drawing from the clone leaves the original alone
+    pathfinder.seed(1)
+    expected = pathfinder.sample_navigable_points(10)
+    pathfinder.seed(1)
+    clone.seed(2)
+    clone.sample_navigable_points(10)
+    assert np.array_equal(pathfinder.sample_navigable_points(10), expected)
+
+    # Loading another navmesh leaves the clone on the shared one
+    pathfinder.load_nav_mesh([p for p in test_navmeshes if osp.exists(p)][-1])
+    assert np.all(clone.is_navigable_batch(starts))
+
+    assert not habitat_sim.PathFinder().clone().is_loaded
+
+
+def test_geodesic_distance_field(pathfinder, tmpdir):
+    goal = pathfinder.get_random_navigable_point()
+    field = habitat_sim.GeodesicDistanceField.build(pathfinder, goal, cell_size=0.1)
+    assert field.distances.shape[0] == 1
+
+    # The distances of the cells themselves are those of a path search
+    cells = np.argwhere(np.isfinite(field.distances[0]))[:200]
+    cell_points = np.stack(
+        [
+            field.origin[0] + cells[:, 1] * field.cell_size,
+            np.full(len(cells), goal[1]),
+            field.origin[1] + cells[:, 0] * field.cell_size,
+        ],
+        axis=-1,
+    )
+    cell_reference = pathfinder.find_paths(
+        cell_points, np.broadcast_to(goal, cell_points.shape)
+    )
+    cell_distances = field.distances[0][cells[:, 0], cells[:, 1]]
+    found = np.isfinite(cell_reference)
+    cell_errors = np.abs(cell_distances[found] - cell_reference[found])
+    assert np.percentile(cell_errors, 90) < 0.05
+
+    points = _random_points(pathfinder, 200)
+    points = points[np.abs(points[:, 1] - goal[1]) < 0.1]
+    distances = field.distance(points)
+    reference = pathfinder.find_paths(points, np.broadcast_to(goal, points.shape))
+
+    # Points with a path to the goal are on the field, but for those with no
+    # navigable cell around them
+    assert np.mean(np.isfinite(distances[np.isfinite(reference)])) > 0.95
+    reachable = np.isfinite(reference) & np.isfinite(distances)
+    # Interpolation is only off by about a cell, except for points on thin
+    # parts of the navmesh
+    errors = np.abs(distances[reachable] - reference[reachable])
+    assert np.median(errors) < 0.1
+    assert np.percentile(errors, 90) < 0.3
+    assert np.isclose(field.distance(goal), 0.0, atol=0.15)
+
+    # Points far above the only slice are rejected rather than misread
+    with pytest.raises(ValueError):
+        field.distance(goal + np.array([0.0, 10.0, 0.0]))
+
+    # Points are looked up in the slice closest to them
+    layered = habitat_sim.GeodesicDistanceField.build(
+        pathfinder, goal, cell_size=0.1, heights=[goal[1], goal[1] + 10.0]
+    )
+    assert layered.distances.shape[0] == 2
+    assert np.array_equal(layered.distances[0], field.distances[0])
+    assert np.isinf(layered.distance(goal + np.array([0.0, 10.0, 0.0])))
+    assert np.array_equal(layered.distance(points), distances)
+
+    field.save(str(tmpdir.join("field.npz")))
+    loaded = habitat_sim.GeodesicDistanceField.load(str(tmpdir.join("field.npz")))
+    assert np.array_equal(loaded.heights, field.heights)
+    assert np.array_equal(loaded.distances, field.distances)
+    assert np.array_equal(loaded.connected_x, field.connected_x)
+    assert np.array_equal(loaded.connected_z, field.connected_z)
+    assert np.array_equal(loaded.distance(points), distances)
+
+
+@pytest.mark.parametrize("navmesh_path", test_navmeshes)
+def test_geodesic_distance_matrix(navmesh_path, tmpdir):
+    if not osp.exists(navmesh_path):
+        pytest.skip(f"{navmesh_path} not found")
+
+    pathfinder = habitat_sim.PathFinder()
+    pathfinder.load_nav_mesh(navmesh_path)
+
+    points, matrix = habitat_sim.geodesic_distance_matrix(
+        pathfinder, 20, navmesh_path=navmesh_path, cache_dir=str(tmpdir)
+    )
+    assert points.shape == (20, 3)
+    assert matrix.shape == (20, 20)
+    assert np.array_equal(matrix, matrix.T)
+    assert np.all(np.diagonal(matrix) == 0)
+
+    # The Dijkstra search and the A* of find_paths may settle on different
+    # corridors of the same cost, whose straightened paths differ slightly
+    rows, cols = np.triu_indices(20, k=1)
+    reference = pathfinder.find_paths(points[rows], points[cols])
+    found = np.isfinite(reference)
+    assert np.all(np.isfinite(matrix[rows, cols][found]))
+    relative_errors = (
+        np.abs(matrix[rows, cols][found] - reference[found]) / reference[found]
+    )
+    assert np.median(relative_errors) < 1e-3
+    assert np.all(relative_errors < 0.05)
+
+    assert np.array_equal(
+        pathfinder.geodesic_distance_matrix(points[:5], points, num_threads=1),
+        pathfinder.geodesic_distance_matrix(points, points)[:5],
+    )
+
+    # Served from the cache
+    assert len(tmpdir.listdir()) == 1
+    (navmesh_dir,) = tmpdir.listdir()
+    assert all(f.basename.startswith("v") for f in navmesh_dir.listdir())
+    cached_points, cached_matrix = habitat_sim.geodesic_distance_matrix(
+        pathfinder, 20, navmesh_path=navmesh_path, cache_dir=str(tmpdir)
+    )
+    assert np.array_equal(cached_points, points)
+    assert np.array_equal(cached_matrix, matrix)
+
+    _, matrix_of_points = habitat_sim.geodesic_distance_matrix(pathfinder, points)
+    assert np.array_equal(matrix_of_points, matrix)
+
+    # A cached matrix of other points, e.g. from an older sampler, is recomputed
+    (cache_file,) = navmesh_dir.listdir()
+    np.savez_compressed(str(cache_file), points=points + 1.0, matrix=matrix + 1.0)
+    recomputed_points, recomputed_matrix = habitat_sim.geodesic_distance_matrix(
+        pathfinder, 20, navmesh_path=navmesh_path, cache_dir=str(tmpdir)
+    )
+    assert np.array_equal(recomputed_points, points)
+    assert np.array_equal(recomputed_matrix, matrix)
+
+
+def test_batched_point_queries(pathfinder):
+    points = _random_points(pathfinder, 50)
+    # Some points off the navmesh
+    points[::2] += np.array([0.5, 0.3, -0.5])
+
+    snapped = pathfinder.snap_point_batch(points)
+    navigable = pathfinder.is_navigable_batch(points)
+    radii = pathfinder.island_radius_batch(points)
+    distances = pathfinder.distance_to_closest_obstacle_batch(points)
+    hit_pos, hit_normal, hit_dist = pathfinder.closest_obstacle_surface_point_batch(
+        points, max_search_radius=1.0
+    )
+    steps = pathfinder.try_step_batch(points, points + np.array([0.25, 0.0, 0.0]))
+
+    assert navigable.dtype == bool
+    for i, pt in enumerate(points):
+        assert np.allclose(
+            snapped[i], pathfinder.snap_point(pt), equal_nan=True, atol=1e-5
+        )
+        assert navigable[i] == pathfinder.is_navigable(pt)
+        assert np.isclose(radii[i], pathfinder.island_radius(pt))
+        assert np.isclose(distances[i], pathfinder.distance_to_closest_obstacle(pt))
+
+        hit = pathfinder.closest_obstacle_surface_point(pt, 1.0)
+        assert np.isclose(hit_dist[i], hit.hit_dist)
+        if np.isfinite(hit.hit_dist):
+            assert np.allclose(hit_pos[i], hit.hit_pos, atol=1e-5)
+            assert np.allclose(hit_normal[i], hit.hit_normal, atol=1e-5)
+
+        step = pathfinder.try_step(pt, pt + np.array([0.25, 0.0, 0.0]))
+        assert np.allclose(steps[i], step, atol=1e-5)
+
+
+def test_batched_point_queries_concurrently(pathfinder):
+    points = _random_points(pathfinder, 200)
+    ends = points + np.array([0.25, 0.0, 0.0])
+
+    def queries():
+        # The batched queries run without the GIL
+        return (
+            pathfinder.snap_point_batch(points),
+            pathfinder.is_navigable_batch(points),
+            pathfinder.island_radius_batch(points),
+            pathfinder.distance_to_closest_obstacle_batch(points),
+            pathfinder.try_step_batch(points, ends),
+        )
+
+    expected = queries()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(queries) for _ in range(8)]
+        # Single point queries keep running on the main thread meanwhile
+        for pt in points:
+            pathfinder.is_navigable(pt)
+        for future in futures:
+            for result, expected_result in zip(future.result(), expected):
+                assert np.array_equal(result, expected_result, equal_nan=True)
+
+
+def test_sample_navigable_points(pathfinder):
+    points = pathfinder.sample_navigable_points(500, seed=1)
+    assert points.shape == (500, 3)
+    assert np.all(pathfinder.is_navigable_batch(points))
+    assert np.array_equal(pathfinder.sample_navigable_points(500, seed=1), points)
+    assert not np.array_equal(pathfinder.sample_navigable_points(500, seed=2), points)
+
+    # Without a seed, the samples follow PathFinder.seed
+    pathfinder.seed(7)
+    unseeded = pathfinder.sample_navigable_points(100)
+    assert not np.array_equal(pathfinder.sample_navigable_points(100), unseeded)
+    pathfinder.seed(7)
+    assert np.array_equal(pathfinder.sample_navigable_points(100), unseeded)
+
+    island = points[0]
+    y_range = (island[1] - 0.1, island[1] + 0.1)
+    constrained = pathfinder.sample_navigable_points(
+        200, island=island, y_range=y_range, min_obstacle_distance=0.2, seed=3
+    )
+    assert np.all(constrained[:, 1] >= y_range[0])
+    assert np.all(constrained[:, 1] <= y_range[1])
+    assert np.all(
+        pathfinder.distance_to_closest_obstacle_batch(constrained, 0.2) >= 0.2
+    )
+    assert np.all(
+        np.isfinite(
+            pathfinder.find_paths(constrained, np.broadcast_to(island, (200, 3)))
+        )
+    )
+
+    with pytest.raises(ValueError):
+        pathfinder.sample_navigable_points(10, y_range=(1e4, 1e4 + 1))
+
+
+def test_island_ids(pathfinder):
+    points = pathfinder.sample_navigable_points(100, seed=4)
+    ids = pathfinder.island_id_batch(points)
+    areas = pathfinder.island_areas
+
+    assert np.all(ids >= 0)
+    assert np.all(ids < len(areas))
+    assert np.all(areas > 0)
+    assert pathfinder.island_id(np.array([1e4, 1e4, 1e4])) == -1
+
+    starts, ends = points[:50], points[50:]
+    same = pathfinder.same_island_batch(starts, ends)
+    assert np.array_equal(same, ids[:50] == ids[50:])
+    # Points with a path between them are always on the same island
+    assert np.all(same[np.isfinite(pathfinder.find_paths(starts, ends))])
+    for i in range(50):
+        assert same[i] == pathfinder.same_island(starts[i], ends[i])
+
+    island = int(ids[0])
+    on_island = pathfinder.sample_navigable_points(20, island=island, seed=5)
+    assert np.all(pathfinder.island_id_batch(on_island) == island)
+
+
+def test_unloaded_island_queries():
+    pathfinder = habitat_sim.PathFinder()
+    assert not pathfinder.is_loaded
+
+    points = np.zeros((3, 3))
+    assert pathfinder.island_id(points[0]) == -1
+    assert not pathfinder.same_island(points[0], points[1])
+    assert np.array_equal(pathfinder.island_id_batch(points), [-1, -1, -1])
+    assert not np.any(pathfinder.same_island_batch(points, points))
+    assert len(pathfinder.island_areas) == 0
+    assert np.all(np.isnan(pathfinder.snap_point_batch(points)))
+    assert not np.any(pathfinder.is_navigable_batch(points))
@@ -1,11 +1,18 @@
 import os.path as osp
 import random
 
+import magnum as mn
 import numpy as np
 import pytest
 import quaternion
 
 import examples.settings
+import habitat_sim
+import habitat_sim.bindings as hsim
+from habitat_sim.agent.controls.pyrobot_noisy_controls import (
+    get_noise_random_state,
+    seed_noise,
+)
 from habitat_sim.utils.common import (
     quat_from_angle_axis,
     quat_from_magnum,
@@ -75,3 +82,81 @@ def test_kinematics(sim):
         # check that time is increasing in the world
         assert sim.get_world_time() > prev_time
         prev_time = sim.get_world_time()
+
+
+@pytest.mark.skipif(
+    not osp.exists("data/scene_datasets/habitat-test-scenes/skokloster-castle.glb")
+    or not osp.exists("data/objects/"),
+    reason="Requires the habitat-test-scenes and habitat test objects",
+)
+def test_save_restore_state(sim):
+    cfg_settings = examples.settings.default_sim_settings.copy()
+    cfg_settings[
+        "scene"
+    ] = "data/scene_datasets/habitat-test-scenes/skokloster-castle.glb"
+    cfg_settings["enable_physics"] = True
+    hab_cfg = examples.settings.make_cfg(cfg_settings)
+    sim.reconfigure(hab_cfg)
+
+    object_id = sim.add_object(0)
+    sim.set_translation(np.array([0, 1.0, 0]), object_id)
+    sim.set_linear_velocity(mn.Vector3(0.5, 0.0, 0.0), object_id)
+    sim.set_angular_velocity(mn.Vector3(0.0, 1.0, 0.0), object_id)
+
+    state = sim.save_state()
+    expected_transformation = np.array(sim.get_transformation(object_id))
+    expected_linear_velocity = np.array(sim.get_linear_velocity(object_id))
+    expected_angular_velocity = np.array(sim.get_angular_velocity(object_id))
+    expected_world_time = sim.get_world_time()
+    expected_noise_state = get_noise_random_state()
+
+    # Advance the world, draw some actuation noise and add another object
+    noisy_move = habitat_sim.registry.get_move_fn("pyrobot_noisy_move_forward")
+    for _ in range(3):
+        sim.step("move_forward")
+        noisy_move(
+            hsim.SceneGraph().get_root_node().create_child(),
+            habitat_sim.PyRobotNoisyActuationSpec(amount=0.25),
+        )
+    sim.set_linear_velocity(mn.Vector3(0.0, 0.0, -1.0), object_id)
+    sim.add_object(0)
+    assert get_noise_random_state() != expected_noise_state
+
+    sim.restore_state(state)
+    assert sim.get_existing_object_ids() == [object_id]
+    assert np.allclose(sim.get_transformation(object_id), expected_transformation)
+    assert np.allclose(sim.get_linear_velocity(object_id), expected_linear_velocity)
+    assert np.allclose(sim.get_angular_velocity(object_id), expected_angular_velocity)
+    assert sim.get_world_time() == expected_world_time
+    assert get_noise_random_state() == expected_noise_state
+
+    # The noise drawn after restoring is the noise that would have been drawn
+    # without the snapshot, whatever number of samples were drawn before it
+    node = hsim.SceneGraph().get_root_node().create_child()
+    spec = habitat_sim.PyRobotNoisyActuationSpec(amount=0.25)
+    noisy_turn = habitat_sim.registry.get_move_fn("pyrobot_noisy_turn_left")
+
+    def _noisy_poses():
+        node.translation = mn.Vector3()
+        node.rotation = mn.Quaternion()
+        poses = []
+        for _ in range(4):
+            noisy_move(node, spec)
+            noisy_turn(node, spec)
+            poses.append([*node.translation, *node.rotation.vector])
+        return np.array(poses)
+
+    for num_actions in range(1, 4):
+        seed_noise(5)
+        for _ in range(num_actions):
+            noisy_turn(node, spec)
+        expected_poses = _noisy_poses()
+
+        seed_noise(5)
+        for _ in range(num_actions):
+            noisy_turn(node, spec)
+        state = sim.save_state()
+        assert np.array_equal(_noisy_poses(), expected_poses)
+        _noisy_poses()
+        sim.restore_state(state)
+        assert np.array_equal(_noisy_poses(), expected_poses)
@@ -6,6 +6,7 @@
 
 import itertools
 
+import magnum as mn
 import numpy as np
 import pytest
 import quaternion
@@ -14,7 +15,10 @@ import habitat_sim
 import habitat_sim.bindings as hsim
 import habitat_sim.errors
 import habitat_sim.utils.common
-from habitat_sim.agent.controls.pyrobot_noisy_controls import pyrobot_noise_models
+from habitat_sim.agent.controls.pyrobot_noisy_controls import (
+    pyrobot_noise_models,
+    seed_noise,
+)
 
 
 def _delta_translation(a, b):
@@ -37,7 +41,7 @@ def _delta_rotation(a, b):
     ),
 )
 def test_pyrobot_noisy_actions(noise_multiplier, robot, controller):
-    np.random.seed(0)
+    seed_noise(0)
     scene_graph = hsim.SceneGraph()
     agent_config = habitat_sim.AgentConfiguration()
     agent_config.action_space = dict(
@@ -148,3 +152,70 @@ def test_pyrobot_noisy_actions(noise_multiplier, robot, controller):
             )
             < EPS
         )
+
+
+def test_pyrobot_noise_seed():
+    node = hsim.SceneGraph().get_root_node().create_child()
+    spec = habitat_sim.PyRobotNoisyActuationSpec(amount=0.25)
+
+    def _act():
+        node.translation = mn.Vector3()
+        node.rotation = mn.Quaternion()
+        for name in ["move_forward", "turn_left", "move_backward", "turn_right"]:
+            habitat_sim.registry.get_move_fn(f"pyrobot_noisy_{name}")(node, spec)
+        return np.array(
+            [*node.translation, *node.rotation.vector, node.rotation.scalar]
+        )
+
+    # seed_noise seeds the generator all the noisy actions draw from
+    seed_noise(3)
+    pose = _act()
+    seed_noise(3)
+    assert np.array_equal(_act(), pose)
+    seed_noise(4)
+    assert not np.array_equal(_act(), pose)
+
+    # Whatever number of samples were drawn since, reseeding restarts the
+    # same noise
+    for num_actions in range(1, 4):
+        seed_noise(3)
+        for _ in range(num_actions):
+            habitat_sim.registry.get_move_fn("pyrobot_noisy_turn_left")(node, spec)
+        seed_noise(3)
+        assert np.array_equal(_act(), pose)
+
+    # The python models describe the native ones
+    native_model = hsim.get_pyrobot_noise_models()["LoCoBot"]["ILQR"]
+    model = pyrobot_noise_models["LoCoBot"]["ILQR"]
+    assert np.allclose(
+        model.linear_motion.linear.mean, native_model.linear_motion.linear_mean
+    )
+    assert np.allclose(
+        np.diagonal(model.rotational_motion.rotation.cov),
+        [native_model.rotational_motion.rotation_cov],
+    )
+
+
+def test_native_pyrobot_noise_seed():
+    controls = hsim.ObjectControls()
+    scene_graph = hsim.SceneGraph()
+    node = scene_graph.get_root_node().create_child()
+
+    def _act():
+        node.translation = mn.Vector3()
+        node.rotation = mn.Quaternion()
+        for motion in ["moveForward", "turnLeft", "moveBackward", "turnRight"]:
+            controls.pyrobot_noisy_action(node, motion, 0.25, "LoCoBot", "ILQR", 1.0)
+        return np.array(
+            [*node.translation, *node.rotation.vector, node.rotation.scalar]
+        )
+
+    controls.seed(3)
+    pose = _act()
+    controls.seed(3)
+    assert np.array_equal(_act(), pose)
+    controls.seed(4)
+    assert not np.array_equal(_act(), pose)
+
+    with pytest.raises(ValueError):
+        controls.pyrobot_noisy_action(node, "jump", 0.25, "LoCoBot", "ILQR", 1.0)
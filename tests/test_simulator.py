@@ -1,7 +1,13 @@
+import os.path as osp
 import random
 
+import numpy as np
+import pytest
+import quaternion
+
 import examples.settings
 import habitat_sim
+from habitat_sim.utils.common import quat_to_coeffs
 
 
 def test_no_navmesh_smoke():
@@ -40,3 +46,348 @@ def test_empty_scene(sim):
     # test that empty frames can be rendered without a scene mesh
     for _ in range(2):
         obs = sim.step(random.choice(list(hab_cfg.agents[0].action_space.keys())))
+
+
+@pytest.mark.gfxtest
+def test_observation_readback_modes(sim, make_cfg_settings):
+    sim.reconfigure(examples.settings.make_cfg(make_cfg_settings))
+
+    expected = sim.get_sensor_observations()
+    out = {k: np.empty_like(v) for k, v in expected.items()}
+
+    obs = sim.get_sensor_observations(out=out)
+    for k, v in expected.items():
+        assert obs[k] is out[k]
+        assert np.array_equal(out[k], v)
+
+    views = sim.get_sensor_observations(copy=False)
+    for k, v in expected.items():
+        assert not views[k].flags.writeable
+        assert np.array_equal(views[k], v)
+
+
+@pytest.mark.gfxtest
+def test_lazy_observations(sim, make_cfg_settings):
+    hab_cfg = examples.settings.make_cfg(make_cfg_settings)
+    sim.reconfigure(hab_cfg)
+    action = list(hab_cfg.agents[0].action_space.keys())[0]
+
+    obs = sim.step(action, sensors=["depth_sensor"])
+    assert set(obs.keys()) == {"depth_sensor", "collided"}
+
+    obs = sim.step(action, lazy=True)
+    assert "collided" in obs
+    assert obs.rendered == []
+    depth = obs["depth_sensor"]
+    assert obs.rendered == ["depth_sensor"]
+    assert np.array_equal(depth, sim.get_sensor_observations()["depth_sensor"])
+
+    # The lazy observations of a previous step can no longer be rendered
+    with pytest.raises(RuntimeError):
+        obs["color_sensor"]
+
+    # Nor can they once the agents were moved
+    obs = sim.step(action, lazy=True)
+    sim.set_agent_states(*sim.get_agent_states())
+    with pytest.raises(RuntimeError):
+        obs["depth_sensor"]
+
+    # Or moved through the agent itself
+    obs = sim.step(action, lazy=True)
+    agent = sim.get_agent(0)
+    agent.set_state(agent.get_state())
+    with pytest.raises(RuntimeError):
+        obs["depth_sensor"]
+
+    obs = sim.step(action, lazy=True)
+    sim.initialize_agent(0)
+    with pytest.raises(RuntimeError):
+        obs["depth_sensor"]
+
+    # Reading the state alone leaves them valid
+    obs = sim.step(action, lazy=True)
+    agent.get_state()
+    sim.get_agent_states()
+    assert np.array_equal(
+        obs["depth_sensor"], sim.get_sensor_observations()["depth_sensor"]
+    )
+
+
+@pytest.mark.gfxtest
+def test_step_async(sim, make_cfg_settings):
+    hab_cfg = examples.settings.make_cfg(make_cfg_settings)
+    sim.reconfigure(hab_cfg)
+    actions = list(hab_cfg.agents[0].action_space.keys())
+
+    sim.step_async(actions[0])
+    sim.step_async(actions[1])
+    sim.wait()
+    obs = sim.wait()
+    expected = sim.get_sensor_observations()
+    for k, v in expected.items():
+        assert np.array_equal(obs[k], v)
+
+    assert sim.async_readback_stats.frames >= 2
+    assert sim.async_readback_stats.mean_latency > 0
+
+    # The pixel buffers of the slots are reused frame after frame
+    sim.step_async(actions[0])
+    for action in actions * 2:
+        sim.step_async(action)
+        sim.wait()
+    obs = sim.wait()
+    expected = sim.get_sensor_observations()
+    for k, v in expected.items():
+        assert np.array_equal(obs[k], v)
+
+
+def test_scene_cache(sim, make_cfg_settings):
+    scenes = [
+        "data/scene_datasets/habitat-test-scenes/skokloster-castle.glb",
+        "data/scene_datasets/habitat-test-scenes/van-gogh-room.glb",
+    ]
+    if not all(osp.exists(scene) for scene in scenes):
+        pytest.skip("Requires the habitat-test-scenes")
+
+    cfg_settings = dict(make_cfg_settings)
+    for scene in scenes:
+        cfg_settings["scene"] = scene
+        sim.reconfigure(examples.settings.make_cfg(cfg_settings))
+
+    before = sim.cache_stats()
+    cfg_settings["scene"] = scenes[0]
+    sim.reconfigure(examples.settings.make_cfg(cfg_settings))
+    after = sim.cache_stats()
+
+    assert after["scene"]["hits"] == before["scene"]["hits"] + 1
+    assert after["scene"]["misses"] == before["scene"]["misses"]
+    assert after["navmesh"]["hits"] == before["navmesh"]["hits"] + 1
+
+    budget = after["scene"]["budget"]
+    assert budget > 0
+
+    # With a tiny budget everything but the active scene is evicted, the
+    # meshes of the previous scene were removed from its scene graph
+    sim.set_cache_budget(scene_bytes=1)
+    trimmed = sim.cache_stats()["scene"]
+    evicted = trimmed["evictions"] - after["scene"]["evictions"]
+    assert evicted >= 1
+    assert trimmed["entries"] == after["scene"]["entries"] - evicted
+
+    cfg_settings["scene"] = scenes[1]
+    sim.reconfigure(examples.settings.make_cfg(cfg_settings))
+    assert sim.cache_stats()["scene"]["misses"] == trimmed["misses"] + 1
+    sim.set_cache_budget(scene_bytes=budget)
+
+
+def test_prefetch_scene(sim, make_cfg_settings):
+    scene = "data/scene_datasets/habitat-test-scenes/apartment_1.glb"
+    if not osp.exists(scene):
+        pytest.skip("Requires the habitat-test-scenes")
+
+    before = sim.cache_stats()["navmesh"]
+    sim.prefetch_scene(scene)
+    # Keep stepping while the scene loads in the background
+    for _ in range(5):
+        sim.step("move_forward")
+
+    cfg_settings = dict(make_cfg_settings)
+    cfg_settings["scene"] = scene
+    sim.reconfigure(examples.settings.make_cfg(cfg_settings))
+    assert sim.pathfinder.is_loaded
+
+    after = sim.cache_stats()["navmesh"]
+    assert after["misses"] == before["misses"]
+    assert (after["prefetch_hits"] + after["hits"]) == (
+        before["prefetch_hits"] + before["hits"] + 1
+    )
+
+
+def test_profiling(sim, make_cfg_settings):
+    hab_cfg = examples.settings.make_cfg(make_cfg_settings)
+    sim.reconfigure(hab_cfg)
+
+    sim.enable_profiling()
+    for _ in range(5):
+        sim.step("move_forward")
+    sim.disable_profiling()
+    # Nothing is recorded while disabled
+    sim.step("move_forward")
+
+    profile = sim.get_profile()
+    stages = profile["stages"]
+    assert profile["counters"]["sim.steps"] == 5
+    assert stages["agent.act"]["count"] == 5
+    num_sensors = len(hab_cfg.agents[0].sensor_specifications)
+    assert stages["sensor.draw"]["count"] == 5 * num_sensors
+    for stage in ["sim.step_world", "sensor.readback", "gfx.draw", "gfx.readback"]:
+        assert stage in stages
+        assert stages[stage]["p50"] <= stages[stage]["p99"] <= stages[stage]["max"]
+        histogram = stages[stage]["histogram"]
+        assert sum(count for _, _, count in histogram) == stages[stage]["count"]
+
+    trace = sim.get_profile(format="chrome_trace")
+    names = {e["name"] for e in trace["traceEvents"] if e["ph"] == "X"}
+    assert {"agent.act", "gfx.draw"} <= names
+
+    sim.reset_profile()
+    assert len(sim.get_profile()["stages"]) == 0
+
+
+def test_step_many(sim, make_cfg_settings):
+    hab_cfg = examples.settings.make_cfg(make_cfg_settings)
+    sim.reconfigure(hab_cfg)
+    actions = ["move_forward", "turn_left", "move_forward", "turn_right"]
+
+    start_state = sim.get_agent(0).get_state()
+    obs = sim.step("move_forward", render=False)
+    assert set(obs.keys()) == {"collided", "position", "rotation", "world_time"}
+    assert np.allclose(obs["position"], sim.last_state().position)
+    assert obs["world_time"] == sim.get_world_time()
+
+    expected = []
+    for action in actions:
+        obs = sim.step(action, render=False)
+        expected.append(sim.last_state())
+        assert np.allclose(obs["position"], expected[-1].position)
+        assert np.allclose(
+            quaternion.as_float_array(obs["rotation"]),
+            quaternion.as_float_array(expected[-1].rotation),
+        )
+    expected_obs = sim.get_sensor_observations()
+
+    sim.get_agent(0).set_state(start_state)
+    sim.step("move_forward", render=False)
+    result = sim.step_many(actions)
+
+    assert result["collided"].shape == (len(actions),)
+    assert np.all(np.diff(result["world_time"]) >= 0)
+    for i, state in enumerate(expected):
+        assert np.allclose(result["position"][i], state.position)
+        assert np.allclose(
+            quaternion.as_float_array(result["rotation"][i]),
+            quaternion.as_float_array(state.rotation),
+        )
+    for k, v in expected_obs.items():
+        assert np.array_equal(result["observations"][k], v)
+
+    result = sim.step_many(actions, render_last_only=False)
+    assert len(result["observations"]) == len(actions)
+
+
+def test_navigation_only(make_cfg_settings):
+    scene = "data/scene_datasets/habitat-test-scenes/skokloster-castle.glb"
+    if not osp.exists(osp.splitext(scene)[0] + ".navmesh"):
+        pytest.skip("Requires the habitat-test-scenes")
+
+    cfg_settings = dict(make_cfg_settings)
+    cfg_settings["scene"] = scene
+    hab_cfg = examples.settings.make_cfg(cfg_settings)
+    hab_cfg.navigation_only = True
+
+    nav_sim = habitat_sim.Simulator(hab_cfg)
+    try:
+        assert nav_sim.pathfinder.is_loaded
+        assert nav_sim.get_sensor_observations() == {}
+
+        start = nav_sim.get_agent(0).get_state().position
+        obs = nav_sim.step("move_forward")
+        assert list(obs.keys()) == ["collided"]
+        end = nav_sim.last_state().position
+        assert nav_sim.pathfinder.is_navigable(end)
+        assert not np.allclose(start, end) or obs["collided"]
+        assert nav_sim.get_world_time() > 0
+
+        with pytest.raises(RuntimeError):
+            nav_sim.add_object(0)
+    finally:
+        nav_sim.close()
+
+
+def test_save_restore_state(sim, make_cfg_settings):
+    hab_cfg = examples.settings.make_cfg(make_cfg_settings)
+    sim.reconfigure(hab_cfg)
+    actions = ["move_forward", "turn_left", "move_forward", "turn_right"]
+
+    sim.step("move_forward")
+    state = sim.save_state()
+    expected_obs = sim.get_sensor_observations()
+    expected_agent_state = sim.last_state()
+    expected_world_time = sim.get_world_time()
+
+    for action in actions:
+        sim.step(action)
+    rollout_position = sim.last_state().position
+
+    sim.restore_state(state)
+    assert np.allclose(sim.last_state().position, expected_agent_state.position)
+    assert np.allclose(
+        quaternion.as_float_array(sim.last_state().rotation),
+        quaternion.as_float_array(expected_agent_state.rotation),
+    )
+    assert sim.get_world_time() == expected_world_time
+    for k, v in sim.get_sensor_observations().items():
+        assert np.array_equal(expected_obs[k], v)
+
+    # Branching from the same snapshot replays the same rollout
+    for action in actions:
+        sim.step(action)
+    assert np.allclose(sim.last_state().position, rollout_position)
+
+    # numpy's global generator is only rewound on request
+    value = np.random.rand()
+    sim.restore_state(state)
+    assert np.random.rand() != value
+    state = sim.save_state(include_numpy_rng=True)
+    value = np.random.rand()
+    sim.restore_state(state)
+    assert np.random.rand() == value
+
+
+def test_agent_states(sim, make_cfg_settings):
+    hab_cfg = examples.settings.make_cfg(make_cfg_settings)
+    sim.reconfigure(hab_cfg)
+
+    sim.step("turn_left")
+    positions, rotations = sim.get_agent_states()
+    state = sim.get_agent(0).get_state()
+    assert positions.shape == (len(sim.agents), 3)
+    assert rotations.shape == (len(sim.agents), 4)
+    assert np.allclose(positions[0], state.position)
+    assert np.allclose(rotations[0], quat_to_coeffs(state.rotation))
+
+    sim.step("move_forward")
+    sim.step("turn_right")
+    sim.set_agent_states(positions, rotations)
+    new_state = sim.get_agent(0).get_state()
+    assert np.allclose(new_state.position, state.position)
+    assert np.allclose(
+        quaternion.as_float_array(new_state.rotation),
+        quaternion.as_float_array(state.rotation),
+    )
+    for k, v in state.sensor_states.items():
+        assert np.allclose(new_state.sensor_states[k].position, v.position)
+
+
+def test_step_sequence(sim, make_cfg_settings):
+    hab_cfg = examples.settings.make_cfg(make_cfg_settings)
+    sim.reconfigure(hab_cfg)
+    actions = ["move_forward"] * 20 + ["turn_left", "move_forward", "turn_right"]
+
+    start_state = sim.get_agent(0).get_state()
+    expected = sim.step_many(actions)
+
+    sim.get_agent(0).set_state(start_state)
+    result = sim.step_sequence(actions)
+
+    assert np.array_equal(result["collided"], expected["collided"])
+    assert np.allclose(result["position"], expected["position"], atol=1e-5)
+    for q, expected_q in zip(result["rotation"], expected["rotation"]):
+        assert np.allclose(
+            quaternion.as_float_array(q),
+            quaternion.as_float_array(expected_q),
+            atol=1e-5,
+        )
+    assert np.allclose(sim.last_state().position, expected["position"][-1], atol=1e-5)
+    for k, v in expected["observations"].items():
+        assert result["observations"][k].shape == v.shape
@@ -4,8 +4,83 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
+import numpy as np
+import quaternion
+
+from habitat_sim import geo
 from habitat_sim.utils.collect_env import main as collect_env
+from habitat_sim.utils.common import (
+    angle_between_quats,
+    angles_between_quats,
+    quat_from_angle_axis,
+    quat_from_magnum,
+    quat_rotate_vector,
+    quat_to_coeffs,
+    quats_from_angle_axis,
+    quats_from_coeffs,
+    quats_from_magnum,
+    quats_rotate_vectors,
+    quats_to_coeffs,
+    quats_to_magnum,
+    vectors_from_magnum,
+    vectors_to_magnum,
+)
 
 
 def test_collect_env():
     collect_env()
+
+
+def _random_quats(rng, n):
+    return [
+        quat_from_angle_axis(theta, axis)
+        for theta, axis in zip(
+            rng.uniform(-2 * np.pi, 2 * np.pi, size=n), rng.normal(size=(n, 3))
+        )
+    ]
+
+
+def test_batched_quat_utils():
+    rng = np.random.RandomState(0)
+    n = 64
+    quats = _random_quats(rng, n)
+    other_quats = _random_quats(rng, n)
+    coeffs = quats_to_coeffs(np.array(quats))
+    other_coeffs = quats_to_coeffs(np.array(other_quats))
+    vectors = rng.normal(size=(n, 3))
+
+    assert coeffs.shape == (n, 4)
+    for i, q in enumerate(quats):
+        assert np.allclose(coeffs[i], quat_to_coeffs(q))
+    assert np.allclose(
+        quaternion.as_float_array(quats_from_coeffs(coeffs)),
+        quaternion.as_float_array(np.array(quats)),
+    )
+
+    angles = angles_between_quats(coeffs, other_coeffs)
+    rotated = quats_rotate_vectors(coeffs, vectors)
+    for i in range(n):
+        assert np.isclose(angles[i], angle_between_quats(quats[i], other_quats[i]))
+        assert np.allclose(rotated[i], quat_rotate_vector(quats[i], vectors[i]))
+
+    # Non-unit quaternions are handled like quat_rotate_vector does
+    assert np.allclose(quats_rotate_vectors(2 * coeffs, vectors), rotated)
+
+    thetas = rng.uniform(-2 * np.pi, 2 * np.pi, size=n)
+    from_angle_axis = quats_from_angle_axis(thetas, vectors)
+    for i in range(n):
+        expected = quat_to_coeffs(quat_from_angle_axis(thetas[i], vectors[i]))
+        assert np.allclose(from_angle_axis[i], expected)
+    assert np.allclose(
+        quats_from_angle_axis(thetas, geo.UP),
+        quats_from_angle_axis(thetas, [geo.UP] * n),
+    )
+
+    magnum_quats = quats_to_magnum(coeffs)
+    for i, q in enumerate(magnum_quats):
+        assert np.allclose(
+            quaternion.as_float_array(quat_from_magnum(q)),
+            quaternion.as_float_array(quats[i]),
+        )
+    assert np.allclose(quats_from_magnum(magnum_quats), coeffs)
+    assert np.allclose(vectors_from_magnum(vectors_to_magnum(vectors)), vectors)
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Facebook, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import random
+
+import numpy as np
+import pytest
+
+import habitat_sim
+from examples.settings import make_cfg
+
+
+@pytest.mark.gfxtest
+def test_vector_simulator(make_cfg_settings):
+    settings = dict(make_cfg_settings)
+    settings["semantic_sensor"] = False
+    num_envs = 2
+
+    with habitat_sim.VectorSimulator(
+        make_cfg, [(settings,)] * num_envs, ring_size=2
+    ) as vsim:
+        obs = vsim.reset()
+        assert obs["color_sensor"].shape == (
+            num_envs,
+            settings["height"],
+            settings["width"],
+            4,
+        )
+        assert obs["depth_sensor"].shape == (
+            num_envs,
+            settings["height"],
+            settings["width"],
+        )
+
+        actions = list(habitat_sim.AgentConfiguration().action_space.keys())
+        for _ in range(10):
+            obs = vsim.step([random.choice(actions) for _ in range(num_envs)])
+            assert obs["collided"].shape == (num_envs,)
+
+        # Observations in shared memory must match what the worker simulators
+        # would render themselves
+        expected = vsim.call("get_sensor_observations")
+        for i in range(num_envs):
+            assert np.array_equal(obs["depth_sensor"][i], expected[i]["depth_sensor"])
+
+        # Environments that are not reset keep their last observation
+        prev = obs["depth_sensor"].copy()
+        obs = vsim.reset(mask=[False, True])
+        assert np.array_equal(obs["depth_sensor"][0], prev[0])
+
+        assert len(vsim.call("get_world_time", indices=[1])) == 1